@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+🚦 ADMISSION CONTROL - Concurrency limit plus a short bounded queue for /chat
+At most ADMISSION_MAX_CONCURRENT requests run the response pipeline at once;
+up to ADMISSION_MAX_QUEUE more wait (first come, first served) for at most
+ADMISSION_QUEUE_TIMEOUT seconds. Anything beyond that is shed immediately so
+the caller can answer cheaply (CSV or template) instead of letting every
+request queue behind slow LLM calls.
+
+Only admitted requests hold a thread on the LLM path, so keep
+max_concurrent + max_queue at or below the worker's thread count (gunicorn
+GUNICORN_THREADS) for shedding to happen here rather than in the socket backlog.
+ADMISSION_MAX_CONCURRENT=0 disables the limiter.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+from metrics import metrics
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', '8'))
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '16'))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '2.0'))  # seconds
+
+
+class AdmissionController:
+    """Counting limiter with FIFO hand-off to queued requests and fail-fast shedding"""
+
+    def __init__(self, max_concurrent: int = ADMISSION_MAX_CONCURRENT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT, name: str = 'chat'):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: deque = deque()
+
+        self.in_flight = metrics.gauge('techrypt_admission_in_flight', 'Requests running the response pipeline',
+                                       pipeline=name)
+        self.queue_depth = metrics.gauge('techrypt_admission_queue_depth', 'Requests waiting for admission',
+                                         pipeline=name)
+        self.admitted = metrics.counter('techrypt_admission_admitted_total', 'Requests admitted', pipeline=name)
+        self.shed_queue_full = metrics.counter('techrypt_admission_shed_total', 'Requests shed by admission control',
+                                               pipeline=name, reason='queue_full')
+        self.shed_timeout = metrics.counter('techrypt_admission_shed_total', 'Requests shed by admission control',
+                                            pipeline=name, reason='timeout')
+        self.wait_time = metrics.histogram('techrypt_admission_wait_seconds', 'Time admitted requests spent queued',
+                                           pipeline=name)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    def try_acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False means the request was shed"""
+        if not self.enabled:
+            return True
+        start = time.perf_counter()
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                self.in_flight.set(self._active)
+                self.admitted.inc()
+                self.wait_time.observe(0.0)
+                return True
+            if len(self._waiters) >= self.max_queue:
+                self.shed_queue_full.inc()
+                return False
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            self.queue_depth.set(len(self._waiters))
+
+        granted = waiter.wait(self.queue_timeout)
+        if not granted:
+            with self._lock:
+                # A release may have handed us the slot right after the timeout
+                if not waiter.is_set():
+                    self._waiters.remove(waiter)
+                    self.queue_depth.set(len(self._waiters))
+                    self.shed_timeout.inc()
+                    return False
+        self.admitted.inc()
+        self.wait_time.observe(time.perf_counter() - start)
+        return True
+
+    def release(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._waiters:
+                # Hand the slot straight to the oldest waiter; _active is unchanged
+                self._waiters.popleft().set()
+                self.queue_depth.set(len(self._waiters))
+            else:
+                self._active -= 1
+                self.in_flight.set(self._active)
+
+    @contextmanager
+    def admit(self):
+        """with controller.admit() as admitted: ... (slot released on exit when admitted)"""
+        admitted = self.try_acquire()
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+    def get_stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'queue_timeout_seconds': self.queue_timeout,
+            'in_flight': self.in_flight.value,
+            'queue_depth': self.queue_depth.value,
+            'admitted': self.admitted.value,
+            'shed_queue_full': self.shed_queue_full.value,
+            'shed_timeout': self.shed_timeout.value,
+            'wait': self.wait_time.summary(),
+        }
+
+
+# Shared limiter in front of the /chat response pipeline
+chat_admission = AdmissionController()
+
+__all__ = ['AdmissionController', 'chat_admission']
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+📝 ASYNC LOGGING - Non-blocking structured logs for the chat server
+Request threads only build a LogRecord and drop it on a bounded queue; one
+listener thread formats it (JSON by default) and does the write, so log I/O
+never adds latency at peak. Records are formatted lazily: use %-style
+arguments (logger.info("took %.2fs", t)) and the string is only built on the
+listener thread, and only for records that survive level, sampling and rate
+limits. When the queue is full records are dropped and counted, never waited on.
+
+High-volume lines carry a key (extra={'log_key': 'chat.request'}) that can be
+sampled or rate limited:
+    LOG_SAMPLE=csv.match=0.1            keep ~10% of those records
+    LOG_RATE_LIMIT=chat.request=50      at most 50 records/second per key
+CSV matching diagnostics log at DEBUG on 'smart_llm_chatbot.csv'; turn them on
+with CSV_DEBUG_LOGGING=true or at runtime (POST /admin/logging).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json | text
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE = os.getenv('LOG_SAMPLE', '')
+LOG_RATE_LIMIT = os.getenv('LOG_RATE_LIMIT', 'chat.request=50,chat.response=50')
+CSV_DEBUG_LOGGING = os.getenv('CSV_DEBUG_LOGGING', 'false').lower() == 'true'
+
+CSV_LOGGER_NAME = 'smart_llm_chatbot.csv'
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came from extra= and goes into the JSON record
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'log_key'}
+
+
+def _parse_rules(spec: str) -> Dict[str, float]:
+    """'a=0.1,b=5' -> {'a': 0.1, 'b': 5.0}; malformed entries are ignored"""
+    rules = {}
+    for item in spec.split(','):
+        key, _, value = item.partition('=')
+        try:
+            rules[key.strip()] = float(value)
+        except ValueError:
+            continue
+    return rules
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        key = getattr(record, 'log_key', None)
+        if key:
+            data['key'] = key
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS:
+                data[name] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _TokenBucket:
+    __slots__ = ('rate', 'tokens', 'updated')
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class SamplingFilter(logging.Filter):
+    """Per-key sampling and rate limiting, applied before a record is queued"""
+
+    def __init__(self, sample_rates: Dict[str, float] = None, rate_limits: Dict[str, float] = None):
+        super().__init__()
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limits = dict(rate_limits or {})
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.stats = {'sampled_out': {}, 'rate_limited': {}}
+
+    def _drop(self, kind: str, key: str) -> bool:
+        counts = self.stats[kind]
+        counts[key] = counts.get(key, 0) + 1
+        return False
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'log_key', None)
+        if key is None:
+            return True
+        rate = self.sample_rates.get(key)
+        if rate is not None and random.random() >= rate:
+            return self._drop('sampled_out', key)
+        limit = self.rate_limits.get(key)
+        if limit is not None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None or bucket.rate != limit:
+                    bucket = self._buckets[key] = _TokenBucket(limit)
+                allowed = bucket.take()
+            if not allowed:
+                return self._drop('rate_limited', key)
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that neither formats in the caller nor blocks when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats the message here, on the request thread;
+        # records are handed over as-is and formatted by the listener instead
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogControls:
+    """Installs the queue handler on the root logger and adjusts it at runtime"""
+
+    def __init__(self):
+        self.queue: Optional[queue.Queue] = None
+        self.handler: Optional[_NonBlockingQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self.filter = SamplingFilter(_parse_rules(LOG_SAMPLE), _parse_rules(LOG_RATE_LIMIT))
+        self._output: Optional[logging.Handler] = None
+
+    def configure(self, level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None, force: bool = False):
+        """Route root logging through the queue (no-op if root already has handlers, like basicConfig)"""
+        root = logging.getLogger()
+        if self.handler is not None or (root.handlers and not force):
+            return
+        if force:
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+
+        self._output = logging.StreamHandler(stream or sys.stderr)
+        self._output.setFormatter(JSONFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+        self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.handler = _NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(self.filter)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        self.set_csv_debug(CSV_DEBUG_LOGGING)
+
+        self.listener = QueueListener(self.queue, self._output, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush queued records and stop the listener thread"""
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def after_fork(self):
+        """Give a forked worker its own queue and listener (the parent's thread isn't copied by fork)"""
+        if self.handler is None:
+            return
+        self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.handler.queue = self.queue
+        self.listener = QueueListener(self.queue, self._output, respect_handler_level=True)
+        self.listener.start()
+
+    def set_level(self, logger_name: str, level: Optional[str]):
+        """Set a logger's level by name ("DEBUG", ...); None resets it to inherit from its parent"""
+        if level is not None and not isinstance(level, str):
+            raise TypeError(f"Log level must be a level name, got {level!r}")
+        logging.getLogger(logger_name or None).setLevel(level.upper() if level is not None else logging.NOTSET)
+
+    def set_csv_debug(self, enabled: bool):
+        logging.getLogger(CSV_LOGGER_NAME).setLevel(logging.DEBUG if enabled else logging.NOTSET)
+
+    def set_sample_rate(self, key: str, rate: Optional[float]):
+        if rate is None:
+            self.filter.sample_rates.pop(key, None)
+        else:
+            self.filter.sample_rates[key] = rate
+
+    def set_rate_limit(self, key: str, per_second: Optional[float]):
+        if per_second is None:
+            self.filter.rate_limits.pop(key, None)
+        else:
+            self.filter.rate_limits[key] = per_second
+
+    def get_stats(self) -> Dict:
+        return {
+            'async': self.handler is not None,
+            'queued': self.queue.qsize() if self.queue is not None else 0,
+            'dropped_queue_full': self.handler.dropped if self.handler is not None else 0,
+            'csv_debug': logging.getLogger(CSV_LOGGER_NAME).level == logging.DEBUG,
+            'sample_rates': dict(self.filter.sample_rates),
+            'rate_limits': dict(self.filter.rate_limits),
+            **self.filter.stats,
+        }
+
+
+# Shared controls for the serving process
+log_controls = LogControls()
+
+__all__ = ['LogControls', 'JSONFormatter', 'SamplingFilter', 'log_controls', 'CSV_LOGGER_NAME']
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+🧊 WORKER MEMORY BENCHMARK - independent workers vs preload + fork
+Starts N workers each way, lets every worker serve a few CSV lookups, then
+reads /proc/<pid>/smaps_rollup (Linux) for RSS, PSS and USS (private) memory.
+
+    independent : every worker imports smart_llm_chatbot itself
+    preload     : one master imports it and runs preload_for_workers(), then
+                  forks workers that call reinit_after_fork() (the gunicorn.conf.py path)
+
+USS is what each extra worker really costs; PSS splits shared pages fairly.
+
+Run:
+    python benchmarks/bench_fork_memory.py [--workers 4] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+WARM_MESSAGES = [
+    "how can you help my restaurant",
+    "what does website development include",
+    "do you offer social media marketing packages",
+    "i need a chatbot for my clinic",
+]
+
+
+def read_memory(pid: int) -> dict:
+    """RSS / PSS / USS in MB from smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'uss_mb': round(uss / 1024, 1),
+    }
+
+
+def serve_a_little():
+    """Simulate a worker handling its first requests"""
+    import smart_llm_chatbot
+    for message in WARM_MESSAGES:
+        smart_llm_chatbot.intelligent_chatbot.detect_business_type(message)
+        smart_llm_chatbot.intelligent_chatbot.csv_handler.find_similar_response(message)
+
+
+def _summarize(mode: str, samples: list) -> dict:
+    count = len(samples)
+    return {
+        'mode': mode,
+        'workers': count,
+        'per_worker': samples,
+        'avg_rss_mb': round(sum(s['rss_mb'] for s in samples) / count, 1),
+        'avg_pss_mb': round(sum(s['pss_mb'] for s in samples) / count, 1),
+        'avg_uss_mb': round(sum(s['uss_mb'] for s in samples) / count, 1),
+    }
+
+
+def run_independent(workers: int) -> dict:
+    procs = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker'], cwd=ROOT,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(workers)
+    ]
+    try:
+        for proc in procs:
+            # Importing the chatbot prints status lines; wait for the worker's own marker
+            while proc.stdout.readline().strip() != b'ready':
+                pass
+        return _summarize('independent', [read_memory(proc.pid) for proc in procs])
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+
+def run_preload(workers: int) -> dict:
+    """Must run in a fresh interpreter (see main) so nothing else is imported first"""
+    import smart_llm_chatbot
+    smart_llm_chatbot.preload_for_workers()
+    master = read_memory(os.getpid())
+
+    children = []
+    for _ in range(workers):
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            smart_llm_chatbot.reinit_after_fork()
+            serve_a_little()
+            os.write(ready_w, b'1')
+            while True:
+                time.sleep(3600)
+        os.close(ready_w)
+        children.append((pid, ready_r))
+    try:
+        for _, ready_r in children:
+            os.read(ready_r, 1)
+        result = _summarize('preload', [read_memory(pid) for pid, _ in children])
+        result['master'] = master
+        return result
+    finally:
+        for pid, _ in children:
+            os.kill(pid, 9)
+            os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory: independent vs preload/fork")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--preload-only', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # data.csv and config/ are resolved relative to the repo
+    if args.worker:
+        serve_a_little()
+        print('ready', flush=True)
+        sys.stdin.read()
+        return
+    if args.preload_only:
+        print(json.dumps(run_preload(args.workers)), flush=True)
+        return
+
+    preload = subprocess.run([sys.executable, os.path.abspath(__file__), '--preload-only',
+                              '--workers', str(args.workers)], cwd=ROOT, capture_output=True, text=True, check=True)
+    result = {
+        'benchmark': 'worker_memory',
+        'independent': run_independent(args.workers),
+        'preload': json.loads(preload.stdout.strip().splitlines()[-1]),
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
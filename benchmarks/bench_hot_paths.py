@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+🏁 HOT PATH BENCHMARK SUITE
+Times the chatbot's per-request hot paths over fixed input corpora and writes
+one JSON document per run (tagged with the git commit) so runs can be
+compared across commits.
+
+    detect_business_type / map_subservice_to_service / detect_subservice_intent
+    find_similar_response            at several CSV sizes (rows resampled from data.csv),
+                                     plus the batch find_similar_responses
+    _post_process_response           golden corpus of Gemini outputs
+    customize_response_for_business  every tenant profile in config/
+    chat_e2e                         POST /chat against mock_llm_server (no real LLM calls)
+
+Run:
+    python benchmarks/bench_hot_paths.py [--repeat 5] [--only csv,chat_e2e] [--output results.json]
+    python benchmarks/bench_hot_paths.py --compare before.json after.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+CORPUS_PATH = os.path.join(ROOT, 'benchmarks', 'corpora', 'hot_path_messages.json')
+GOLDEN_PATH = os.path.join(ROOT, 'benchmarks', 'corpora', 'post_process_golden.json')
+SUITE_VERSION = 1
+DEFAULT_CSV_SIZES = '100,full,2500,10000'
+GROUPS = ('classification', 'csv', 'formatting', 'chat_e2e')
+REGRESSION_THRESHOLD = 1.10  # --compare flags metrics that got >10% slower
+COMPARED_METRICS = ('us_per_call_median', 'p50_ms', 'p95_ms')
+
+
+def _load_json(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _git_commit() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return {'commit': commit, 'dirty': dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def time_calls(fn, inputs: list, repeat: int) -> dict:
+    """Call fn(*args) for every input, `repeat` rounds; per-call microseconds across rounds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in inputs:
+            fn(*args)
+        samples.append((time.perf_counter() - start) / len(inputs) * 1e6)
+    return {
+        'calls': len(inputs),
+        'repeat': repeat,
+        'us_per_call_median': round(statistics.median(samples), 3),
+        'us_per_call_min': round(min(samples), 3),
+        'us_per_call_max': round(max(samples), 3),
+    }
+
+
+def start_mock_providers(profile: str):
+    """Point Gemini/OpenRouter at a local mock before smart_llm_chatbot is imported"""
+    import mock_llm_server
+    server, url = mock_llm_server.start_in_thread(profiles=mock_llm_server.PRESET_PROFILES[profile], seed=1)
+    os.environ['GEMINI_API_ENDPOINT'] = url
+    os.environ['OPENROUTER_API_URL'] = url + '/api/v1/chat/completions'
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    return server
+
+
+def bench_classification(chatbot, messages: list, repeat: int) -> dict:
+    inputs = [(message,) for message in messages]
+    return {
+        'detect_business_type': time_calls(chatbot.detect_business_type, inputs, repeat),
+        'map_subservice_to_service': time_calls(chatbot.map_subservice_to_service, inputs, repeat),
+        'detect_subservice_intent': time_calls(chatbot.detect_subservice_intent, inputs, repeat),
+    }
+
+
+def csv_handler_with_rows(base, rows: int):
+    """Copy of the loaded CSV handler whose training data is resampled to `rows` rows"""
+    from smart_llm_chatbot import preprocess_csv_text
+    rng = random.Random(rows)
+    data = base.training_data if rows == len(base.training_data) else rng.choices(base.training_data, k=rows)
+    handler = copy.copy(base)
+    handler.training_data = list(data)
+    handler.csv_questions = [preprocess_csv_text(row['user_message']) for row in handler.training_data]
+    return handler
+
+
+def bench_csv(chatbot, messages: list, repeat: int, sizes: list) -> dict:
+    base = chatbot.csv_handler
+    if not base.data_loaded:
+        return {'skipped': 'CSV data not loaded'}
+    results = {}
+    for size in sizes:
+        rows = len(base.training_data) if size == 'full' else int(size)
+        handler = csv_handler_with_rows(base, rows)
+        results[f'find_similar_response[{rows}]'] = time_calls(
+            handler.find_similar_response, [(message,) for message in messages], repeat)
+        batch = time_calls(handler.find_similar_responses, [(messages,)], repeat)
+        batch['us_per_call_median'] = round(batch['us_per_call_median'] / len(messages), 3)  # Per message
+        batch['us_per_call_min'] = round(batch['us_per_call_min'] / len(messages), 3)
+        batch['us_per_call_max'] = round(batch['us_per_call_max'] / len(messages), 3)
+        batch['calls'] = len(messages)
+        results[f'find_similar_responses_batch[{rows}]'] = batch
+    return results
+
+
+def bench_formatting(chatbot, repeat: int, customize_cases: list) -> dict:
+    golden = _load_json(GOLDEN_PATH)['cases']
+    post_process = [(case['response'], 'general', case['context'], case['conversation_count']) for case in golden]
+    results = {
+        '_post_process_response': time_calls(chatbot.gemini_handler._post_process_response, post_process, repeat),
+    }
+    try:
+        from multi_tenant_chatbot import multi_tenant_manager
+    except Exception as e:
+        results['customize_response_for_business'] = {'skipped': f'multi-tenant profiles unavailable: {e}'}
+        return results
+    customize = [(case['expected'], tenant['business_id'], tenant['context'])
+                 for tenant in customize_cases for case in golden]
+    results['customize_response_for_business'] = time_calls(
+        multi_tenant_manager.customize_response_for_business, customize, repeat)
+    return results
+
+
+def bench_chat_e2e(app, messages: list, repeat: int, turns_per_session: int = 5) -> dict:
+    """Sequential /chat requests, grouped into multi-turn sessions"""
+    client = app.test_client()
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    for round_index in range(repeat):
+        for i, message in enumerate(messages):
+            session_id = f"bench-{round_index}-{i // turns_per_session}"
+            t0 = time.perf_counter()
+            response = client.post('/chat', json={'message': message, 'user_context': {'session_id': session_id}})
+            latencies.append((time.perf_counter() - t0) * 1000)
+            source = response.get_json().get('llm_used') or f'http_{response.status_code}'
+            statuses[source] = statuses.get(source, 0) + 1
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def pct(q):
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)
+
+    return {'chat_e2e': {
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': pct(0.5),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'max_ms': round(latencies[-1], 3),
+        'by_source': statuses,
+    }}
+
+
+def run(repeat: int, only: list, csv_sizes: list, mock_profile: str) -> dict:
+    corpus = _load_json(CORPUS_PATH)
+    messages = corpus['messages']
+    server = start_mock_providers(mock_profile)
+    try:
+        import smart_llm_chatbot
+        chatbot = smart_llm_chatbot.get_intelligent_chatbot()
+        chatbot.csv_handler.find_similar_response('warm up')  # sklearn import is not part of any benchmark
+
+        results = {}
+        if 'classification' in only:
+            results.update(bench_classification(chatbot, messages, repeat))
+        if 'csv' in only:
+            results.update(bench_csv(chatbot, messages, max(1, repeat // 2), csv_sizes))
+        if 'formatting' in only:
+            results.update(bench_formatting(chatbot, repeat, corpus['customize_cases']))
+        if 'chat_e2e' in only:
+            results.update(bench_chat_e2e(smart_llm_chatbot.app, messages, max(1, repeat // 2)))
+    finally:
+        server.shutdown()
+
+    return {
+        'suite': 'hot_paths',
+        'suite_version': SUITE_VERSION,
+        'corpus_version': corpus['version'],
+        **_git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'mock_profile': mock_profile,
+        'results': results,
+    }
+
+
+def compare(before: dict, after: dict) -> list:
+    """Rows of (benchmark, metric, before, after, ratio, regression) for metrics present in both runs"""
+    rows = []
+    for name, old in sorted(before['results'].items()):
+        new = after['results'].get(name)
+        if not new:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric in old and metric in new and old[metric]:
+                ratio = new[metric] / old[metric]
+                rows.append((name, metric, old[metric], new[metric], round(ratio, 3), ratio > REGRESSION_THRESHOLD))
+    return rows
+
+
+def print_comparison(before: dict, after: dict):
+    print(f"before: {before.get('commit')}  after: {after.get('commit')}")
+    if before.get('corpus_version') != after.get('corpus_version'):
+        print("⚠️ Corpus versions differ; numbers are not directly comparable")
+    for name, metric, old, new, ratio, regression in compare(before, after):
+        flag = '  ⚠️ slower' if regression else ''
+        print(f"{name:45s} {metric:20s} {old:>12} -> {new:>12}  x{ratio}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chatbot hot path benchmark suite")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', default=','.join(GROUPS), help=f"Comma-separated subset of {', '.join(GROUPS)}")
+    parser.add_argument('--csv-sizes', default=DEFAULT_CSV_SIZES, help="CSV row counts ('full' = data.csv as is)")
+    parser.add_argument('--mock-profile', default='fast', help="mock_llm_server preset for chat_e2e")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        print_comparison(_load_json(args.compare[0]), _load_json(args.compare[1]))
+        return
+
+    os.chdir(ROOT)  # data.csv and config/ are resolved relative to the repo
+    only = [group.strip() for group in args.only.split(',') if group.strip()]
+    sizes = [size.strip() for size in args.csv_sizes.split(',') if size.strip()]
+    result = run(args.repeat, only, sizes, args.mock_profile)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
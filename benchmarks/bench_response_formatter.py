@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+⏱️ RESPONSE FORMATTER MICRO-BENCHMARK
+Times ResponseFormatter.format over the golden corpus so formatting cost can be
+tracked as rules are added.
+
+Run:
+    python benchmarks/bench_response_formatter.py [--repeat 20] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from response_formatter import response_formatter
+
+CORPUS_PATH = os.path.join(ROOT, 'benchmarks', 'corpora', 'post_process_golden.json')
+
+
+def run(repeat: int = 20) -> dict:
+    with open(CORPUS_PATH, 'r', encoding='utf-8') as f:
+        cases = json.load(f)['cases']
+
+    fmt = response_formatter.format
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for case in cases:
+            fmt(case['response'], case['context'], case['conversation_count'])
+        samples.append((time.perf_counter() - start) / len(cases) * 1e6)
+
+    return {
+        'benchmark': 'response_formatter.format',
+        'cases': len(cases),
+        'repeat': repeat,
+        'us_per_call_median': round(statistics.median(samples), 3),
+        'us_per_call_min': round(min(samples), 3),
+        'us_per_call_max': round(max(samples), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response formatter micro-benchmark")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.repeat)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+🧠 SESSION MEMORY BENCHMARK
+Measures the resident cost of one live conversation session by creating many
+ConversationContext objects with realistic multi-turn history and diffing
+tracemalloc before and after, so per-session memory can be compared across
+commits.
+
+Run:
+    python benchmarks/bench_session_memory.py [--sessions 20000] [--turns 6] [--output results.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from smart_llm_chatbot import ConversationContext
+
+USER_MESSAGES = [
+    "I run a small bakery and need a website",
+    "How much does a website cost?",
+    "Do you also do social media marketing?",
+    "Can you help with online ordering?",
+    "What about a chatbot for customer questions?",
+    "How long would it take to launch?",
+]
+
+BOT_RESPONSES = [
+    "For your bakery, a website with online ordering and a menu showcase works well. "
+    "Would you like to schedule a free consultation?",
+    "Pricing depends on pages and features; we tailor packages to small businesses. Interested in learning more?",
+    "Yes! We create social media content and run targeted campaigns for local businesses.",
+    "Absolutely, we integrate online ordering with payment processing and pickup scheduling.",
+    "Our chatbots answer FAQs, take orders and book appointments around the clock.",
+    "Most small business websites launch in 2-4 weeks depending on content readiness.",
+]
+
+
+def build_session(index: int, turns: int) -> ConversationContext:
+    context = ConversationContext(business_type='bakery')
+    for turn in range(turns):
+        # Unique strings per session, as real traffic would produce
+        context.add_conversation_turn(
+            f"{USER_MESSAGES[turn % len(USER_MESSAGES)]} ({index})",
+            f"{BOT_RESPONSES[turn % len(BOT_RESPONSES)]} ({index})",
+            'gemini'
+        )
+    return context
+
+
+def run(sessions: int = 20000, turns: int = 6) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    live = [build_session(i, turns) for i in range(sessions)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Message text is needed regardless of layout; report container overhead separately
+    text_bytes = sum(
+        sys.getsizeof(turn['user_message']) + sys.getsizeof(turn['bot_response'])
+        for context in live for turn in context.conversation_history
+    )
+    total = after - before
+    return {
+        'benchmark': 'conversation_context.memory',
+        'sessions': sessions,
+        'turns_per_session': turns,
+        'bytes_per_session': round(total / sessions, 1),
+        'overhead_bytes_per_session': round((total - text_bytes) / sessions, 1),
+        'build_us_per_session': round(elapsed / sessions * 1e6, 3),
+        'sessions_per_gb': int(1024 ** 3 / (total / sessions)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-session memory benchmark")
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--turns', type=int, default=6)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.sessions, args.turns)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
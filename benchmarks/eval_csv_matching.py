@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+🎯 CSV MATCHING EVALUATION - Accuracy vs latency of CSV thresholds and matchers
+Scores a labeled set of paraphrased questions (benchmarks/corpora/csv_paraphrases.json)
+against data.csv with several matcher variants, then sweeps the similarity
+threshold for each. A match is correct when the matched row's response is the
+expected row's response; out-of-domain questions (expected null) should not match.
+
+    tfidf_refit   production find_similar_response: vectorizer refitted per query
+    tfidf_prefit  production vectorizer settings, fitted once on the CSV questions
+    tfidf_word12  word 1-2 grams, no vocabulary cap
+    tfidf_char    character 3-5 grams (robust to typos and inflections)
+    hybrid        mean of tfidf_prefit and tfidf_char similarities
+    embeddings    all-MiniLM-L6-v2 sentence embeddings (needs sentence-transformers)
+
+Per variant and threshold: precision, recall, hit rate (share of questions the
+CSV answers, i.e. LLM calls saved) and false-match rate on out-of-domain
+questions; per variant: per-query latency and index memory (tracemalloc, so
+model weights held outside Python allocators are not counted). The recommended
+setting is the highest hit rate with precision >= --min-precision; apply it
+with CSV_MATCH_THRESHOLD.
+
+Run:
+    python benchmarks/eval_csv_matching.py [--variants tfidf_refit,hybrid] [--min-precision 0.9] [--output results.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+DATASET_PATH = os.path.join(ROOT, 'benchmarks', 'corpora', 'csv_paraphrases.json')
+DEFAULT_THRESHOLDS = '0.3,0.35,0.4,0.45,0.5,0.55,0.6,0.65,0.7,0.75,0.8,0.85,0.9'
+HYBRID_WORD_WEIGHT = 0.5
+
+
+def _production_vectorizer():
+    from smart_llm_chatbot import CSVTrainingDataHandler
+    return CSVTrainingDataHandler._make_vectorizer()
+
+
+def _prefit(vectorizer, questions):
+    """Fit once on the CSV questions; queries are only transformed"""
+    from sklearn.metrics.pairwise import cosine_similarity
+    matrix = vectorizer.fit_transform(questions)
+    return lambda query: cosine_similarity(vectorizer.transform([query]), matrix).ravel()
+
+
+def build_tfidf_refit(questions):
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    def similarities(query):
+        matrix = _production_vectorizer().fit_transform(questions + [query])
+        return cosine_similarity(matrix[-1], matrix[:-1]).ravel()
+    return similarities
+
+
+def build_tfidf_prefit(questions):
+    return _prefit(_production_vectorizer(), questions)
+
+
+def build_tfidf_word12(questions):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return _prefit(TfidfVectorizer(stop_words='english', ngram_range=(1, 2), sublinear_tf=True,
+                                   token_pattern=r'\b\w+\b'), questions)
+
+
+def build_tfidf_char(questions):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return _prefit(TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), sublinear_tf=True), questions)
+
+
+def build_hybrid(questions):
+    word = build_tfidf_prefit(questions)
+    char = build_tfidf_char(questions)
+    return lambda query: HYBRID_WORD_WEIGHT * word(query) + (1 - HYBRID_WORD_WEIGHT) * char(query)
+
+
+def build_embeddings(questions):
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    matrix = model.encode(questions, normalize_embeddings=True)
+    return lambda query: np.dot(matrix, model.encode([query], normalize_embeddings=True)[0])
+
+
+VARIANTS = {
+    'tfidf_refit': build_tfidf_refit,
+    'tfidf_prefit': build_tfidf_prefit,
+    'tfidf_word12': build_tfidf_word12,
+    'tfidf_char': build_tfidf_char,
+    'hybrid': build_hybrid,
+    'embeddings': build_embeddings,
+}
+
+
+def score_variant(build, questions, queries):
+    """(best row, best similarity) per query, plus per-query latency and retained index memory"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    similarities = build(questions)
+    gc.collect()
+    index_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    similarities(queries[0])  # Lazy imports and caches are not part of the latency
+    best, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = similarities(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        row = int(scores.argmax())
+        best.append((row, float(scores[row])))
+    latencies.sort()
+    return best, {
+        'index_bytes': max(0, index_bytes),
+        'latency_ms_median': round(statistics.median(latencies), 3),
+        'latency_ms_p95': round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3),
+    }
+
+
+def sweep(best, items, responses, expected_rows, thresholds):
+    """Precision / recall / hit rate / false-match rate at every threshold"""
+    positives = sum(1 for item in items if item['expected'] is not None)
+    negatives = len(items) - positives
+    rows = []
+    for threshold in thresholds:
+        matched = correct = false_matches = 0
+        for item, expected_row, (row, score) in zip(items, expected_rows, best):
+            if score < threshold:
+                continue
+            matched += 1
+            if expected_row is None:
+                false_matches += 1
+            elif responses[row] == responses[expected_row]:
+                correct += 1
+        rows.append({
+            'threshold': threshold,
+            'precision': round(correct / matched, 4) if matched else 1.0,
+            'recall': round(correct / positives, 4) if positives else 0.0,
+            'hit_rate': round(matched / len(items), 4),
+            'false_match_rate': round(false_matches / negatives, 4) if negatives else 0.0,
+        })
+    return rows
+
+
+def recommend(rows, min_precision):
+    """Highest hit rate with precision >= min_precision (higher threshold on ties)"""
+    eligible = [row for row in rows if row['precision'] >= min_precision and row['hit_rate'] > 0]
+    return max(eligible, key=lambda row: (row['hit_rate'], row['threshold'])) if eligible else None
+
+
+def evaluate(variant_names, thresholds, min_precision, dataset_path=DATASET_PATH):
+    from smart_llm_chatbot import CSV_MATCH_THRESHOLD, CSVTrainingDataHandler, preprocess_csv_text
+
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+    handler = CSVTrainingDataHandler()
+    if not handler.data_loaded:
+        raise SystemExit("❌ data.csv could not be loaded")
+    questions = handler.csv_questions
+    responses = [row['response'] for row in handler.training_data]
+    first_row = {}
+    for index, row in enumerate(handler.training_data):
+        first_row.setdefault(row['user_message'], index)
+
+    items = dataset['items']
+    unknown = [item['expected'] for item in items if item['expected'] is not None and item['expected'] not in first_row]
+    if unknown:
+        raise SystemExit(f"❌ Labels not found in data.csv: {unknown}")
+    expected_rows = [None if item['expected'] is None else first_row[item['expected']] for item in items]
+    queries = [preprocess_csv_text(item['query']) for item in items]
+
+    # Imported up front so module import memory is not counted as index memory
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.metrics.pairwise  # noqa: F401
+
+    results = {}
+    for name in variant_names:
+        try:
+            best, cost = score_variant(VARIANTS[name], questions, queries)
+        except ImportError as e:
+            results[name] = {'skipped': f"missing dependency: {e.name}"}
+            continue
+        rows = sweep(best, items, responses, expected_rows, thresholds)
+        results[name] = {**cost, 'sweep': rows, 'recommended': recommend(rows, min_precision)}
+
+    return {
+        'dataset_version': dataset['version'],
+        'items': len(items),
+        'csv_rows': len(questions),
+        'current_threshold': CSV_MATCH_THRESHOLD,
+        'min_precision': min_precision,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'variants': results,
+    }
+
+
+def print_report(report):
+    print(f"🎯 {report['items']} labeled questions vs {report['csv_rows']} CSV rows "
+          f"(current CSV_MATCH_THRESHOLD={report['current_threshold']})")
+    for name, result in report['variants'].items():
+        if 'skipped' in result:
+            print(f"\n{name}: skipped ({result['skipped']})")
+            continue
+        print(f"\n{name}: {result['latency_ms_median']}ms/query median, p95 {result['latency_ms_p95']}ms, "
+              f"index {result['index_bytes'] / 1024:.0f} KiB")
+        print("  threshold  precision  recall  hit_rate  false_match")
+        for row in result['sweep']:
+            print(f"  {row['threshold']:9.2f}  {row['precision']:9.3f}  {row['recall']:6.3f}  "
+                  f"{row['hit_rate']:8.3f}  {row['false_match_rate']:11.3f}")
+        best = result['recommended']
+        print(f"  ✅ recommended: {best['threshold']} (hit rate {best['hit_rate']}, precision {best['precision']})"
+              if best else f"  ⚠️ no threshold reaches precision {report['min_precision']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV matching accuracy vs latency evaluation")
+    parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Comma-separated subset of {', '.join(VARIANTS)}")
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--min-precision', type=float, default=0.9)
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    variant_names = [name.strip() for name in args.variants.split(',') if name.strip()]
+    unknown = [name for name in variant_names if name not in VARIANTS]
+    if unknown:
+        parser.error(f"Unknown variants: {', '.join(unknown)}")
+    thresholds = [float(value) for value in args.thresholds.split(',')]
+
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.chdir(ROOT)  # CSV_DATA_PATH is relative to the repo
+    report = evaluate(variant_names, thresholds, args.min_precision, os.path.abspath(args.dataset))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+💬 LLM CHAT SESSION POOL
+Bounded pool of provider chat sessions keyed by conversation id, with LRU
+eviction and idle expiry. Used by GeminiChatbotHandler's incremental mode so
+follow-up turns only send the new message plus a short stage hint.
+
+Provider chat sessions are not thread-safe, so use() also holds a per-session
+lock: concurrent requests for one conversation take turns, others don't wait.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class ChatSessionPool:
+    """Thread-safe LRU pool of opaque chat session objects with idle TTL"""
+
+    def __init__(self, max_sessions: int = 500, idle_ttl: float = 900.0):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()  # id -> [session, last_used, lock]
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'created': 0, 'evicted_lru': 0, 'evicted_idle': 0, 'dropped': 0}
+
+    def _expire_idle(self, now: float):
+        # Oldest entries sit at the front, so stop at the first live one
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if now - entry[1] <= self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            self.stats['evicted_idle'] += 1
+
+    def _touch(self, session_id: str) -> Optional[list]:
+        now = time.time()
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            entry[1] = now
+            self._sessions.move_to_end(session_id)
+            self.stats['hits'] += 1
+            return entry
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return the live session for an id, or None if new/evicted/expired"""
+        entry = self._touch(session_id)
+        return entry[0] if entry is not None else None
+
+    @contextmanager
+    def use(self, session_id: str) -> Iterator[Optional[Any]]:
+        """Hold a session exclusively while sending a turn; yields None if there is no live session"""
+        entry = self._touch(session_id)
+        if entry is None:
+            yield None
+            return
+        with entry[2]:
+            with self._lock:
+                # Dropped or replaced while we waited for the previous turn
+                current = self._sessions.get(session_id) is entry
+            yield entry[0] if current else None
+
+    def put(self, session_id: str, session: Any):
+        """Store a session, evicting the least recently used one when full"""
+        now = time.time()
+        with self._lock:
+            self._expire_idle(now)
+            if session_id not in self._sessions:
+                self.stats['created'] += 1
+            self._sessions[session_id] = [session, now, threading.Lock()]
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats['evicted_lru'] += 1
+
+    def drop(self, session_id: str):
+        """Forget a session (e.g. after a provider error)"""
+        with self._lock:
+            if self._sessions.pop(session_id, None) is not None:
+                self.stats['dropped'] += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl_seconds': self.idle_ttl,
+                **self.stats,
+            }
+
+
+__all__ = ['ChatSessionPool']
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+📤 CONVERSATION EXPORT - Streaming export of conversations to XLSX, CSV or Parquet
+Replaces building src/exports/chatbot_conversations.xlsx in memory in one go.
+Records are read one at a time and written in fixed-size batches, so memory
+stays flat however many conversations there are:
+
+    sources   JSON-lines logs (conversation_log.py, rotated .gz files included),
+              the legacy conversations.json array (parsed incrementally) or a
+              MongoDB cursor (pymongo, optional)
+    xlsx      openpyxl write-only workbook; a new sheet every 1,048,576 rows
+    csv       written batch by batch
+    parquet   one row group per batch (pyarrow, optional)
+
+Filters: --since / --until (epoch, ISO 8601 or relative like 30d) and
+--business (comma-separated business types, pushed down to the Mongo query).
+The output is written to <output>.tmp and renamed when complete.
+
+Run:
+    python conversation_export.py --source 'logs/conversations*.jsonl*' --output exports/conversations.xlsx --since 30d
+    python conversation_export.py --source Techrypt_sourcecode/Techrypt/src/database/conversations.json --output conversations.csv
+    python conversation_export.py --mongo --business restaurant,fitness --output conversations.parquet
+"""
+
+import csv
+import glob
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from conversation_store import parse_time
+from startup_report import current_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_EXPORT_BATCH_SIZE = int(os.getenv('CONVERSATION_EXPORT_BATCH_SIZE', '5000'))
+MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'techrypt_chatbot')
+
+# (record field, XLSX header, XLSX column width) - same layout as the old chatbot_conversations.xlsx
+COLUMNS = (
+    ('timestamp', 'Timestamp', 21),
+    ('user_name', 'User Name', 25),
+    ('user_message', 'User Message', 50),
+    ('bot_response', 'Bot Response', 50),
+    ('business_type', 'Business Type', 23),
+    ('intent', 'Intent', 22),
+    ('response_time', 'Response Time', 15),
+    ('model', 'Model Used', 30),
+    ('session_id', 'Session ID', 12),
+)
+FIELDS = tuple(field for field, _, _ in COLUMNS)
+FORMATS = ('xlsx', 'csv', 'parquet')
+
+_ARRAY_SEPARATORS = ' \t\r\n,'
+
+
+def _unwrap(value):
+    """mongoexport wraps ids and dates: {"$oid": ...} / {"$date": ...}"""
+    if isinstance(value, dict) and len(value) == 1 and next(iter(value)).startswith('$'):
+        return next(iter(value.values()))
+    return value
+
+
+def _iter_json_array(f, buffer: str = '', chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Yield the elements of a JSON array one at a time without reading the whole file"""
+    decoder = json.JSONDecoder()
+    pos, eof, started = 0, False, False
+    while True:
+        while pos < len(buffer) and buffer[pos] in _ARRAY_SEPARATORS:
+            pos += 1
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("not a JSON array")
+                started, pos = True, pos + 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"invalid JSON array element: {e}")
+            else:
+                yield record
+                continue
+        elif eof:
+            if started:
+                raise ValueError("JSON array is not closed")
+            return
+        chunk = f.read(chunk_size)
+        buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+
+def iter_file_records(path: str) -> Iterator[Dict]:
+    """Records from a JSON-lines file (optionally gzipped) or a JSON array file"""
+    opener = gzip.open if path.endswith('.gz') else open
+    bad = 0
+    with opener(path, 'rt', encoding='utf-8') as f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        if head == '[':
+            try:
+                yield from _iter_json_array(f, head)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}")
+            return
+        for line in _prepend(head, f):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                bad += 1
+                continue
+            if isinstance(record, dict):
+                yield record
+    if bad:
+        logger.warning(f"⚠️ {bad} unreadable lines skipped in {path}")
+
+
+def _prepend(head: str, f) -> Iterator[str]:
+    first = head + f.readline()
+    if first:
+        yield first
+    yield from f
+
+
+def iter_source_records(pattern: str) -> Iterator[Dict]:
+    """Records from every file matching the glob, oldest first (rotated files before the live one)"""
+    paths = sorted((path for path in glob.glob(pattern) if os.path.isfile(path)), key=os.path.getmtime)
+    if not paths:
+        raise FileNotFoundError(f"No conversation files match {pattern}")
+    for path in paths:
+        yield from iter_file_records(path)
+
+
+def iter_mongo_records(uri: str = MONGODB_URI, database: str = MONGODB_DATABASE, collection: str = 'conversations',
+                       business_types: Optional[Iterable[str]] = None,
+                       batch_size: int = CONVERSATION_EXPORT_BATCH_SIZE, client=None) -> Iterator[Dict]:
+    """Stream a MongoDB collection with a server-side cursor fetching batch_size documents at a time"""
+    owns_client = client is None
+    if owns_client:
+        try:
+            from pymongo import MongoClient
+        except ImportError:
+            raise RuntimeError("MongoDB export needs pymongo (pip install pymongo)")
+        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    query = {'business_type': {'$in': list(business_types)}} if business_types else {}
+    try:
+        cursor = client[database][collection].find(query, batch_size=batch_size)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+    finally:
+        if owns_client:
+            client.close()
+
+
+def _record_time(value) -> Optional[float]:
+    value = _unwrap(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return parse_time(value)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _cell(field: str, value) -> Optional[str]:
+    value = _unwrap(value)
+    if value is None or value == '':
+        return None
+    if field == 'timestamp':
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(value)
+
+
+def export_row(record: Dict) -> List[Optional[str]]:
+    """One output row (FIELDS order); the session id may also live in user_context"""
+    if not record.get('session_id') and isinstance(record.get('user_context'), dict):
+        record = {**record, 'session_id': record['user_context'].get('session_id')}
+    return [_cell(field, record.get(field)) for field in FIELDS]
+
+
+class CsvExportWriter:
+    """CSV with a header row of record field names"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FIELDS)
+
+    def write_batch(self, rows: List[List]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxExportWriter:
+    """openpyxl write-only workbook: rows are streamed to disk instead of kept as cell objects"""
+
+    max_rows = 1048576  # Excel's sheet limit, header row included
+
+    def __init__(self, path: str, title: str = 'Conversations'):
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        self.path = path
+        self.title = title
+        self._illegal = ILLEGAL_CHARACTERS_RE
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheets = 0
+
+    def _new_sheet(self):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+        self._sheets += 1
+        title = self.title if self._sheets == 1 else f"{self.title} {self._sheets}"
+        self._sheet = self._workbook.create_sheet(title)
+        for index, (_, _, width) in enumerate(COLUMNS, start=1):
+            self._sheet.column_dimensions[get_column_letter(index)].width = width
+        self._sheet.freeze_panes = 'A2'
+        header = []
+        for _, title, _ in COLUMNS:
+            cell = WriteOnlyCell(self._sheet, value=title)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self._sheet.append(header)
+        self._sheet_rows = 1
+
+    def _value(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        # Control characters make the workbook unreadable; cells hold at most 32,767 characters
+        return self._illegal.sub('', value)[:32767]
+
+    def write_batch(self, rows: List[List]):
+        for row in rows:
+            if self._sheet is None or self._sheet_rows >= self.max_rows:
+                self._new_sheet()
+            self._sheet.append([self._value(value) for value in row])
+            self._sheet_rows += 1
+
+    def close(self):
+        if self._sheet is None:
+            self._new_sheet()  # Header-only workbook rather than an empty, invalid one
+        self._workbook.save(self.path)
+
+
+class ParquetExportWriter:
+    """Parquet file with one row group per batch, all columns strings"""
+
+    def __init__(self, path: str, compression: str = 'snappy'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self._schema = pa.schema([(field, pa.string()) for field in FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema, compression=compression)
+
+    def write_batch(self, rows: List[List]):
+        columns = [self._pa.array(column, type=self._pa.string()) for column in zip(*rows)]
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {'xlsx': XlsxExportWriter, 'csv': CsvExportWriter, 'parquet': ParquetExportWriter}
+
+
+def export_format(path: str) -> str:
+    """Output format from the file extension"""
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r} (use .{', .'.join(FORMATS)})")
+    return fmt
+
+
+def export_conversations(records: Iterable[Dict], output: str, fmt: Optional[str] = None, since=None, until=None,
+                         business_types: Optional[Iterable[str]] = None,
+                         batch_size: int = CONVERSATION_EXPORT_BATCH_SIZE,
+                         progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Filter and write records batch by batch; progress(stats) is called after every batch"""
+    fmt = fmt or export_format(output)
+    if fmt not in WRITERS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    since, until = parse_time(since), parse_time(until)
+    business_types = set(business_types) if business_types else None
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    stats = {'path': output, 'format': fmt, 'scanned': 0, 'exported': 0, 'batches': 0, 'seconds': 0.0,
+             'rss_bytes': current_rss_bytes()}
+    start = time.perf_counter()
+    temp_path = output + '.tmp'
+    writer = WRITERS[fmt](temp_path)
+    try:
+        batch = []
+        for record in records:
+            stats['scanned'] += 1
+            if business_types is not None and record.get('business_type') not in business_types:
+                continue
+            if since is not None or until is not None:
+                ts = _record_time(record.get('timestamp'))
+                if ts is None or (since is not None and ts < since) or (until is not None and ts >= until):
+                    continue
+            batch.append(export_row(record))
+            if len(batch) >= batch_size:
+                _write(writer, batch, stats, start, progress)
+                batch = []
+        if batch:
+            _write(writer, batch, stats, start, progress)
+        writer.close()
+    except BaseException:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, output)  # Readers never see a half-written export
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def _write(writer, batch: List[List], stats: Dict, start: float, progress: Optional[Callable[[Dict], None]]):
+    writer.write_batch(batch)
+    stats['exported'] += len(batch)
+    stats['batches'] += 1
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    stats['rss_bytes'] = current_rss_bytes()
+    if progress:
+        progress(stats)
+
+
+def print_progress(stats: Dict):
+    """One-line progress on stderr: rows exported, rows scanned, rate and RSS"""
+    rate = stats['exported'] / stats['seconds'] if stats['seconds'] else 0.0
+    rss = f", RSS {stats['rss_bytes'] / 1048576:.1f} MiB" if stats['rss_bytes'] else ''
+    print(f"\r📤 {stats['exported']:,} rows exported ({stats['scanned']:,} scanned) {rate:,.0f} rows/s{rss}",
+          end='', file=sys.stderr, flush=True)
+
+
+__all__ = ['export_conversations', 'export_row', 'export_format', 'iter_file_records', 'iter_source_records',
+           'iter_mongo_records', 'CsvExportWriter', 'XlsxExportWriter', 'ParquetExportWriter', 'COLUMNS',
+           'FIELDS', 'FORMATS']
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Stream conversations to XLSX, CSV or Parquet")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--source', help="JSON / JSON-lines file or glob (rotated .gz files included)")
+    source.add_argument('--mongo', action='store_true', help="Read the MongoDB conversations collection")
+    parser.add_argument('--mongo-uri', default=MONGODB_URI)
+    parser.add_argument('--mongo-database', default=MONGODB_DATABASE)
+    parser.add_argument('--mongo-collection', default='conversations')
+    parser.add_argument('--output', required=True, help="Output file; .xlsx, .csv or .parquet")
+    parser.add_argument('--format', choices=FORMATS, help="Override the format implied by --output")
+    parser.add_argument('--since', help="Epoch, ISO 8601 or relative (30d, 12h)")
+    parser.add_argument('--until')
+    parser.add_argument('--business', help="Comma-separated business types")
+    parser.add_argument('--batch-size', type=int, default=CONVERSATION_EXPORT_BATCH_SIZE)
+    parser.add_argument('--quiet', action='store_true', help="No progress line")
+    args = parser.parse_args()
+
+    business = [b.strip() for b in args.business.split(',') if b.strip()] if args.business else None
+    if args.mongo:
+        records = iter_mongo_records(args.mongo_uri, args.mongo_database, args.mongo_collection, business,
+                                     args.batch_size)
+    else:
+        records = iter_source_records(args.source)
+    try:
+        result = export_conversations(records, args.output, args.format, args.since, args.until, business,
+                                      args.batch_size, None if args.quiet else print_progress)
+    except (ValueError, RuntimeError, FileNotFoundError) as e:
+        parser.error(str(e))
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"✅ Exported {result['exported']:,} of {result['scanned']:,} conversations to {result['path']} "
+          f"in {result['seconds']:.1f}s")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+🗂️ CONVERSATION LOG - Append-only JSON-lines log of /chat turns
+Replaces rewriting src/database/conversations.json (one JSON array) with one
+JSON object per line. append() only serializes the record into an in-memory
+buffer; a background thread writes the buffer when it reaches
+CONVERSATION_LOG_FLUSH_BYTES or every CONVERSATION_LOG_FLUSH_INTERVAL seconds.
+
+    fsync policy   never (page cache only), interval (at most every
+                   CONVERSATION_LOG_FSYNC_INTERVAL seconds) or always (every flush)
+    rotation       when the file reaches CONVERSATION_LOG_MAX_BYTES or is older than
+                   CONVERSATION_LOG_ROTATE_SECONDS it is renamed to
+                   <name>-YYYYmmdd-HHMMSS.jsonl and gzipped (CONVERSATION_LOG_COMPRESS)
+    workers        '{pid}' in CONVERSATION_LOG_PATH gives each forked worker its own file
+
+If the buffer grows past CONVERSATION_LOG_MAX_BUFFER_BYTES (disk stalled),
+new records are dropped and counted instead of blocking /chat.
+An empty CONVERSATION_LOG_PATH disables the log.
+
+Run (one-time migration of the array file):
+    python conversation_log.py migrate Techrypt_sourcecode/Techrypt/src/database/conversations.json logs/conversations.jsonl
+"""
+
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_LOG_PATH = os.getenv('CONVERSATION_LOG_PATH', '')
+CONVERSATION_LOG_FLUSH_BYTES = int(os.getenv('CONVERSATION_LOG_FLUSH_BYTES', str(64 * 1024)))
+CONVERSATION_LOG_FLUSH_INTERVAL = float(os.getenv('CONVERSATION_LOG_FLUSH_INTERVAL', '1.0'))
+CONVERSATION_LOG_FSYNC = os.getenv('CONVERSATION_LOG_FSYNC', 'interval')  # never | interval | always
+CONVERSATION_LOG_FSYNC_INTERVAL = float(os.getenv('CONVERSATION_LOG_FSYNC_INTERVAL', '5.0'))
+CONVERSATION_LOG_MAX_BYTES = int(os.getenv('CONVERSATION_LOG_MAX_BYTES', str(100 * 1024 * 1024)))  # 0 = no size rotation
+CONVERSATION_LOG_ROTATE_SECONDS = float(os.getenv('CONVERSATION_LOG_ROTATE_SECONDS', '86400'))  # 0 = no time rotation
+CONVERSATION_LOG_COMPRESS = os.getenv('CONVERSATION_LOG_COMPRESS', 'true').lower() == 'true'
+CONVERSATION_LOG_BACKUP_COUNT = int(os.getenv('CONVERSATION_LOG_BACKUP_COUNT', '0'))  # 0 = keep every rotated file
+CONVERSATION_LOG_MAX_BUFFER_BYTES = int(os.getenv('CONVERSATION_LOG_MAX_BUFFER_BYTES', str(8 * 1024 * 1024)))
+
+FSYNC_POLICIES = ('never', 'interval', 'always')
+
+
+class ConversationLogWriter:
+    """Buffered append-only JSONL writer with fsync policies and rotation"""
+
+    def __init__(self, path: str = CONVERSATION_LOG_PATH, flush_bytes: int = CONVERSATION_LOG_FLUSH_BYTES,
+                 flush_interval: float = CONVERSATION_LOG_FLUSH_INTERVAL, fsync: str = CONVERSATION_LOG_FSYNC,
+                 fsync_interval: float = CONVERSATION_LOG_FSYNC_INTERVAL, max_bytes: int = CONVERSATION_LOG_MAX_BYTES,
+                 rotate_seconds: float = CONVERSATION_LOG_ROTATE_SECONDS, compress: bool = CONVERSATION_LOG_COMPRESS,
+                 backup_count: int = CONVERSATION_LOG_BACKUP_COUNT,
+                 max_buffer_bytes: int = CONVERSATION_LOG_MAX_BUFFER_BYTES):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {', '.join(FSYNC_POLICIES)}, got {fsync!r}")
+        self.path_template = path
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.backup_count = backup_count
+        self.max_buffer_bytes = max_buffer_bytes
+        self.stats = {'records': 0, 'dropped': 0, 'flushes': 0, 'fsyncs': 0, 'rotations': 0, 'bytes_written': 0,
+                      'write_errors': 0, 'fsync_errors': 0, 'rotation_errors': 0}
+        self._reset()
+
+    def _reset(self):
+        """Fresh buffer, locks and (lazily started) writer thread for this process"""
+        self._lock = threading.Lock()      # Guards the buffer
+        self._io_lock = threading.Lock()   # Serializes flush/rotate/close
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._file_size = 0
+        self._opened_at = 0.0
+        self._last_fsync = 0.0
+        self._unsynced = False
+        self.path = self.path_template.replace('{pid}', str(os.getpid())) if self.path_template else ''
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path_template)
+
+    def append(self, record: Dict) -> bool:
+        """Queue one record; False when disabled or dropped because the buffer is full"""
+        if not self.enabled:
+            return False
+        line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            if self._buffered_bytes + len(line) > self.max_buffer_bytes:
+                self.stats['dropped'] += 1
+                return False
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+            self.stats['records'] += 1
+            full = self._buffered_bytes >= self.flush_bytes
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='conversation-log', daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # The writer thread must outlive any single failed flush
+                self.stats['write_errors'] += 1
+                logger.error(f"❌ Conversation log flush failed: {e}")
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._file_size = self._file.tell()
+        self._opened_at = time.time()
+
+    def flush(self):
+        """Write buffered records, then fsync and rotate as configured"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            self._buffered_bytes = 0
+        with self._io_lock:
+            if lines:
+                try:
+                    if self._file is None:
+                        self._open()
+                    data = b''.join(lines)
+                    self._file.write(data)
+                    self._file.flush()
+                    self._file_size += len(data)
+                    self._unsynced = True
+                    self.stats['bytes_written'] += len(data)
+                    self.stats['flushes'] += 1
+                except OSError as e:
+                    self.stats['write_errors'] += 1
+                    logger.error(f"❌ Conversation log write failed ({len(lines)} records lost): {e}")
+                    return
+            if self._file is None:
+                return
+            now = time.time()
+            # 'interval' also syncs on idle ticks, so the last writes don't wait for new traffic
+            if self._unsynced and (self.fsync == 'always' or
+                                   (self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval)):
+                self._fsync()
+                self._last_fsync = now  # A failed fsync is retried after the interval, not on every flush
+            if ((self.max_bytes and self._file_size >= self.max_bytes) or
+                    (self.rotate_seconds and self._file_size and now - self._opened_at >= self.rotate_seconds)):
+                try:
+                    self._rotate(now)
+                except OSError as e:
+                    # Appending continues to the current (or reopened) file; rotation is retried next flush
+                    self.stats['rotation_errors'] += 1
+                    logger.error(f"❌ Conversation log rotation failed: {e}")
+
+    def _fsync(self):
+        """fsync the open file; failures are logged and counted, never raised"""
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            self.stats['fsync_errors'] += 1
+            logger.error(f"❌ Conversation log fsync failed: {e}")
+            return
+        self._unsynced = False
+        self.stats['fsyncs'] += 1
+
+    def _rotate(self, now: float):
+        """Close the current file, rename it with a timestamp, optionally gzip it, prune old ones"""
+        if self.fsync != 'never':
+            self._fsync()  # A failed fsync doesn't block rotation
+        self._file.close()
+        self._file = None  # Reopened (appending) by the next flush even if the rename below fails
+        self._unsynced = False
+        base, ext = os.path.splitext(self.path)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now))
+        rotated = f"{base}-{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + '.gz'):
+            rotated = f"{base}-{stamp}.{suffix}{ext}"
+            suffix += 1
+        os.replace(self.path, rotated)
+        self.stats['rotations'] += 1
+        if self.compress:
+            try:
+                with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(rotated)
+            except OSError as e:
+                # Keep the uncompressed file rather than a truncated .gz
+                self.stats['rotation_errors'] += 1
+                logger.error(f"❌ Conversation log compression of {rotated} failed: {e}")
+                if os.path.exists(rotated + '.gz'):
+                    os.remove(rotated + '.gz')
+        if self.backup_count:
+            backups = sorted(glob.glob(f"{glob.escape(base)}-*{ext}*"), key=os.path.getmtime)
+            for old in backups[:-self.backup_count]:
+                os.remove(old)
+
+    def close(self):
+        """Stop the writer thread and write everything still buffered"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._stop.clear()  # A later append() starts a new writer thread
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                if self.fsync != 'never' and self._unsynced:
+                    self._fsync()
+                self._file.close()
+                self._file = None
+                self._unsynced = False
+
+    def after_fork(self):
+        """In a forked worker: drop the parent's buffer, thread and file handle"""
+        self._reset()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            buffered = self._buffered_bytes
+        return {'enabled': self.enabled, 'path': self.path, 'fsync': self.fsync, 'buffered_bytes': buffered,
+                **self.stats}
+
+
+def migrate_array_file(source: str, destination: str, overwrite: bool = False) -> int:
+    """One-time conversion of a JSON-array conversations file into JSON lines; returns records written"""
+    if os.path.exists(destination) and os.path.getsize(destination) and not overwrite:
+        raise FileExistsError(f"{destination} already exists and is not empty")
+    with open(source, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    if not isinstance(records, list):
+        raise ValueError(f"{source} does not contain a JSON array")
+    directory = os.path.dirname(destination)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = destination + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, destination)  # Readers never see a half-written file
+    return len(records)
+
+
+# Shared writer for the serving process (disabled unless CONVERSATION_LOG_PATH is set)
+conversation_log = ConversationLogWriter()
+atexit.register(conversation_log.close)
+
+__all__ = ['ConversationLogWriter', 'conversation_log', 'migrate_array_file', 'FSYNC_POLICIES']
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Conversation log tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate = commands.add_parser('migrate', help="Convert a JSON-array conversations file to JSON lines")
+    migrate.add_argument('source')
+    migrate.add_argument('destination')
+    migrate.add_argument('--overwrite', action='store_true')
+    args = parser.parse_args()
+    count = migrate_array_file(args.source, args.destination, args.overwrite)
+    print(f"✅ Migrated {count} conversations to {args.destination}")
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+🔎 CONVERSATION STORE - Indexed SQLite copy of the conversation log
+Answers "all conversations from this user" or "everything about restaurants
+last week" without scanning JSON files or an unindexed Mongo collection:
+
+    conversations       one row per turn; indexes on (user_name, ts), (business_type, ts),
+                        (model, ts), (session_id, ts) and ts
+    conversations_fts   FTS5 index over user_message and bot_response (porter stemming)
+    ingest_offsets      bytes already read from each log file, so ingest only reads
+                        lines appended since the last run
+
+Ingest reads the JSONL files written by conversation_log.py (rotated and gzipped
+ones too) and the migrated conversations.json. Only complete lines are consumed.
+Rows are keyed by the record id, so re-reading a file never duplicates rows.
+
+Run:
+    python conversation_store.py ingest [--log 'logs/conversations*.jsonl*'] [--follow]
+    python conversation_store.py query --user Alice --business restaurant --since 7d --text "menu OR ordering"
+    python conversation_store.py stats
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_STORE_PATH = os.getenv('CONVERSATION_STORE_PATH', 'logs/conversations.db')
+INGEST_BATCH_SIZE = 5000
+ORDERS = {
+    'newest': 'c.ts DESC',
+    'oldest': 'c.ts ASC',
+    'relevance': 'bm25(conversations_fts)',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    session_id TEXT,
+    user_name TEXT,
+    user_message TEXT,
+    bot_response TEXT,
+    business_type TEXT,
+    model TEXT,
+    response_time_ms REAL,
+    ts REAL,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_ts ON conversations(user_name, ts);
+CREATE INDEX IF NOT EXISTS idx_conversations_business_ts ON conversations(business_type, ts);
+CREATE INDEX IF NOT EXISTS idx_conversations_model_ts ON conversations(model, ts);
+CREATE INDEX IF NOT EXISTS idx_conversations_session_ts ON conversations(session_id, ts);
+CREATE INDEX IF NOT EXISTS idx_conversations_ts ON conversations(ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+    user_message, bot_response, content='conversations', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+    INSERT INTO conversations_fts(rowid, user_message, bot_response)
+    VALUES (new.rowid, new.user_message, new.bot_response);
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, user_message, bot_response)
+    VALUES ('delete', old.rowid, old.user_message, old.bot_response);
+END;
+CREATE TABLE IF NOT EXISTS ingest_offsets (
+    path TEXT PRIMARY KEY,
+    inode INTEGER,
+    offset INTEGER NOT NULL,
+    updated_at REAL
+);
+"""
+
+_RELATIVE_TIME = re.compile(r'^(\d+(?:\.\d+)?)([smhdw])$')
+_UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_time(value) -> Optional[float]:
+    """Epoch seconds from an epoch number, an ISO 8601 string or a relative age like '7d' / '12h'"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _RELATIVE_TIME.match(value.strip())
+    if match:
+        return time.time() - float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        raise ValueError(f"Unrecognized time: {value!r} (use epoch seconds, ISO 8601 or e.g. 7d)")
+
+
+def _response_time_ms(value) -> Optional[float]:
+    """'0.06s' (conversations.json) or a number of seconds"""
+    if isinstance(value, (int, float)):
+        return float(value) * 1000
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip('s')) * 1000
+        except ValueError:
+            return None
+    return None
+
+
+def _row(record: Dict, raw_line: bytes) -> tuple:
+    record_id = record.get('id') or record.get('_id')
+    if isinstance(record_id, dict):  # mongoexport {"$oid": ...}
+        record_id = next(iter(record_id.values()), None)
+    if not record_id:
+        record_id = hashlib.sha1(raw_line).hexdigest()  # Stable, so re-ingesting stays idempotent
+    timestamp = record.get('timestamp')
+    if isinstance(timestamp, dict):  # mongoexport {"$date": ...}
+        timestamp = next(iter(timestamp.values()), None)
+    try:
+        ts = parse_time(timestamp)
+    except ValueError:
+        ts = None
+    return (str(record_id), record.get('session_id'), record.get('user_name'), record.get('user_message'),
+            record.get('bot_response'), record.get('business_type'), record.get('model'),
+            _response_time_ms(record.get('response_time')), ts, timestamp if isinstance(timestamp, str) else None)
+
+
+class ConversationStore:
+    """SQLite conversation index with incremental JSONL ingest and filtered / full-text queries"""
+
+    def __init__(self, path: str = CONVERSATION_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')    # Readers don't block the ingest writer
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, rows: List[tuple]) -> int:
+        max_rowid = 'SELECT COALESCE(MAX(rowid), 0) FROM conversations'
+        before = self._conn.execute(max_rowid).fetchone()[0]
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO conversations (id, session_id, user_name, user_message, bot_response, '
+            'business_type, model, response_time_ms, ts, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        # Append-only, so new rows take the rowids after the previous maximum
+        return self._conn.execute(max_rowid).fetchone()[0] - before
+
+    def insert_records(self, records: Iterable[Dict]) -> int:
+        """Insert records directly (ids already present are skipped); returns rows added"""
+        rows = [_row(record, json.dumps(record, sort_keys=True).encode('utf-8')) for record in records]
+        with self._lock, self._conn:
+            return self._insert(rows)
+
+    def ingest_file(self, path: str) -> Dict:
+        """Read the lines appended to path since the last ingest (JSON lines or a JSON array file)"""
+        stat = os.stat(path)
+        with self._lock:
+            saved = self._conn.execute('SELECT inode, offset FROM ingest_offsets WHERE path = ?', (path,)).fetchone()
+        compressed = path.endswith('.gz')
+        if compressed and saved and saved['inode'] == stat.st_ino:
+            # Rotated files never change, and their offset is only saved once fully read
+            return {'path': path, 'read': 0, 'added': 0, 'bad_lines': 0, 'offset': saved['offset']}
+        offset = saved['offset'] if saved and not compressed else 0
+        if saved and (saved['inode'] != stat.st_ino or stat.st_size < offset):
+            offset = 0  # Replaced or truncated: start over (ids keep this idempotent)
+
+        opener = gzip.open if compressed else open
+        added = read = bad = 0
+        with opener(path, 'rb') as f:
+            head = f.read(1)
+            while head.isspace():
+                head = f.read(1)
+            if head == b'[':
+                # Array file (conversations.json) is rewritten, not appended: re-read it whenever it changed
+                if saved and saved['inode'] == stat.st_ino and saved['offset'] == stat.st_size:
+                    return {'path': path, 'read': 0, 'added': 0, 'bad_lines': 0, 'offset': stat.st_size}
+                records = json.loads(head + f.read())
+                with self._lock, self._conn:
+                    for start in range(0, len(records), INGEST_BATCH_SIZE):
+                        chunk = records[start:start + INGEST_BATCH_SIZE]
+                        added += self._insert([_row(r, json.dumps(r, sort_keys=True).encode('utf-8')) for r in chunk])
+                    self._save_offset(path, stat.st_ino, stat.st_size)
+                return {'path': path, 'read': len(records), 'added': added, 'bad_lines': 0, 'offset': stat.st_size}
+
+            f.seek(offset)
+            pending = b''
+            while True:
+                block = f.read(1 << 20)
+                if not block:
+                    break
+                pending += block
+                end = pending.rfind(b'\n')
+                if end < 0:
+                    continue
+                complete, pending = pending[:end + 1], pending[end + 1:]
+                rows = []
+                for line in complete.splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        rows.append(_row(json.loads(line), line))
+                    except (ValueError, AttributeError):
+                        bad += 1
+                with self._lock, self._conn:
+                    for start in range(0, len(rows), INGEST_BATCH_SIZE):
+                        added += self._insert(rows[start:start + INGEST_BATCH_SIZE])
+                    offset += len(complete)
+                    if not compressed:
+                        self._save_offset(path, stat.st_ino, offset)
+                read += len(rows)
+        if compressed:
+            with self._lock, self._conn:
+                self._save_offset(path, stat.st_ino, offset)
+        if bad:
+            logger.warning(f"⚠️ {bad} unreadable lines skipped in {path}")
+        return {'path': path, 'read': read, 'added': added, 'bad_lines': bad, 'offset': offset}
+
+    def _save_offset(self, path: str, inode: int, offset: int):
+        self._conn.execute('INSERT INTO ingest_offsets (path, inode, offset, updated_at) VALUES (?, ?, ?, ?) '
+                           'ON CONFLICT(path) DO UPDATE SET inode = excluded.inode, offset = excluded.offset, '
+                           'updated_at = excluded.updated_at', (path, inode, offset, time.time()))
+
+    def ingest(self, pattern: str) -> List[Dict]:
+        """Ingest every file matching the glob, oldest first (rotated files before the live one)"""
+        paths = sorted(glob.glob(pattern), key=os.path.getmtime)
+        return [self.ingest_file(path) for path in paths if os.path.isfile(path)]
+
+    def query(self, user_name: str = None, business_type: str = None, model: str = None, session_id: str = None,
+              since=None, until=None, text: str = None, order: str = 'newest', limit: int = 50,
+              offset: int = 0) -> List[Dict]:
+        """Filtered conversations; text is an FTS5 query over user_message and bot_response"""
+        if order not in ORDERS:
+            raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+        if order == 'relevance' and not text:
+            raise ValueError("order 'relevance' needs a text query")
+        where, params = [], []
+        for column, value in (('user_name', user_name), ('business_type', business_type), ('model', model),
+                              ('session_id', session_id)):
+            if value is not None:
+                where.append(f'c.{column} = ?')
+                params.append(value)
+        for op, value in (('>=', parse_time(since)), ('<', parse_time(until))):
+            if value is not None:
+                where.append(f'c.ts {op} ?')
+                params.append(value)
+        sql = 'SELECT c.* FROM conversations c'
+        if text:
+            sql += ' JOIN conversations_fts ON conversations_fts.rowid = c.rowid'
+            where.append('conversations_fts MATCH ?')
+            params.append(text)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {ORDERS[order]} LIMIT ? OFFSET ?'
+        params += [int(limit), int(offset)]
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid query: {e}")
+        return [{key: row[key] for key in row.keys() if key != 'rowid'} for row in rows]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            rows = self._conn.execute('SELECT COUNT(*), MIN(ts), MAX(ts) FROM conversations').fetchone()
+            by_business = self._conn.execute(
+                'SELECT business_type, COUNT(*) AS n FROM conversations GROUP BY business_type ORDER BY n DESC LIMIT 10'
+            ).fetchall()
+            files = self._conn.execute('SELECT path, offset, updated_at FROM ingest_offsets ORDER BY path').fetchall()
+        return {
+            'path': self.path,
+            'rows': rows[0],
+            'first_ts': rows[1],
+            'last_ts': rows[2],
+            'top_business_types': {row['business_type']: row['n'] for row in by_business},
+            'files': [dict(row) for row in files],
+        }
+
+
+def default_log_pattern() -> str:
+    """Glob over the live and rotated conversation log files (from CONVERSATION_LOG_PATH)"""
+    from conversation_log import CONVERSATION_LOG_PATH
+    base, ext = os.path.splitext((CONVERSATION_LOG_PATH or 'logs/conversations.jsonl').replace('{pid}', '*'))
+    return f"{base}*{ext}*"
+
+
+__all__ = ['ConversationStore', 'parse_time', 'default_log_pattern', 'CONVERSATION_STORE_PATH']
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Indexed conversation store")
+    parser.add_argument('--db', default=CONVERSATION_STORE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="Read new lines from the conversation log")
+    ingest.add_argument('--log', default=None, help="Glob of log files (default: from CONVERSATION_LOG_PATH)")
+    ingest.add_argument('--follow', action='store_true', help="Keep ingesting every --interval seconds")
+    ingest.add_argument('--interval', type=float, default=5.0)
+
+    query = commands.add_parser('query', help="Filter and full-text search conversations")
+    query.add_argument('--user')
+    query.add_argument('--business')
+    query.add_argument('--model')
+    query.add_argument('--session')
+    query.add_argument('--since', help="Epoch, ISO 8601 or relative (7d, 12h)")
+    query.add_argument('--until')
+    query.add_argument('--text', help="FTS5 query, e.g. 'menu OR ordering', '\"online store\"', 'book*'")
+    query.add_argument('--order', choices=tuple(ORDERS), default='newest')
+    query.add_argument('--limit', type=int, default=20)
+    query.add_argument('--json', action='store_true', help="One JSON object per line")
+
+    commands.add_parser('stats', help="Row counts and ingest offsets")
+    args = parser.parse_args()
+
+    store = ConversationStore(args.db)
+    if args.command == 'ingest':
+        pattern = args.log or default_log_pattern()
+        while True:
+            for result in store.ingest(pattern):
+                if result['read']:
+                    print(f"📥 {result['path']}: {result['added']} new of {result['read']} read")
+            if not args.follow:
+                break
+            time.sleep(args.interval)
+    elif args.command == 'query':
+        start = time.perf_counter()
+        try:
+            results = store.query(args.user, args.business, args.model, args.session, args.since, args.until,
+                                  args.text, args.order, args.limit)
+        except ValueError as e:
+            parser.error(str(e))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for row in results:
+            if args.json:
+                print(json.dumps(row, ensure_ascii=False))
+            else:
+                print(f"{row['timestamp'] or '-':26s} {row['user_name'] or '-':12s} {row['business_type'] or '-':22s} "
+                      f"{row['model'] or '-':12s} {(row['user_message'] or '')[:70]}")
+        if not args.json:
+            print(f"🔎 {len(results)} results in {elapsed_ms:.1f}ms")
+    else:
+        print(json.dumps(store.get_stats(), indent=2))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+🛟 SLO DEGRADATION - Switch /chat to CSV/template answers when the LLM tiers are slow
+Watches rolling p95 latency and error rate of the LLM tiers (Gemini, Mistral)
+over the last SLO_WINDOW_SECONDS. When either breaches its SLO, new requests
+skip the LLM tiers entirely (llm_used 'degraded:csv' / 'degraded:template').
+
+Restore is gradual, with hysteresis:
+    normal     -> degraded    p95 > SLO_P95_MS or error rate > SLO_ERROR_RATE
+    degraded   -> recovering  after SLO_COOLDOWN_SECONDS
+    recovering                a growing share of requests (SLO_RESTORE_STEPS) probes
+                              the LLM tiers; each step lasts SLO_STEP_SECONDS and
+                              advances only while p95 and error rate stay below
+                              SLO_RESTORE_RATIO x their SLO, any breach goes back
+                              to degraded, and the last step returns to normal
+The current mode is shown in /health.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+from metrics import metrics
+
+SLO_DEGRADATION_ENABLED = os.getenv('SLO_DEGRADATION_ENABLED', 'true').lower() == 'true'
+SLO_P95_MS = float(os.getenv('SLO_P95_MS', '6000'))
+SLO_ERROR_RATE = float(os.getenv('SLO_ERROR_RATE', '0.25'))
+SLO_WINDOW_SECONDS = float(os.getenv('SLO_WINDOW_SECONDS', '60'))
+SLO_MIN_SAMPLES = int(os.getenv('SLO_MIN_SAMPLES', '20'))
+SLO_COOLDOWN_SECONDS = float(os.getenv('SLO_COOLDOWN_SECONDS', '30'))
+SLO_STEP_SECONDS = float(os.getenv('SLO_STEP_SECONDS', '15'))
+SLO_RESTORE_RATIO = float(os.getenv('SLO_RESTORE_RATIO', '0.7'))
+SLO_RESTORE_STEPS = tuple(float(step) for step in os.getenv('SLO_RESTORE_STEPS', '0.1,0.25,0.5').split(','))
+
+LLM_TIERS = frozenset({'gemini', 'mistral'})
+EVALUATE_INTERVAL_SECONDS = 1.0
+MAX_WINDOW_SAMPLES = 2000
+RECOVERY_MIN_SAMPLES = 5  # Probe attempts needed before a recovery step is judged (capped at SLO_MIN_SAMPLES)
+
+MODE_NORMAL = 'normal'
+MODE_DEGRADED = 'degraded'
+MODE_RECOVERING = 'recovering'
+
+
+class DegradationController:
+    """Decides per request whether the LLM tiers may be used"""
+
+    def __init__(self, enabled: bool = SLO_DEGRADATION_ENABLED, p95_ms: float = SLO_P95_MS,
+                 error_rate: float = SLO_ERROR_RATE, window_seconds: float = SLO_WINDOW_SECONDS,
+                 min_samples: int = SLO_MIN_SAMPLES, cooldown_seconds: float = SLO_COOLDOWN_SECONDS,
+                 step_seconds: float = SLO_STEP_SECONDS, restore_ratio: float = SLO_RESTORE_RATIO,
+                 restore_steps: Tuple[float, ...] = SLO_RESTORE_STEPS, clock=time.monotonic):
+        self.enabled = enabled
+        self.p95_ms = p95_ms
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+        self.step_seconds = step_seconds
+        self.restore_ratio = restore_ratio
+        self.restore_steps = restore_steps
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._samples: deque = deque(maxlen=MAX_WINDOW_SAMPLES)  # (time, latency_ms, success)
+        self.mode = MODE_NORMAL
+        self.llm_fraction = 1.0
+        self._step = 0
+        self._mode_since = clock()
+        self._next_evaluation = 0.0
+        self.last_reason = None
+
+        self.fraction_gauge = metrics.gauge('techrypt_degradation_llm_fraction',
+                                            'Share of new /chat requests allowed to use the LLM tiers')
+        self.fraction_gauge.set(1.0)
+        self.skipped = metrics.counter('techrypt_degradation_skipped_llm_total',
+                                       'Requests answered without the LLM tiers because of the SLO controller')
+
+    def record(self, provider: str, latency_ms: float, success: bool):
+        """Feed one LLM-tier attempt (other providers are ignored)"""
+        if provider in LLM_TIERS:
+            self._samples.append((self._clock(), latency_ms, success))
+
+    def allow_llm(self) -> bool:
+        """Should this new request use the LLM tiers?"""
+        if not self.enabled:
+            return True
+        now = self._clock()
+        if now >= self._next_evaluation:
+            self.evaluate(now)
+        if self.llm_fraction >= 1.0 or random.random() < self.llm_fraction:
+            return True
+        self.skipped.inc()
+        return False
+
+    def window_stats(self, now: float = None) -> Dict:
+        """p95 latency, error rate and sample count of LLM attempts in the rolling window"""
+        now = self._clock() if now is None else now
+        cutoff = now - self.window_seconds
+        recent = [(latency, success) for ts, latency, success in list(self._samples) if ts >= cutoff]
+        if not recent:
+            return {'samples': 0, 'p95_ms': 0.0, 'error_rate': 0.0}
+        latencies = sorted(latency for latency, _ in recent)
+        p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+        errors = sum(1 for _, success in recent if not success)
+        return {'samples': len(recent), 'p95_ms': round(p95, 1), 'error_rate': round(errors / len(recent), 3)}
+
+    def _breached(self, stats: Dict, ratio: float = 1.0) -> bool:
+        return stats['p95_ms'] > self.p95_ms * ratio or stats['error_rate'] > self.error_rate * ratio
+
+    def _enter(self, mode: str, now: float, fraction: float, reason: str = None):
+        self.mode = mode
+        self.llm_fraction = fraction
+        self._mode_since = now
+        self.fraction_gauge.set(fraction)
+        if reason:
+            self.last_reason = reason
+        metrics.counter('techrypt_degradation_transitions_total', 'SLO controller mode changes', to=mode).inc()
+        if mode != MODE_NORMAL:
+            # Judge the next phase only on traffic it let through
+            self._samples.clear()
+
+    def evaluate(self, now: float = None):
+        """Advance the state machine (called at most once per second from allow_llm)"""
+        now = self._clock() if now is None else now
+        with self._lock:
+            self._next_evaluation = now + EVALUATE_INTERVAL_SECONDS
+            stats = self.window_stats(now)
+            in_mode = now - self._mode_since
+
+            if self.mode == MODE_NORMAL:
+                if stats['samples'] >= self.min_samples and self._breached(stats):
+                    self._enter(MODE_DEGRADED, now, 0.0,
+                                f"p95 {stats['p95_ms']}ms / error rate {stats['error_rate']} over SLO")
+            elif self.mode == MODE_DEGRADED:
+                if in_mode >= self.cooldown_seconds:
+                    self._step = 0
+                    self._enter(MODE_RECOVERING, now, self.restore_steps[0])
+            elif stats['samples'] < min(self.min_samples, RECOVERY_MIN_SAMPLES):
+                pass  # Not enough probe traffic yet to judge this step
+            elif self._breached(stats):
+                self._enter(MODE_DEGRADED, now, 0.0,
+                            f"p95 {stats['p95_ms']}ms / error rate {stats['error_rate']} over SLO while recovering")
+            elif in_mode >= self.step_seconds and not self._breached(stats, self.restore_ratio):
+                self._step += 1
+                if self._step >= len(self.restore_steps):
+                    self._enter(MODE_NORMAL, now, 1.0)
+                else:
+                    self._enter(MODE_RECOVERING, now, self.restore_steps[self._step])
+
+    def get_status(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'mode': self.mode,
+            'llm_fraction': self.llm_fraction,
+            'mode_since_seconds': round(self._clock() - self._mode_since, 1),
+            'last_reason': self.last_reason,
+            'window': self.window_stats(),
+            'slo': {'p95_ms': self.p95_ms, 'error_rate': self.error_rate, 'window_seconds': self.window_seconds},
+            'skipped_llm_requests': self.skipped.value,
+        }
+
+
+# Shared controller for the /chat pipeline
+slo_controller = DegradationController()
+
+__all__ = ['DegradationController', 'slo_controller', 'LLM_TIERS']
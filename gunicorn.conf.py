@@ -0,0 +1,39 @@
+"""
+🏭 GUNICORN CONFIG - Preload/fork serving mode
+The master imports wsgi.py once (preload_app), builds every read-only
+structure and freezes it out of the garbage collector, then forks workers
+that share those pages copy-on-write. Each worker re-creates its own
+connections (MongoDB, Gemini client, session backend sockets) in post_fork.
+
+Run:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Sessions are per process with SESSION_BACKEND=memory; with more than one
+worker, use SESSION_BACKEND=redis so every worker sees the same conversation.
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))  # Matches the dev server's threaded=True
+worker_class = 'gthread'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))  # LLM calls can take several seconds
+preload_app = True
+
+# Half the threads run the pipeline, the rest may queue briefly; beyond that
+# /chat is shed inside the worker instead of waiting in the socket backlog
+os.environ.setdefault('ADMISSION_MAX_CONCURRENT', str(max(1, threads // 2)))
+os.environ.setdefault('ADMISSION_MAX_QUEUE', str(max(0, threads - max(1, threads // 2))))
+
+
+def when_ready(server):
+    from smart_llm_chatbot import preload_for_workers
+    preload_for_workers()
+    if workers > 1 and os.getenv('SESSION_BACKEND', 'memory').lower() == 'memory':
+        server.log.warning("SESSION_BACKEND=memory keeps separate sessions per worker; use redis to share them")
+
+
+def post_fork(server, worker):
+    from smart_llm_chatbot import reinit_after_fork
+    reinit_after_fork()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+📈 TRAFFIC REPLAY LOAD TEST - Replay recorded conversations against /chat
+Replays real message sequences from src/database/conversations.json (or a
+mongoexport of the conversations collection, JSON array or one document per
+line) as multi-turn sessions with open-loop arrivals:
+
+    sessions       records grouped by session_id / user_id / user_name, turns in timestamp order
+    arrivals       new sessions start on a Poisson (or constant) schedule sized so the offered
+                   load is --rate requests/s, whether or not earlier requests have finished
+    turns          each turn waits for the previous answer plus an exponential think time
+    providers      in-process runs start mock_llm_server with --mock-profile, and
+                   --mock-latency-ms overrides the mean latency of every mocked provider
+
+Reports throughput, latency percentiles (measured from the scheduled send time,
+so a saturated node cannot hide its queueing), error rates and a per-tier
+breakdown (llm_used: gemini, mistral, csv, shed:csv, degraded:template, ...).
+In-process runs share the GIL with the load generator; use --url against a
+gunicorn node for capacity numbers.
+
+Run:
+    python load_replay.py --rate 20 --duration 60 [--mock-profile realistic] [--output results.json]
+    python load_replay.py --url http://127.0.0.1:5000 --rate 50 --duration 120
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CONVERSATIONS_PATH = os.path.join('Techrypt_sourcecode', 'Techrypt', 'src', 'database', 'conversations.json')
+SESSION_KEYS = ('session_id', 'user_id', 'user_name')
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _unwrap(value):
+    """Flatten mongoexport extended JSON ({"$oid": ...}, {"$date": ...})"""
+    if isinstance(value, dict) and len(value) == 1:
+        inner = next(iter(value.values()))
+        if next(iter(value)) == '$date' and isinstance(inner, dict):
+            try:
+                return int(inner.get('$numberLong'))  # Epoch milliseconds as a string
+            except (TypeError, ValueError):
+                return None
+        return inner
+    return value
+
+
+def _timestamp(value) -> float:
+    value = _unwrap(value)
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)  # $date can be epoch milliseconds
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return 0.0
+
+
+def load_conversations(path: str) -> List[Dict]:
+    """Read conversation records from a JSON array or JSON-lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        records = json.loads(stripped)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [record for record in records if isinstance(record, dict) and record.get('user_message')]
+
+
+def build_sessions(records: List[Dict], max_turns: int = 0) -> List[List[str]]:
+    """Group records into sessions and order each session's turns by timestamp"""
+    grouped: Dict[str, List[Tuple[float, int, str]]] = defaultdict(list)
+    for index, record in enumerate(records):
+        context = record.get('user_context') if isinstance(record.get('user_context'), dict) else {}
+        key = context.get('session_id') or next(
+            (str(_unwrap(record[k])) for k in SESSION_KEYS if record.get(k)), str(_unwrap(record.get('id', index))))
+        grouped[key].append((_timestamp(record.get('timestamp')), index, record['user_message']))
+    sessions = []
+    for key in sorted(grouped):
+        turns = [message for _, _, message in sorted(grouped[key])]
+        sessions.append(turns[:max_turns] if max_turns else turns)
+    return sessions
+
+
+def arrival_offsets(session_rate: float, duration: float, rng: random.Random, poisson: bool = True) -> List[float]:
+    """Session start times (seconds from the start of the run) at session_rate per second"""
+    offsets = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(session_rate) if poisson else 1.0 / session_rate
+        if t >= duration:
+            return offsets
+        offsets.append(t)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies: List[float]) -> Dict:
+    values = sorted(latencies)
+    summary = {f'p{pct}_ms': round(percentile(values, pct), 1) for pct in PERCENTILES}
+    summary['max_ms'] = round(values[-1], 1) if values else 0.0
+    summary['mean_ms'] = round(sum(values) / len(values), 1) if values else 0.0
+    return summary
+
+
+class ReplayRecorder:
+    """Thread-safe collection of per-request outcomes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.results: List[Tuple[str, bool, float, float, float]] = []  # (tier, ok, latency_ms, start_lag_ms, done_at)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.sessions_started = 0
+        self.sessions_completed = 0
+
+    def record(self, tier: str, ok: bool, latency_ms: float, start_lag_ms: float, done_at: float,
+               error: str = None):
+        with self._lock:
+            self.results.append((tier, ok, latency_ms, start_lag_ms, done_at))
+            if error:
+                self.errors[error] += 1
+
+    def session_done(self):
+        with self._lock:
+            self.sessions_completed += 1
+
+    def report(self, duration: float, elapsed: float, offered_rps: float) -> Dict:
+        """Throughput counts completions inside the arrival window; the drain after it is reported apart"""
+        with self._lock:
+            results = list(self.results)
+            errors = dict(self.errors)
+        by_tier: Dict[str, List[float]] = defaultdict(list)
+        for tier, _, latency, _, _ in results:
+            by_tier[tier].append(latency)
+        failed = sum(1 for _, ok, _, _, _ in results if not ok)
+        lags = sorted(lag for _, _, _, lag, _ in results)
+        in_window = sum(1 for *_, done_at in results if done_at <= duration)
+        return {
+            'requests': len(results),
+            'duration_seconds': duration,
+            'drain_seconds': round(max(0.0, elapsed - duration), 2),
+            'offered_rps': round(offered_rps, 2),
+            'throughput_rps': round(in_window / duration, 2) if duration else 0.0,
+            'error_rate': round(failed / len(results), 4) if results else 0.0,
+            'errors': errors,
+            'sessions_started': self.sessions_started,
+            'sessions_completed': self.sessions_completed,
+            'latency': summarize_latencies([latency for _, _, latency, _, _ in results]),
+            'start_lag_p99_ms': round(percentile(lags, 99), 1),
+            'tiers': {
+                tier: {'requests': len(latencies), 'share': round(len(latencies) / len(results), 4),
+                       **summarize_latencies(latencies)}
+                for tier, latencies in sorted(by_tier.items())
+            },
+        }
+
+
+def http_sender(base_url: str, timeout: float) -> Callable[[], Callable[[Dict], Tuple[int, Dict]]]:
+    """Per-thread sender factory that POSTs /chat over HTTP"""
+    import requests
+    local = threading.local()
+
+    def factory():
+        def send(payload: Dict) -> Tuple[int, Dict]:
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            response = session.post(f"{base_url.rstrip('/')}/chat", json=payload, timeout=timeout)
+            try:
+                return response.status_code, response.json()
+            except ValueError:
+                return response.status_code, {}
+        return send
+    return factory
+
+
+def in_process_sender() -> Callable[[], Callable[[Dict], Tuple[int, Dict]]]:
+    """Per-thread sender factory that calls the Flask app directly (no sockets)"""
+    import smart_llm_chatbot
+
+    def factory():
+        client = smart_llm_chatbot.app.test_client()
+
+        def send(payload: Dict) -> Tuple[int, Dict]:
+            response = client.post('/chat', json=payload)
+            return response.status_code, response.get_json(silent=True) or {}
+        return send
+    return factory
+
+
+def mock_profiles(profile: str, latency_ms: Optional[float]) -> Dict[str, Dict]:
+    """Resolve a mock_llm_server preset and optionally override every provider's mean latency"""
+    import mock_llm_server
+    profiles = copy.deepcopy(mock_llm_server.load_profiles(profile))
+    if latency_ms is not None:
+        for provider in ('gemini', 'openrouter'):
+            latency = profiles.setdefault(provider, {}).setdefault('latency', {})
+            scale = latency_ms / latency['mean_ms'] if latency.get('mean_ms') else 1.0
+            latency['mean_ms'] = latency_ms
+            latency['stddev_ms'] = latency.get('stddev_ms', 0.0) * scale
+            latency['min_ms'] = min(latency.get('min_ms', 0.0), latency_ms)
+    return profiles
+
+
+def run_replay(sessions: List[List[str]], send_factory, rate: float, duration: float,
+               think_time: float = 1.0, poisson: bool = True, max_workers: int = 256,
+               seed: int = 1, drain_timeout: float = 60.0) -> Dict:
+    """Replay sessions open-loop at `rate` requests/s for `duration` seconds of arrivals"""
+    rng = random.Random(seed)
+    mean_turns = sum(len(turns) for turns in sessions) / len(sessions)
+    offsets = arrival_offsets(rate / mean_turns, duration, rng, poisson)
+    recorder = ReplayRecorder()
+    local = threading.local()
+    stop = threading.Event()  # Set when the drain times out: sessions still running stop after their current turn
+    start = time.perf_counter()
+
+    def run_session(number: int, turns: List[str], scheduled: float, think_seed: int):
+        send = getattr(local, 'send', None)
+        if send is None:
+            send = local.send = send_factory()
+        think = random.Random(think_seed)
+        session_id = f"replay-{seed}-{number}"
+        for turn, message in enumerate(turns):
+            if turn:
+                if stop.wait(think.expovariate(1.0 / think_time) if think_time > 0 else 0):
+                    return
+                scheduled = time.perf_counter()
+            sent = time.perf_counter()
+            try:
+                status, body = send({'message': message, 'user_context': {'session_id': session_id}})
+                ok = status == 200 and bool(body.get('response'))
+                tier = body.get('llm_used') or f'http_{status}'
+                error = None if ok else f'http_{status}'
+            except Exception as e:
+                ok, tier, error = False, 'exception', type(e).__name__
+            done = time.perf_counter()
+            recorder.record(tier, ok, (done - scheduled) * 1000, (sent - scheduled) * 1000, done - start, error)
+        recorder.session_done()
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='replay')
+    futures = []
+    try:
+        for number, offset in enumerate(offsets):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            recorder.sessions_started += 1
+            futures.append(pool.submit(run_session, number, sessions[number % len(sessions)],
+                                       start + offset, rng.randrange(1 << 30)))
+        _, pending = wait(futures, timeout=drain_timeout)
+    finally:
+        # A saturated target must not hold the report hostage: queued sessions are cancelled and
+        # running ones abandoned (their in-flight request is not counted)
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    elapsed = time.perf_counter() - start
+    report = recorder.report(duration, elapsed, rate)
+    report['drain_timed_out'] = bool(pending)
+    report['sessions_abandoned'] = len(pending)
+    return report
+
+
+def print_report(report: Dict):
+    latency = report['latency']
+    print(f"📈 {report['requests']} requests over {report['duration_seconds']}s + {report['drain_seconds']}s drain "
+          f"(offered {report['offered_rps']}/s, achieved {report['throughput_rps']}/s)")
+    print(f"⏱️ p50 {latency['p50_ms']}ms  p95 {latency['p95_ms']}ms  p99 {latency['p99_ms']}ms  "
+          f"max {latency['max_ms']}ms  (start lag p99 {report['start_lag_p99_ms']}ms)")
+    print(f"❌ error rate {report['error_rate']:.2%} {report['errors'] or ''}")
+    if report.get('drain_timed_out'):
+        print(f"⚠️ drain timed out: {report['sessions_abandoned']} of {report['sessions_started']} sessions "
+              f"abandoned (target saturated?)")
+    for tier, stats in report['tiers'].items():
+        print(f"   {tier:20s} {stats['requests']:6d} ({stats['share']:.1%})  "
+              f"p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms  p99 {stats['p99_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded conversations against /chat")
+    parser.add_argument('--input', default=DEFAULT_CONVERSATIONS_PATH,
+                        help="conversations.json or a mongoexport (JSON array or JSON lines)")
+    parser.add_argument('--url', help="Base URL of a running node (default: in-process app with mocked providers)")
+    parser.add_argument('--rate', type=float, default=10.0, help="Offered load in requests per second")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds during which new sessions arrive")
+    parser.add_argument('--arrivals', choices=('poisson', 'constant'), default='poisson')
+    parser.add_argument('--think-time', type=float, default=1.0, help="Mean seconds between turns of a session")
+    parser.add_argument('--max-turns', type=int, default=0, help="Truncate sessions to this many turns (0 = all)")
+    parser.add_argument('--max-workers', type=int, default=256, help="Concurrent sessions in flight")
+    parser.add_argument('--timeout', type=float, default=30.0, help="HTTP timeout per request (--url only)")
+    parser.add_argument('--mock-profile', default='realistic', help="mock_llm_server preset or JSON profile file")
+    parser.add_argument('--mock-latency-ms', type=float, help="Override the mean latency of every mocked provider")
+    parser.add_argument('--mock-url', help="Reconfigure this running mock_llm_server instead of starting one")
+    parser.add_argument('--warmup', type=int, default=1, help="Unmeasured requests sent before the run")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    sessions = build_sessions(load_conversations(args.input), args.max_turns)
+    if not sessions:
+        parser.error(f"No conversations with user_message in {args.input}")
+    profiles = mock_profiles(args.mock_profile, args.mock_latency_ms)
+
+    server = None
+    if args.mock_url:
+        import requests
+        requests.post(f"{args.mock_url.rstrip('/')}/_mock/profile", json={'profiles': profiles}, timeout=5)
+    elif not args.url:
+        import mock_llm_server
+        server, mock_url = mock_llm_server.start_in_thread(profiles, seed=args.seed)
+        # Must be set before smart_llm_chatbot is imported by in_process_sender()
+        os.environ['GEMINI_API_ENDPOINT'] = mock_url
+        os.environ['OPENROUTER_API_URL'] = mock_url + '/api/v1/chat/completions'
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)  # Mock server access log
+
+    try:
+        send_factory = http_sender(args.url, args.timeout) if args.url else in_process_sender()
+        for _ in range(args.warmup):
+            # Lazy chatbot init and first imports are not part of the measurement
+            send_factory()({'message': sessions[0][0]})
+        print(f"🔁 Replaying {len(sessions)} sessions from {args.input} at {args.rate}/s for {args.duration}s")
+        report = run_replay(sessions, send_factory, args.rate, args.duration, args.think_time,
+                            args.arrivals == 'poisson', args.max_workers, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report['config'] = {key: value for key, value in vars(args).items() if key != 'output'}
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
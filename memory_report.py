@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+🧮 MEMORY REPORT - Where the serving process's memory goes
+Per-component accounting: every registered structure (CSV training data,
+keyword tables, session contexts, Gemini chat sessions, metrics, ...) is
+walked and its deep size reported next to the process RSS. Objects shared
+between components are counted in each of them.
+
+tracemalloc snapshots can be started, taken and diffed on demand to find
+what grew between two points of a soak test. smart_llm_chatbot exposes the
+same report at /admin/memory.
+
+Run:
+    python memory_report.py [--messages 200] [--top 15]            # build the chatbot in-process
+    python memory_report.py --url http://127.0.0.1:5000             # GET a running node's report
+    python memory_report.py --url http://127.0.0.1:5000 --action snapshot --label before
+    python memory_report.py --url http://127.0.0.1:5000 --action diff --base before
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable
+
+from startup_report import current_rss_bytes
+
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv('MEMORY_TRACEMALLOC_FRAMES', '1'))  # Traceback depth per allocation
+MEMORY_MAX_SNAPSHOTS = int(os.getenv('MEMORY_MAX_SNAPSHOTS', '5'))  # Oldest labeled snapshot is dropped beyond this
+MEMORY_DEEP_SIZE_LIMIT = int(os.getenv('MEMORY_DEEP_SIZE_LIMIT', '2000000'))  # Objects walked per component
+
+# Never walked into: shared by everything and not owned by any component
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+               types.CodeType, types.FrameType)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _slot_names(cls) -> Iterable[str]:
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        yield from ((slots,) if isinstance(slots, str) else slots)
+
+
+def deep_sizeof(obj: Any, limit: int = MEMORY_DEEP_SIZE_LIMIT) -> Dict:
+    """Bytes and object count reachable from obj through containers, __dict__ and __slots__"""
+    seen = set()
+    stack = [obj]
+    total = count = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+        count += 1
+        if count >= limit:
+            return {'bytes': total, 'objects': count, 'truncated': True}
+        if isinstance(current, _ATOMIC_TYPES):
+            continue
+        try:
+            if isinstance(current, dict):
+                for key, value in list(current.items()):
+                    stack.append(key)
+                    stack.append(value)
+            elif isinstance(current, (list, tuple, set, frozenset, deque)):
+                stack.extend(list(current))
+            else:
+                attrs = getattr(current, '__dict__', None)
+                if attrs is not None:
+                    stack.append(attrs)
+                for name in _slot_names(type(current)):
+                    if name not in ('__dict__', '__weakref__') and hasattr(current, name):
+                        stack.append(getattr(current, name))
+        except RuntimeError:
+            continue  # Mutated by another thread while walking; its size is already counted
+    return {'bytes': total, 'objects': count, 'truncated': False}
+
+
+class MemoryReporter:
+    """Registry of named structures plus on-demand tracemalloc snapshots"""
+
+    def __init__(self, max_snapshots: int = MEMORY_MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._components: Dict[str, Callable[[], Any]] = {}
+        self._snapshots: 'OrderedDict[str, tuple]' = OrderedDict()  # label -> (taken_at, Snapshot)
+        self._lock = threading.Lock()
+
+    def register(self, name: str, getter: Callable[[], Any]):
+        """getter returns the structure (or None while it doesn't exist yet)"""
+        self._components[name] = getter
+
+    def unregister(self, name: str):
+        self._components.pop(name, None)
+
+    def component_sizes(self, names: Iterable[str] = None) -> Dict[str, Dict]:
+        names = list(names) if names else sorted(self._components)
+        unknown = [name for name in names if name not in self._components]
+        if unknown:
+            raise ValueError(f"Unknown components: {', '.join(unknown)}")
+        sizes = {}
+        for name in names:
+            obj = self._components[name]()
+            if obj is None:
+                sizes[name] = {'bytes': 0, 'objects': 0, 'truncated': False, 'available': False}
+                continue
+            start = time.perf_counter()
+            size = deep_sizeof(obj)
+            try:
+                size['items'] = len(obj)
+            except TypeError:
+                pass
+            size['walk_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            sizes[name] = size
+        return sizes
+
+    def start_tracing(self, frames: int = MEMORY_TRACEMALLOC_FRAMES):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, frames))
+
+    def stop_tracing(self):
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
+
+    def take_snapshot(self, label: str = None) -> Dict:
+        """Store a labeled tracemalloc snapshot (tracing must have been started)"""
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        with self._lock:
+            label = label or f"snapshot-{len(self._snapshots) + 1}"
+            self._snapshots.pop(label, None)
+            self._snapshots[label] = (time.time(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return {'label': label, 'traced_bytes': sum(stat.size for stat in snapshot.statistics('filename'))}
+
+    def _snapshot(self, label: str):
+        with self._lock:
+            if label not in self._snapshots:
+                raise ValueError(f"Unknown snapshot: {label}")
+            return self._snapshots[label][1]
+
+    def diff(self, base: str, current: str = None, top: int = 20, group_by: str = 'lineno') -> Dict:
+        """Top allocation sites that grew (or shrank) from snapshot base to current (default: now)"""
+        if group_by not in ('lineno', 'filename', 'traceback'):
+            raise ValueError(f"Invalid group_by: {group_by}")
+        old = self._snapshot(base)
+        if current:
+            new = self._snapshot(current)
+        elif tracemalloc.is_tracing():
+            new = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        else:
+            raise ValueError("tracemalloc is not tracing; name a stored snapshot to compare with")
+        stats = new.compare_to(old, group_by)
+        return {
+            'base': base,
+            'current': current or 'now',
+            'size_diff_bytes': sum(stat.size_diff for stat in stats),
+            'count_diff': sum(stat.count_diff for stat in stats),
+            'top': [{
+                'where': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                'size_diff_bytes': stat.size_diff,
+                'size_bytes': stat.size,
+                'count_diff': stat.count_diff,
+                'count': stat.count,
+            } for stat in stats[:top]],
+        }
+
+    def tracing_status(self) -> Dict:
+        tracing = tracemalloc.is_tracing()
+        traced, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self._lock:
+            snapshots = [{'label': label, 'taken_at': taken_at} for label, (taken_at, _) in self._snapshots.items()]
+        return {
+            'tracing': tracing,
+            'frames': tracemalloc.get_traceback_limit() if tracing else 0,
+            'traced_bytes': traced,
+            'peak_bytes': peak,
+            'overhead_bytes': tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            'snapshots': snapshots,
+        }
+
+    def report(self, names: Iterable[str] = None) -> Dict:
+        components = self.component_sizes(names)
+        return {
+            'rss_bytes': current_rss_bytes(),
+            'components_bytes': sum(size['bytes'] for size in components.values()),
+            'components': components,
+            'gc': {'counts': gc.get_count(), 'objects': len(gc.get_objects())},
+            'tracemalloc': self.tracing_status(),
+        }
+
+
+# Shared reporter for the serving process
+memory_report = MemoryReporter()
+
+
+def _print_report(report: Dict, top: int):
+    rss = report.get('rss_bytes')
+    print(f"🧮 RSS {rss / 1048576:.1f} MiB" if rss else "🧮 RSS unknown",
+          f"| registered components {report['components_bytes'] / 1048576:.1f} MiB")
+    for name, size in sorted(report['components'].items(), key=lambda item: -item[1]['bytes']):
+        if not size.get('available', True):
+            print(f"   {name:32s}        (not built)")
+            continue
+        items = f"{size['items']} items" if 'items' in size else ''
+        flag = ' (truncated)' if size['truncated'] else ''
+        print(f"   {name:32s} {size['bytes'] / 1024:10.1f} KiB  {size['objects']:8d} objects  {items}{flag}")
+    for diff in report.get('diffs', []):
+        print(f"\n📈 {diff['base']} -> {diff['current']}: {diff['size_diff_bytes'] / 1024:+.1f} KiB, "
+              f"{diff['count_diff']:+d} blocks")
+        for stat in diff['top'][:top]:
+            print(f"   {stat['size_diff_bytes'] / 1024:+10.1f} KiB  {stat['count_diff']:+7d}  {stat['where'][0]}")
+
+
+def _run_local(args) -> Dict:
+    """Build the chatbot in-process (providers mocked), optionally replay messages, report and diff"""
+    import logging
+    import mock_llm_server
+    server, url = mock_llm_server.start_in_thread(mock_llm_server.PRESET_PROFILES['fast'], seed=1)
+    os.environ['GEMINI_API_ENDPOINT'] = url
+    os.environ['OPENROUTER_API_URL'] = url + '/api/v1/chat/completions'
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    # The instance smart_llm_chatbot registers with, not this __main__ module's copy
+    from memory_report import memory_report
+    try:
+        memory_report.start_tracing(args.frames)
+        memory_report.take_snapshot('start')
+        import smart_llm_chatbot
+        smart_llm_chatbot.get_intelligent_chatbot()
+        memory_report.take_snapshot('built')
+        diffs = [memory_report.diff('start', 'built', top=args.top)]
+        if args.messages:
+            from load_replay import DEFAULT_CONVERSATIONS_PATH, load_conversations
+            messages = [record['user_message'] for record in load_conversations(DEFAULT_CONVERSATIONS_PATH)]
+            client = smart_llm_chatbot.app.test_client()
+            for i in range(args.messages):
+                client.post('/chat', json={'message': messages[i % len(messages)],
+                                           'user_context': {'session_id': f"memory-{i // 5}"}})
+            memory_report.take_snapshot('replayed')
+            diffs.append(memory_report.diff('built', 'replayed', top=args.top))
+        report = memory_report.report(args.component)
+        report['diffs'] = diffs
+        return report
+    finally:
+        server.shutdown()
+
+
+def _run_remote(args) -> Dict:
+    import requests
+    headers = {'X-Admin-Token': args.token} if args.token else {}
+    endpoint = f"{args.url.rstrip('/')}/admin/memory"
+    if args.action == 'report':
+        response = requests.get(endpoint, params={'component': args.component or []}, headers=headers, timeout=60)
+    else:
+        body = {'action': args.action, 'label': args.label, 'base': args.base, 'top': args.top, 'frames': args.frames}
+        response = requests.post(endpoint, json={k: v for k, v in body.items() if v is not None},
+                                 headers=headers, timeout=60)
+    response.raise_for_status()
+    return response.json()
+
+
+def main():
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Per-component memory report and tracemalloc diffs")
+    parser.add_argument('--url', help="Base URL of a running node (default: build the chatbot in-process)")
+    parser.add_argument('--token', default=os.getenv('ADMIN_API_TOKEN', ''), help="X-Admin-Token for --url")
+    parser.add_argument('--action', default='report', choices=('report', 'start', 'snapshot', 'diff', 'stop'),
+                        help="--url only: tracemalloc action on the remote node")
+    parser.add_argument('--label', help="Snapshot label (snapshot)")
+    parser.add_argument('--base', help="Snapshot to diff against (diff)")
+    parser.add_argument('--component', action='append', help="Only these components (repeatable)")
+    parser.add_argument('--messages', type=int, default=0, help="In-process: /chat messages replayed before the report")
+    parser.add_argument('--frames', type=int, default=MEMORY_TRACEMALLOC_FRAMES)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', action='store_true', help="Print the raw JSON report")
+    args = parser.parse_args()
+
+    if not args.url:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))  # data.csv and config/ are resolved relative to the repo
+    report = _run_remote(args) if args.url else _run_local(args)
+    if args.json or args.action != 'report':
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report, args.top)
+
+
+__all__ = ['MemoryReporter', 'deep_sizeof', 'memory_report']
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+📈 METRICS - Thread-safe counters and fixed-memory latency histograms
+Replaces ever-growing response time lists with log-bucketed histograms
+(constant memory, ~9% worst-case relative error on quantiles) and exports
+everything in Prometheus text format for GET /metrics. /health and
+/model-status read the same objects, so every view agrees.
+
+Usage:
+    metrics.counter('techrypt_chat_requests_total', 'Chat requests received').inc()
+    with stage_timer('csv'):
+        ...
+    latency = stage_histogram('gemini').quantile(0.95)
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Request pipeline stages with their own latency histogram
+STAGES = ('request', 'classification', 'tenant', 'cache', 'csv', 'gemini', 'mistral', 'post_processing', 'persistence')
+STAGE_LATENCY_METRIC = 'techrypt_stage_latency_seconds'
+EXPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Counter:
+    """Monotonic counter safe to increment from Flask worker threads"""
+
+    __slots__ = ('_value', '_lock')
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Value that goes up and down (queue depth, in-flight requests)"""
+
+    __slots__ = ('_value', '_lock')
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with fixed memory
+
+    Bucket i (1..n) covers [min * g^(i-1), min * g^i) with g = 2^(1/buckets_per_doubling);
+    bucket 0 holds anything faster than min and the last bucket anything slower than max.
+    """
+
+    def __init__(self, min_seconds: float = 1e-4, max_seconds: float = 120.0, buckets_per_doubling: int = 8):
+        self.min_seconds = min_seconds
+        self.buckets_per_doubling = buckets_per_doubling
+        self._scale = buckets_per_doubling / math.log(2)
+        self._inner = int(math.ceil(math.log(max_seconds / min_seconds) * self._scale))
+        self._counts = [0] * (self._inner + 2)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def _index(self, seconds: float) -> int:
+        if seconds < self.min_seconds:
+            return 0
+        return min(int(math.log(seconds / self.min_seconds) * self._scale) + 1, self._inner + 1)
+
+    def upper_bound(self, index: int) -> float:
+        """Exclusive upper edge of a bucket (inf for the overflow bucket)"""
+        if index > self._inner:
+            return math.inf
+        return self.min_seconds * 2 ** (index / self.buckets_per_doubling)
+
+    def observe(self, seconds: float):
+        index = self._index(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def snapshot(self) -> Tuple[List[int], int, float, float]:
+        """(bucket counts, count, sum, max) taken atomically"""
+        with self._lock:
+            return list(self._counts), self._count, self._sum, self._max
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def mean(self) -> float:
+        with self._lock:
+            return self._sum / self._count if self._count else 0.0
+
+    def quantile(self, q: float, snapshot: Optional[Tuple] = None) -> float:
+        """Approximate q-quantile in seconds (geometric midpoint of the bucket, capped at max)"""
+        counts, count, _, observed_max = snapshot or self.snapshot()
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                if index == 0:
+                    return min(self.min_seconds, observed_max)
+                if index > self._inner:
+                    return observed_max
+                lower = self.upper_bound(index - 1)
+                return min(math.sqrt(lower * self.upper_bound(index)), observed_max)
+        return observed_max
+
+    def summary(self) -> Dict:
+        snap = self.snapshot()
+        _, count, total, observed_max = snap
+        return {
+            'count': count,
+            'mean_ms': round(total / count * 1000, 2) if count else 0.0,
+            'p50_ms': round(self.quantile(0.5, snap) * 1000, 2),
+            'p95_ms': round(self.quantile(0.95, snap) * 1000, 2),
+            'p99_ms': round(self.quantile(0.99, snap) * 1000, 2),
+            'max_ms': round(observed_max * 1000, 2),
+        }
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Named metric families with optional labels, rendered as Prometheus text"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: Dict[str, Dict] = {}  # name -> {'type', 'help', 'series': {labels: metric}}
+
+    def _get(self, kind: str, name: str, help_text: str, labels: Dict[str, str], factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is not None:
+            metric = family['series'].get(key)
+            if metric is not None:
+                return metric
+        with self._lock:
+            family = self._families.setdefault(name, {'type': kind, 'help': help_text, 'series': {}})
+            return family['series'].setdefault(key, factory())
+
+    def counter(self, name: str, help_text: str = '', **labels) -> Counter:
+        return self._get('counter', name, help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str = '', **labels) -> Gauge:
+        return self._get('gauge', name, help_text, labels, Gauge)
+
+    def histogram(self, name: str, help_text: str = '', **labels) -> LatencyHistogram:
+        return self._get('histogram', name, help_text, labels, LatencyHistogram)
+
+    def counter_values(self, name: str) -> Dict[Tuple, float]:
+        family = self._families.get(name)
+        return {key: metric.value for key, metric in family['series'].items()} if family else {}
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            families = [(name, dict(family, series=dict(family['series']))) for name, family in self._families.items()]
+        for name, family in sorted(families):
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            if family['type'] in ('counter', 'gauge'):
+                for key, metric in sorted(family['series'].items()):
+                    lines.append(f"{name}{_labels(key)} {_number(metric.value)}")
+                continue
+
+            quantile_lines = []
+            for key, hist in sorted(family['series'].items()):
+                snap = hist.snapshot()
+                counts, count, total, _ = snap
+                cumulative = 0
+                for index, bucket_count in enumerate(counts):
+                    cumulative += bucket_count
+                    # Export one boundary per doubling; finer buckets only sharpen quantiles
+                    if index % hist.buckets_per_doubling == 0 and index <= hist._inner:
+                        le = _number(hist.upper_bound(index))
+                        lines.append(f"{name}_bucket{_labels(key, (('le', le),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(key, (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(key)} {count}")
+                for q in EXPORTED_QUANTILES:
+                    quantile_lines.append(
+                        f"{name}_quantile{_labels(key, (('quantile', str(q)),))} {_number(hist.quantile(q, snap))}")
+            if quantile_lines:
+                lines.append(f"# HELP {name}_quantile Approximate latency quantiles from {name}")
+                lines.append(f"# TYPE {name}_quantile gauge")
+                lines.extend(quantile_lines)
+        return '\n'.join(lines) + '\n'
+
+
+# Shared registry for the serving process
+metrics = MetricsRegistry()
+
+
+def stage_histogram(stage: str) -> LatencyHistogram:
+    return metrics.histogram(STAGE_LATENCY_METRIC, 'Latency of each chat pipeline stage', stage=stage)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record the duration of a with-block in the stage's histogram (also on error)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_histogram(stage).observe(time.perf_counter() - start)
+
+
+# Register every stage up front so /metrics lists them before the first request
+for _stage in STAGES:
+    stage_histogram(_stage)
+
+__all__ = ['Counter', 'Gauge', 'LatencyHistogram', 'MetricsRegistry', 'metrics', 'stage_histogram', 'stage_timer',
+           'STAGES', 'STAGE_LATENCY_METRIC']
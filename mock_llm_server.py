@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+🧪 MOCK LLM SERVER - Local stand-in for Gemini and OpenRouter
+Speaks the subset of the Gemini generateContent and OpenRouter chat-completions
+APIs used by smart_llm_chatbot.py, with configurable latency, errors, 429 bursts
+and streaming so the chatbot can be load-tested offline without burning quota.
+
+Point the chatbot at it with:
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089
+    OPENROUTER_API_URL=http://127.0.0.1:8089/api/v1/chat/completions
+
+Run:
+    python mock_llm_server.py --port 8089 --profile realistic
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+# Canned answers in the shape the real models return (markdown, bullets, CTAs)
+# so post-processing is exercised exactly as in production.
+DEFAULT_RESPONSES = [
+    "Hi! For your business, I'd recommend:\n\n• **Website Development** - This will bring you more online customers.\n• **Social Media Marketing** - This will grow your local audience.\n\nWould you like to schedule a free consultation?",
+    "Great question! A **professional website** with online booking will help you capture leads 24/7. Pairing it with *Google My Business* makes you easy to find locally.",
+    "## Quick recommendation\nA WhatsApp **chatbot** can answer customer questions instantly. • Automation saves hours every week. • Payment integration lets customers pay online.",
+    "Hi, how may I help you today?",
+    "Branding services give your business a consistent, memorable identity. This will make customers trust you faster and remember you longer. We can also automate your email marketing so every lead gets a follow-up.",
+]
+
+
+@dataclass
+class LatencyProfile:
+    """Latency distribution for a single provider (all values in milliseconds)"""
+    distribution: str = "fixed"  # fixed, uniform, normal, lognormal, exponential
+    mean_ms: float = 50.0
+    stddev_ms: float = 0.0
+    min_ms: float = 0.0
+    max_ms: float = 30000.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency sample in milliseconds"""
+        if self.distribution == "uniform":
+            value = rng.uniform(self.min_ms, self.max_ms)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.mean_ms, self.stddev_ms)
+        elif self.distribution == "lognormal":
+            # Parameterised by the mean/stddev of the resulting distribution
+            variance = self.stddev_ms ** 2
+            mean = max(self.mean_ms, 1e-6)
+            sigma = math.sqrt(math.log(1 + variance / (mean ** 2)))
+            mu = math.log(mean) - sigma ** 2 / 2
+            value = rng.lognormvariate(mu, sigma)
+        elif self.distribution == "exponential":
+            value = rng.expovariate(1.0 / max(self.mean_ms, 1e-6))
+        else:
+            value = self.mean_ms
+        return min(max(value, self.min_ms), self.max_ms)
+
+
+@dataclass
+class ProviderProfile:
+    """Failure and streaming behaviour for a single mocked provider"""
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    error_rate: float = 0.0           # Probability of a 500 response
+    rate_limit_rate: float = 0.0      # Probability that a 429 burst starts on a request
+    burst_every: int = 0              # Deterministic: start a 429 burst every N requests (0 = off)
+    burst_length: int = 1             # Consecutive 429 responses per burst
+    stream_chunk_words: int = 4       # Words per streamed chunk
+    stream_chunk_delay_ms: float = 20.0
+    response_text: Optional[str] = None  # Fixed answer instead of the canned set
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProviderProfile':
+        data = dict(data or {})
+        latency = LatencyProfile(**data.pop('latency', {}))
+        return cls(latency=latency, **data)
+
+
+# Named presets for common test scenarios
+PRESET_PROFILES = {
+    'fast': {
+        'gemini': {'latency': {'distribution': 'fixed', 'mean_ms': 5}},
+        'openrouter': {'latency': {'distribution': 'fixed', 'mean_ms': 5}},
+    },
+    'realistic': {
+        'gemini': {'latency': {'distribution': 'lognormal', 'mean_ms': 900, 'stddev_ms': 400, 'min_ms': 250}, 'error_rate': 0.01},
+        'openrouter': {'latency': {'distribution': 'lognormal', 'mean_ms': 1800, 'stddev_ms': 900, 'min_ms': 400}, 'error_rate': 0.03},
+    },
+    'degraded': {
+        'gemini': {'latency': {'distribution': 'lognormal', 'mean_ms': 6000, 'stddev_ms': 3000, 'min_ms': 1000}, 'error_rate': 0.15},
+        'openrouter': {'latency': {'distribution': 'lognormal', 'mean_ms': 2500, 'stddev_ms': 1000, 'min_ms': 500}, 'error_rate': 0.05},
+    },
+    'flaky': {
+        'gemini': {'latency': {'distribution': 'exponential', 'mean_ms': 300}, 'error_rate': 0.1, 'burst_every': 20, 'burst_length': 5},
+        'openrouter': {'latency': {'distribution': 'exponential', 'mean_ms': 600}, 'error_rate': 0.1, 'rate_limit_rate': 0.05, 'burst_length': 3},
+    },
+}
+
+
+class MockLLMState:
+    """Thread-safe profile, RNG and counters shared by all request threads"""
+
+    def __init__(self, profiles: Dict[str, Dict] = None, seed: Optional[int] = None):
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.profiles: Dict[str, ProviderProfile] = {}
+        self.burst_remaining: Dict[str, int] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.configure(profiles or PRESET_PROFILES['fast'])
+
+    def configure(self, profiles: Dict[str, Dict]):
+        """Replace provider profiles (unknown providers fall back to defaults)"""
+        with self.lock:
+            self.profiles = {name: ProviderProfile.from_dict(cfg) for name, cfg in profiles.items()}
+            self.burst_remaining = {}
+
+    def profile(self, provider: str) -> ProviderProfile:
+        return self.profiles.get(provider) or ProviderProfile()
+
+    def decide(self, provider: str):
+        """Pick the outcome for one request: (status, latency_seconds)"""
+        profile = self.profile(provider)
+        with self.lock:
+            counters = self.stats.setdefault(provider, {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0})
+            counters['requests'] += 1
+            latency = profile.latency.sample(self.rng) / 1000.0
+
+            remaining = self.burst_remaining.get(provider, 0)
+            starts_burst = (
+                (profile.burst_every and counters['requests'] % profile.burst_every == 0) or
+                (profile.rate_limit_rate and self.rng.random() < profile.rate_limit_rate)
+            )
+            if remaining == 0 and starts_burst:
+                remaining = max(profile.burst_length, 1)
+            if remaining > 0:
+                self.burst_remaining[provider] = remaining - 1
+                counters['rate_limited'] += 1
+                # Rate limits are rejected quickly by real providers
+                return 429, min(latency, 0.05)
+
+            if profile.error_rate and self.rng.random() < profile.error_rate:
+                counters['errors'] += 1
+                return 500, latency
+
+            counters['ok'] += 1
+            return 200, latency
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                'profiles': {name: asdict(p) for name, p in self.profiles.items()},
+                'stats': {name: dict(c) for name, c in self.stats.items()},
+            }
+
+
+def _pick_response(profile: ProviderProfile, prompt_text: str) -> str:
+    """Deterministic canned answer for a prompt"""
+    if profile.response_text:
+        return profile.response_text
+    digest = hashlib.md5(prompt_text.encode('utf-8')).digest()
+    return DEFAULT_RESPONSES[digest[0] % len(DEFAULT_RESPONSES)]
+
+
+def _chunk_words(text: str, words_per_chunk: int) -> List[str]:
+    """Split text into streaming chunks while preserving whitespace"""
+    tokens = text.split(' ')
+    size = max(words_per_chunk, 1)
+    chunks = []
+    for i in range(0, len(tokens), size):
+        chunk = ' '.join(tokens[i:i + size])
+        if i + size < len(tokens):
+            chunk += ' '
+        chunks.append(chunk)
+    return chunks
+
+
+def _token_estimate(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def create_app(state: MockLLMState = None) -> Flask:
+    """Build the mock server Flask app"""
+    state = state or MockLLMState()
+    app = Flask(__name__)
+    app.config['MOCK_STATE'] = state
+
+    def gemini_error(status: int):
+        messages = {
+            429: ("Resource has been exhausted (e.g. check quota).", "RESOURCE_EXHAUSTED"),
+            500: ("An internal error has occurred.", "INTERNAL"),
+        }
+        message, code = messages[status]
+        return jsonify({'error': {'code': status, 'message': message, 'status': code}}), status
+
+    def openrouter_error(status: int):
+        message = "Rate limit exceeded" if status == 429 else "Internal server error"
+        return jsonify({'error': {'code': status, 'message': message}}), status
+
+    @app.route('/v1beta/models/<path:model_action>', methods=['POST'])
+    def gemini_generate(model_action):
+        model, _, action = model_action.partition(':')
+        if action not in ('generateContent', 'streamGenerateContent'):
+            return gemini_error(500)
+
+        body = request.get_json(silent=True) or {}
+        prompt_text = ''.join(
+            part.get('text', '')
+            for content in body.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        profile = state.profile('gemini')
+        status, latency = state.decide('gemini')
+        time.sleep(latency)
+        if status != 200:
+            return gemini_error(status)
+
+        text = _pick_response(profile, prompt_text)
+        usage = {
+            'promptTokenCount': _token_estimate(prompt_text),
+            'candidatesTokenCount': _token_estimate(text),
+            'totalTokenCount': _token_estimate(prompt_text) + _token_estimate(text),
+        }
+
+        def candidate(chunk_text: str, finish: Optional[str]) -> Dict:
+            item = {'content': {'parts': [{'text': chunk_text}], 'role': 'model'}, 'index': 0}
+            if finish:
+                item['finishReason'] = finish
+            return {'candidates': [item], 'usageMetadata': usage, 'modelVersion': model}
+
+        if action == 'generateContent':
+            return jsonify(candidate(text, 'STOP'))
+
+        chunks = _chunk_words(text, profile.stream_chunk_words)
+
+        def stream():
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(profile.stream_chunk_delay_ms / 1000.0)
+                finish = 'STOP' if i == len(chunks) - 1 else None
+                yield f"data: {json.dumps(candidate(chunk, finish))}\r\n\r\n"
+
+        if request.args.get('alt') == 'sse':
+            return Response(stream(), mimetype='text/event-stream')
+        # Without alt=sse the REST API returns a JSON array of chunks
+        return Response(json.dumps([candidate(c, 'STOP' if i == len(chunks) - 1 else None)
+                                    for i, c in enumerate(chunks)]), mimetype='application/json')
+
+    @app.route('/api/v1/chat/completions', methods=['POST'])
+    def openrouter_chat():
+        body = request.get_json(silent=True) or {}
+        messages = body.get('messages', [])
+        prompt_text = ''.join(m.get('content', '') for m in messages if isinstance(m.get('content'), str))
+        model = body.get('model', 'mock-model')
+        profile = state.profile('openrouter')
+        status, latency = state.decide('openrouter')
+        time.sleep(latency)
+        if status != 200:
+            return openrouter_error(status)
+
+        text = _pick_response(profile, prompt_text)
+        completion_id = f"gen-{uuid.uuid4().hex[:16]}"
+        created = int(time.time())
+
+        if not body.get('stream'):
+            return jsonify({
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                'usage': {
+                    'prompt_tokens': _token_estimate(prompt_text),
+                    'completion_tokens': _token_estimate(text),
+                    'total_tokens': _token_estimate(prompt_text) + _token_estimate(text),
+                },
+            })
+
+        chunks = _chunk_words(text, profile.stream_chunk_words)
+
+        def stream():
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(profile.stream_chunk_delay_ms / 1000.0)
+                event = {
+                    'id': completion_id,
+                    'object': 'chat.completion.chunk',
+                    'created': created,
+                    'model': model,
+                    'choices': [{'index': 0, 'delta': {'content': chunk},
+                                 'finish_reason': 'stop' if i == len(chunks) - 1 else None}],
+                }
+                yield f"data: {json.dumps(event)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(stream(), mimetype='text/event-stream')
+
+    @app.route('/_mock/profile', methods=['GET', 'POST'])
+    def mock_profile():
+        """Inspect or replace the active profiles at runtime"""
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            preset = data.get('preset')
+            if preset:
+                if preset not in PRESET_PROFILES:
+                    return jsonify({'error': f"Unknown preset: {preset}"}), 400
+                state.configure(PRESET_PROFILES[preset])
+            else:
+                state.configure(data.get('profiles', {}))
+        return jsonify(state.snapshot())
+
+    @app.route('/_mock/health', methods=['GET'])
+    def mock_health():
+        return jsonify({'status': 'healthy', 'service': 'Mock LLM Server'})
+
+    return app
+
+
+def load_profiles(profile: str) -> Dict[str, Dict]:
+    """Resolve a preset name or a JSON file path into provider profiles"""
+    if profile in PRESET_PROFILES:
+        return PRESET_PROFILES[profile]
+    with open(profile, 'r') as f:
+        return json.load(f)
+
+
+def start_in_thread(profiles: Dict[str, Dict] = None, host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+    """Start the mock server on a background thread (port 0 picks a free port)
+
+    Returns (server, base_url); call server.shutdown() to stop it.
+    """
+    from werkzeug.serving import make_server
+
+    app = create_app(MockLLMState(profiles, seed=seed))
+    server = make_server(host, port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='mock-llm-server', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock Gemini/OpenRouter server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('MOCK_LLM_PORT', '8089')))
+    parser.add_argument('--profile', default=os.getenv('MOCK_LLM_PROFILE', 'realistic'),
+                        help=f"Preset ({', '.join(PRESET_PROFILES)}) or path to a JSON profile file")
+    parser.add_argument('--seed', type=int, default=None, help="RNG seed for reproducible runs")
+    args = parser.parse_args()
+
+    app = create_app(MockLLMState(load_profiles(args.profile), seed=args.seed))
+    print("🧪 MOCK LLM SERVER")
+    print(f"📡 Gemini:     GEMINI_API_ENDPOINT=http://{args.host}:{args.port}")
+    print(f"📡 OpenRouter: OPENROUTER_API_URL=http://{args.host}:{args.port}/api/v1/chat/completions")
+    print(f"⚙️ Profile: {args.profile}")
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
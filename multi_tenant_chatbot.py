@@ -7,10 +7,15 @@ Each business gets customized responses, branding, and data
 
 import json
 import os
+import re
 from typing import Dict, Optional
 from dataclasses import dataclass
 import logging
 
+# Default greeting stripped from continuing conversations
+DEFAULT_GREETING_PATTERN = r'^(Hi|Hello|Hey)\s+[^,!.]*[,!.]\s*'
+DEFAULT_INITIAL_GREETING = "Hello! I'm here to help {business_name} grow your business. "
+
 @dataclass
 class BusinessConfig:
     """Business configuration data structure"""
@@ -23,6 +28,38 @@ class BusinessConfig:
     response_customization: Dict
     csv_data_file: str
     business_data: Dict
+    routing_policy: Optional[Dict] = None
+    rewrite_rules: Optional[Dict] = None
+
+class CompiledRewriteRules:
+    """Tenant rewrite rules compiled once into a single alternation regex + lookup table"""
+
+    def __init__(self, rules: Optional[Dict], business_name: str):
+        rules = rules or {}
+        self.initial_greeting = rules.get('initial_greeting', DEFAULT_INITIAL_GREETING).format(business_name=business_name)
+        self.greeting_re = re.compile(rules.get('greeting_pattern', DEFAULT_GREETING_PATTERN), re.IGNORECASE)
+
+        # Brand substitution + tone map, e.g. {"Techrypt": "{business_name}", "customers": "pet parents and customers"}
+        self.table = {
+            source: target.format(business_name=business_name)
+            for source, target in rules.get('substitutions', {}).items()
+            if source and source != target.format(business_name=business_name)
+        }
+        self.pattern = None
+        if self.table:
+            # Longest phrases first so overlapping rules prefer the most specific match
+            alternation = '|'.join(re.escape(source) for source in sorted(self.table, key=len, reverse=True))
+            self.pattern = re.compile(alternation)
+
+    def strip_greeting(self, response: str) -> str:
+        return self.greeting_re.sub('', response, count=1).strip()
+
+    def apply(self, response: str) -> str:
+        """Apply every substitution in one pass over the text"""
+        if self.pattern is None:
+            return response
+        table = self.table
+        return self.pattern.sub(lambda match: table[match.group(0)], response)
 
 class MultiTenantChatbotManager:
     """Manages multiple business configurations and routing"""
@@ -30,6 +67,7 @@ class MultiTenantChatbotManager:
     def __init__(self, config_dir: str = "config"):
         self.config_dir = config_dir
         self.business_configs: Dict[str, BusinessConfig] = {}
+        self.rewrite_rules: Dict[str, CompiledRewriteRules] = {}
         self.load_all_configurations()
         
     def load_all_configurations(self):
@@ -47,7 +85,11 @@ class MultiTenantChatbotManager:
                     with open(config_path, 'r') as f:
                         config_data = json.load(f)
                     
-                    self.business_configs[business_id] = BusinessConfig(
+                    # Compile first: a tenant with invalid rewrite rules is not registered at all
+                    rewrite_rules = CompiledRewriteRules(
+                        config_data.get('rewrite_rules'), config_data['business_name']
+                    )
+                    config = BusinessConfig(
                         business_name=config_data['business_name'],
                         business_id=config_data['business_id'],
                         domain=config_data['domain'],
@@ -56,8 +98,12 @@ class MultiTenantChatbotManager:
                         business_profile=config_data['business_profile'],
                         response_customization=config_data['response_customization'],
                         csv_data_file=config_data['csv_data_file'],
-                        business_data=config_data['business_data']
+                        business_data=config_data['business_data'],
+                        routing_policy=config_data.get('routing_policy'),
+                        rewrite_rules=config_data.get('rewrite_rules')
                     )
+                    self.business_configs[business_id] = config
+                    self.rewrite_rules[business_id] = rewrite_rules
                     print(f"✅ Loaded configuration for {config_data['business_name']}")
                 except Exception as e:
                     print(f"❌ Error loading {config_file}: {e}")
@@ -96,6 +142,13 @@ class MultiTenantChatbotManager:
             return api_key
         return None
     
+    def get_routing_policy(self, business_id: str) -> Optional[Dict]:
+        """Get provider routing policy override for specific business"""
+        config = self.get_business_config(business_id)
+        if config:
+            return config.routing_policy
+        return None
+    
     def get_csv_data_path(self, business_id: str) -> str:
         """Get CSV data file path for specific business"""
         config = self.get_business_config(business_id)
@@ -108,11 +161,7 @@ class MultiTenantChatbotManager:
         config = self.get_business_config(business_id)
         if not config:
             return response
-            
-        # Apply business-specific customizations
-        business_name = config.business_name
-        tone = config.business_profile['tone']
-        brand_voice = config.business_profile['brand_voice']
+        rules = self.rewrite_rules[business_id]
         
         # Check if we should avoid repetitive greetings
         avoid_greetings = config.response_customization.get('avoid_repetitive_greetings', False)
@@ -120,40 +169,14 @@ class MultiTenantChatbotManager:
         
         # Only add business-specific greeting for initial messages
         if context and context.get('is_initial_greeting', False) and not is_continuing_conversation:
-            greeting_style = config.response_customization['greeting_style']
-            response = f"Hello! I'm here to help {business_name} grow your business. {response}"
+            response = rules.initial_greeting + response
         
         # Remove redundant greetings if this is a continuing conversation
         if avoid_greetings and is_continuing_conversation:
-            # Remove common greeting patterns
-            import re
-            response = re.sub(r'^(Hi|Hello|Hey)\s+[^,!.]*[,!.]\s*', '', response, flags=re.IGNORECASE)
-            response = response.strip()
+            response = rules.strip_greeting(response)
         
-        # Replace generic mentions with business-specific ones
-        response = response.replace('Techrypt', business_name)
-        
-        # Apply tone adjustments based on business
-        if business_id == 'pets':
-            response = self._apply_pet_friendly_tone(response)
-        elif business_id == 'fitness':
-            response = self._apply_fitness_energy_tone(response)
-            
-        return response
-    
-    def _apply_pet_friendly_tone(self, response: str) -> str:
-        """Apply pet-friendly language modifications"""
-        # Add pet-friendly language
-        response = response.replace('customers', 'pet parents and customers')
-        response = response.replace('your business', 'your pet business')
-        return response
-    
-    def _apply_fitness_energy_tone(self, response: str) -> str:
-        """Apply energetic fitness language modifications"""
-        # Add fitness-focused language
-        response = response.replace('customers', 'members and clients')
-        response = response.replace('your business', 'your fitness business')
-        return response
+        # Brand substitution and tone adjustments, compiled from the tenant's rewrite_rules
+        return rules.apply(response)
     
     def get_business_summary(self) -> Dict:
         """Get summary of all loaded business configurations"""
@@ -172,4 +195,4 @@ class MultiTenantChatbotManager:
 multi_tenant_manager = MultiTenantChatbotManager()
 
 # Export for use in main chatbot
-__all__ = ['MultiTenantChatbotManager', 'BusinessConfig', 'multi_tenant_manager']
+__all__ = ['MultiTenantChatbotManager', 'BusinessConfig', 'CompiledRewriteRules', 'multi_tenant_manager']
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+🧭 LATENCY-AWARE PROVIDER ROUTER
+Orders the response providers (Gemini → Mistral → CSV by default) per request
+using live EWMA / p95 latency and success-rate statistics, with per-tenant
+policy overrides and a small exploration share so stale stats can recover.
+"""
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Router configuration
+ROUTER_P95_TARGET_MS = float(os.getenv('ROUTER_P95_TARGET_MS', '4000'))
+ROUTER_MIN_SUCCESS_RATE = float(os.getenv('ROUTER_MIN_SUCCESS_RATE', '0.8'))
+ROUTER_EXPLORATION_RATE = float(os.getenv('ROUTER_EXPLORATION_RATE', '0.05'))
+ROUTER_EWMA_ALPHA = float(os.getenv('ROUTER_EWMA_ALPHA', '0.2'))
+ROUTER_WINDOW_SIZE = int(os.getenv('ROUTER_WINDOW_SIZE', '200'))
+ROUTER_MIN_SAMPLES = int(os.getenv('ROUTER_MIN_SAMPLES', '5'))
+
+DEFAULT_PROVIDER_ORDER = ['gemini', 'mistral', 'csv']
+
+# Providers that are always kept as the last resort, after every LLM tier
+TERMINAL_PROVIDERS = {'csv'}
+
+
+class ProviderStats:
+    """Rolling latency/success statistics for one provider (fixed memory)"""
+
+    __slots__ = ('name', 'window', 'index', 'count', 'ewma_latency_ms', 'ewma_success',
+                 'successes', 'failures', 'last_used', '_p95_cache')
+
+    def __init__(self, name: str, window_size: int = ROUTER_WINDOW_SIZE):
+        self.name = name
+        self.window = [0.0] * window_size  # Ring buffer of recent latencies
+        self.index = 0
+        self.count = 0
+        self.ewma_latency_ms = 0.0
+        self.ewma_success = 1.0
+        self.successes = 0
+        self.failures = 0
+        self.last_used = 0.0
+        self._p95_cache = None
+
+    def record(self, latency_ms: float, success: bool, alpha: float = ROUTER_EWMA_ALPHA):
+        self.window[self.index] = latency_ms
+        self.index = (self.index + 1) % len(self.window)
+        self.count += 1
+        if self.count == 1:
+            self.ewma_latency_ms = latency_ms
+            self.ewma_success = 1.0 if success else 0.0
+        else:
+            self.ewma_latency_ms += alpha * (latency_ms - self.ewma_latency_ms)
+            self.ewma_success += alpha * ((1.0 if success else 0.0) - self.ewma_success)
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+        self.last_used = time.time()
+        self._p95_cache = None
+
+    def percentile(self, pct: float) -> float:
+        samples = min(self.count, len(self.window))
+        if samples == 0:
+            return 0.0
+        ordered = sorted(self.window[:samples])
+        return ordered[min(samples - 1, int(round(pct / 100.0 * (samples - 1))))]
+
+    @property
+    def p95_ms(self) -> float:
+        if self._p95_cache is None:
+            self._p95_cache = self.percentile(95)
+        return self._p95_cache
+
+    def to_dict(self) -> Dict:
+        total = self.successes + self.failures
+        return {
+            'requests': total,
+            'success_rate': round(self.successes / total, 4) if total else None,
+            'ewma_success': round(self.ewma_success, 4),
+            'ewma_latency_ms': round(self.ewma_latency_ms, 1),
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.p95_ms, 1),
+            'last_used': self.last_used or None,
+        }
+
+
+@dataclass
+class RoutingDecision:
+    """Provider order chosen for one request, reported in response metadata"""
+    order: List[str]
+    reason: str = "default"
+    explored: Optional[str] = None
+    tenant: Optional[str] = None
+    attempts: List[Dict] = field(default_factory=list)
+
+    def record_attempt(self, provider: str, latency_ms: float, success: bool):
+        self.attempts.append({'provider': provider, 'latency_ms': round(latency_ms, 1), 'ok': success})
+
+    def to_dict(self) -> Dict:
+        return {
+            'order': self.order,
+            'reason': self.reason,
+            'explored': self.explored,
+            'tenant': self.tenant,
+            'attempts': self.attempts,
+        }
+
+
+class ProviderRouter:
+    """Chooses the provider order per request from live latency/success stats"""
+
+    def __init__(self, providers: List[str] = None, p95_target_ms: float = ROUTER_P95_TARGET_MS,
+                 min_success_rate: float = ROUTER_MIN_SUCCESS_RATE,
+                 exploration_rate: float = ROUTER_EXPLORATION_RATE, seed: Optional[int] = None):
+        self.providers = list(providers or DEFAULT_PROVIDER_ORDER)
+        self.p95_target_ms = p95_target_ms
+        self.min_success_rate = min_success_rate
+        self.exploration_rate = exploration_rate
+        self.stats: Dict[str, ProviderStats] = {name: ProviderStats(name) for name in self.providers}
+        self.decisions = {'default': 0, 'adaptive': 0, 'explored': 0, 'fixed': 0}
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+
+    def _meets_target(self, stats: ProviderStats, p95_target_ms: float, min_success_rate: float) -> Optional[bool]:
+        """True/False once a provider has enough samples, None while still warming up"""
+        if stats.count < ROUTER_MIN_SAMPLES:
+            return None
+        return stats.p95_ms <= p95_target_ms and stats.ewma_success >= min_success_rate
+
+    def route(self, policy: Dict = None, tenant: str = None) -> RoutingDecision:
+        """Pick the provider order for a request
+
+        policy (per-tenant override) may contain:
+            providers:        preferred order, e.g. ["mistral", "gemini", "csv"]
+            mode:             "adaptive" (default) or "fixed" to disable reordering
+            p95_target_ms:    latency target for this tenant
+            min_success_rate: minimum EWMA success rate
+            exploration_rate: share of requests that probe a demoted provider
+        """
+        policy = policy or {}
+        preferred = [p for p in policy.get('providers', self.providers) if p in self.stats]
+        p95_target_ms = float(policy.get('p95_target_ms', self.p95_target_ms))
+        min_success_rate = float(policy.get('min_success_rate', self.min_success_rate))
+        exploration_rate = float(policy.get('exploration_rate', self.exploration_rate))
+
+        with self.lock:
+            if policy.get('mode') == 'fixed':
+                self.decisions['fixed'] += 1
+                return RoutingDecision(order=preferred, reason='fixed', tenant=tenant)
+
+            llm_tiers = [p for p in preferred if p not in TERMINAL_PROVIDERS]
+            terminal = [p for p in preferred if p in TERMINAL_PROVIDERS]
+
+            healthy, unknown, slow = [], [], []
+            for name in llm_tiers:
+                verdict = self._meets_target(self.stats[name], p95_target_ms, min_success_rate)
+                if verdict is None:
+                    unknown.append(name)
+                elif verdict:
+                    healthy.append(name)
+                else:
+                    slow.append(name)
+
+            # Providers over target are ordered by expected cost: latency inflated by failure rate
+            slow.sort(key=lambda n: self.stats[n].ewma_latency_ms / max(self.stats[n].ewma_success, 0.05))
+
+            # Keep preference order among healthy and warming-up providers
+            order = [p for p in llm_tiers if p in healthy or p in unknown] + slow + terminal
+            reason = 'adaptive' if order != preferred else 'default'
+
+            explored = None
+            if slow and exploration_rate > 0 and self.rng.random() < exploration_rate:
+                # Probe a demoted provider first so its stats can recover
+                explored = self.rng.choice(slow)
+                order.remove(explored)
+                order.insert(0, explored)
+                reason = 'explored'
+
+            self.decisions[reason] += 1
+            return RoutingDecision(order=order, reason=reason, explored=explored, tenant=tenant)
+
+    def record(self, provider: str, latency_ms: float, success: bool):
+        """Feed one provider call outcome back into the stats"""
+        with self.lock:
+            stats = self.stats.get(provider)
+            if stats is None:
+                stats = self.stats[provider] = ProviderStats(provider)
+            stats.record(latency_ms, success)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'p95_target_ms': self.p95_target_ms,
+                'min_success_rate': self.min_success_rate,
+                'exploration_rate': self.exploration_rate,
+                'decisions': dict(self.decisions),
+                'providers': {name: stats.to_dict() for name, stats in self.stats.items()},
+            }
+
+
+__all__ = ['ProviderRouter', 'ProviderStats', 'RoutingDecision', 'DEFAULT_PROVIDER_ORDER']
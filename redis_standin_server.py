@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+🧪 REDIS STAND-IN SERVER - Local Redis-protocol (RESP2) key-value server
+Implements the command subset used by RedisSessionBackend (GET/SET with
+expiry, DEL, WATCH/MULTI/EXEC, ...) so shared-session behaviour can be tested
+offline without installing Redis.
+
+Run:
+    python redis_standin_server.py --port 6379
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class KeyValueState:
+    """Shared data with per-key versions so WATCH can detect concurrent writes"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}  # key -> (value, expires_at)
+        self.versions: Dict[bytes, int] = {}
+
+    def _touch(self, key: bytes):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _live(self, key: bytes) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            self._touch(key)
+            return None
+        return entry
+
+    def version(self, key: bytes) -> int:
+        with self.lock:
+            self._live(key)
+            return self.versions.get(key, 0)
+
+
+def _simple(text: str) -> bytes:
+    return b'+' + text.encode('utf-8') + b'\r\n'
+
+
+def _error(text: str) -> bytes:
+    return b'-' + text.encode('utf-8') + b'\r\n'
+
+
+def _integer(value: int) -> bytes:
+    return b':%d\r\n' % value
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def _array(items: Optional[List[bytes]]) -> bytes:
+    if items is None:
+        return b'*-1\r\n'
+    return b'*%d\r\n' % len(items) + b''.join(items)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """One client connection: parses RESP arrays and keeps WATCH/MULTI state"""
+
+    def setup(self):
+        super().setup()
+        self.watched: Dict[bytes, int] = {}
+        self.queued: Optional[List[List[bytes]]] = None
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.strip().split()  # Inline command (e.g. from telnet)
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if not args:
+                return
+            name = args[0].upper().decode('utf-8', 'replace')
+            if name == 'QUIT':
+                self.wfile.write(_simple('OK'))
+                return
+            self.wfile.write(self.dispatch(name, args[1:]))
+
+    def dispatch(self, name: str, args: List[bytes]) -> bytes:
+        state: KeyValueState = self.server.state
+        if self.queued is not None and name not in ('EXEC', 'DISCARD', 'MULTI', 'WATCH'):
+            self.queued.append([name.encode('utf-8')] + args)
+            return _simple('QUEUED')
+        if name == 'MULTI':
+            if self.queued is not None:
+                return _error('ERR MULTI calls can not be nested')
+            self.queued = []
+            return _simple('OK')
+        if name == 'DISCARD':
+            self.queued = None
+            self.watched = {}
+            return _simple('OK')
+        if name == 'WATCH':
+            if self.queued is not None:
+                return _error('ERR WATCH inside MULTI is not allowed')
+            for key in args:
+                self.watched[key] = state.version(key)
+            return _simple('OK')
+        if name == 'UNWATCH':
+            self.watched = {}
+            return _simple('OK')
+        if name == 'EXEC':
+            if self.queued is None:
+                return _error('ERR EXEC without MULTI')
+            queued, self.queued = self.queued, None
+            with state.lock:
+                aborted = any(state.version(key) != version for key, version in self.watched.items())
+                self.watched = {}
+                if aborted:
+                    return _array(None)
+                return _array([self.execute(cmd[0].decode('utf-8'), cmd[1:]) for cmd in queued])
+        with state.lock:
+            return self.execute(name, args)
+
+    def execute(self, name: str, args: List[bytes]) -> bytes:
+        state: KeyValueState = self.server.state
+        if name == 'PING':
+            return _bulk(args[0]) if args else _simple('PONG')
+        if name == 'ECHO':
+            return _bulk(args[0])
+        if name in ('SELECT', 'AUTH'):
+            return _simple('OK')
+        if name == 'GET':
+            entry = state._live(args[0])
+            return _bulk(entry[0] if entry else None)
+        if name == 'SET':
+            key, value = args[0], args[1]
+            expires_at = None
+            options = [a.upper() for a in args[2:]]
+            exists = state._live(key) is not None
+            if b'NX' in options and exists or b'XX' in options and not exists:
+                return _bulk(None)
+            for i, option in enumerate(options):
+                if option == b'EX':
+                    expires_at = time.time() + int(args[2 + i + 1])
+                elif option == b'PX':
+                    expires_at = time.time() + int(args[2 + i + 1]) / 1000.0
+            state.data[key] = (value, expires_at)
+            state._touch(key)
+            return _simple('OK')
+        if name == 'DEL':
+            removed = 0
+            for key in args:
+                if state._live(key) is not None:
+                    del state.data[key]
+                    state._touch(key)
+                    removed += 1
+            return _integer(removed)
+        if name == 'EXISTS':
+            return _integer(sum(1 for key in args if state._live(key) is not None))
+        if name in ('EXPIRE', 'PEXPIRE'):
+            entry = state._live(args[0])
+            if entry is None:
+                return _integer(0)
+            seconds = int(args[1]) / (1000.0 if name == 'PEXPIRE' else 1.0)
+            state.data[args[0]] = (entry[0], time.time() + seconds)
+            state._touch(args[0])
+            return _integer(1)
+        if name in ('TTL', 'PTTL'):
+            entry = state._live(args[0])
+            if entry is None:
+                return _integer(-2)
+            if entry[1] is None:
+                return _integer(-1)
+            remaining = entry[1] - time.time()
+            return _integer(int(remaining * 1000) if name == 'PTTL' else int(remaining))
+        if name == 'DBSIZE':
+            return _integer(sum(1 for key in list(state.data) if state._live(key) is not None))
+        if name in ('FLUSHDB', 'FLUSHALL'):
+            for key in list(state.data):
+                state._touch(key)
+            state.data.clear()
+            return _simple('OK')
+        return _error(f"ERR unknown command '{name}'")
+
+
+class RedisStandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int]):
+        super().__init__(address, RespHandler)
+        self.state = KeyValueState()
+
+
+def start_in_thread(host: str = '127.0.0.1', port: int = 0):
+    """Start the stand-in on a background thread (port 0 picks a free port)
+
+    Returns (server, url); call server.shutdown() to stop it.
+    """
+    server = RedisStandInServer((host, port))
+    thread = threading.Thread(target=server.serve_forever, name='redis-standin', daemon=True)
+    thread.start()
+    return server, f"redis://{host}:{server.server_address[1]}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+
+    server = RedisStandInServer((args.host, args.port))
+    print("🧪 REDIS STAND-IN SERVER")
+    print(f"📡 REDIS_URL=redis://{args.host}:{args.port}/0")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+✂️ RESPONSE FORMATTER - Compiled post-processor for LLM answers
+Strips markdown, enforces the short-answer word budget, personalises, lays out
+bullet points and appends the consultation CTA. Produces exactly the same
+output as the original GeminiChatbotHandler._post_process_response, but with
+every pattern compiled once, regex passes skipped when their marker characters
+are absent, and the text tokenised once on the common path.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Markdown patterns (applied in this order, matching the original passes)
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC_RE = re.compile(r'\*(.*?)\*')
+_HEADER_RE = re.compile(r'#{1,6}\s*')
+_BLANK_LINES_RE = re.compile(r'\n\n+')
+
+DEFAULT_CTA_KEYWORDS = ('consultation', 'call', 'meeting', 'schedule', 'book')
+
+SOFT_WORD_LIMIT = 60       # Above this, trim to whole sentences
+SENTENCE_WORD_BUDGET = 50  # Words kept when trimming to sentences (room for CTA)
+HARD_WORD_LIMIT = 80       # Above this, emergency trim to EMERGENCY_WORDS
+EMERGENCY_WORDS = 70
+
+CONSULTATION_CTA = "\n\nWould you like to schedule a free consultation?"
+LEARN_MORE_CTA = "\n\nInterested in learning more?"
+
+
+class ResponseFormatter:
+    """Single-tokenisation response post-processor shared by every provider path"""
+
+    def __init__(self, cta_keywords: Iterable[str] = DEFAULT_CTA_KEYWORDS):
+        # All CTA keywords are matched with one compiled alternation (substring semantics)
+        self.cta_keywords = tuple(cta_keywords)
+        self._cta_re = re.compile('|'.join(re.escape(k) for k in sorted(self.cta_keywords, key=len, reverse=True)))
+        self._cta_word_counts = {
+            CONSULTATION_CTA: len(CONSULTATION_CTA.split()),
+            LEARN_MORE_CTA: len(LEARN_MORE_CTA.split()),
+        }
+
+    @staticmethod
+    def _strip_markdown(text: str) -> str:
+        if '*' in text:
+            text = _BOLD_RE.sub(r'\1', text)
+            if '*' in text:
+                text = _ITALIC_RE.sub(r'\1', text)
+        if '#' in text:
+            text = _HEADER_RE.sub('', text)
+        if '\n\n\n' in text:
+            text = _BLANK_LINES_RE.sub('\n\n', text)
+        return text.strip()
+
+    @staticmethod
+    def _trim_to_sentences(text: str) -> str:
+        essential_sentences = []
+        word_count = 0
+        for sentence in text.split('. '):
+            sentence_words = len(sentence.split())
+            if word_count + sentence_words <= SENTENCE_WORD_BUDGET:
+                essential_sentences.append(sentence)
+                word_count += sentence_words
+            else:
+                break
+        text = '. '.join(essential_sentences)
+        if not text.endswith('.'):
+            text += '.'
+        return text
+
+    @staticmethod
+    def _layout_bullets(text: str) -> str:
+        lines: List[str] = text.split('\n')
+        changed = False
+        for i, line in enumerate(lines):
+            if '•' in line and not line.strip().startswith('•'):
+                # Ensure bullet points are on new lines
+                lines[i] = line.replace('•', '\n•')
+                changed = True
+        if not changed:
+            return text
+        text = '\n'.join(lines)
+        if '\n\n\n' in text:
+            text = _BLANK_LINES_RE.sub('\n\n', text)
+        return text
+
+    def format(self, response: str, context: Optional[Dict] = None, conversation_count: int = 0) -> str:
+        """Post-process one complete LLM answer"""
+        response = self._strip_markdown(response)
+
+        # Ensure response is SHORT: one tokenisation, reused for the final length check
+        word_count = len(response.split())
+        if word_count > SOFT_WORD_LIMIT:
+            response = self._trim_to_sentences(response)
+            word_count = len(response.split())
+
+        # Add personalization if name is available
+        if context and context.get('name'):
+            user_name = context['name']
+            if user_name not in response and not response.startswith(('Hi', 'Hello')):
+                prefix = f"Hi {user_name}! "
+                response = prefix + response
+                word_count += len(prefix.split())
+
+        # Format bullet points nicely (splitting "a•b" can change the word count)
+        if '•' in response:
+            formatted = self._layout_bullets(response)
+            if formatted is not response:
+                response = formatted
+                word_count = len(response.split())
+
+        # Add consultation CTA for later messages (short and direct)
+        if conversation_count >= 1 and not self._cta_re.search(response.lower()):
+            cta = CONSULTATION_CTA if conversation_count >= 2 else LEARN_MORE_CTA
+            response += cta
+            word_count += self._cta_word_counts[cta]
+
+        # Final length check - ensure under HARD_WORD_LIMIT words total
+        if word_count > HARD_WORD_LIMIT:
+            trimmed = ' '.join(response.split()[:EMERGENCY_WORDS])
+            if conversation_count >= 2:
+                response = trimmed + "... Ready to discuss this further?"
+            else:
+                response = trimmed + "..."
+
+        return response.strip()
+
+    def format_stream(self, chunks: Iterable[str], context: Optional[Dict] = None, conversation_count: int = 0) -> str:
+        """Format a streamed answer once all chunks have arrived
+
+        Word budgets and CTAs depend on the whole answer, so streamed text is
+        buffered and formatted with exactly the same rules as non-streamed text.
+        """
+        return self.format(''.join(chunks), context, conversation_count)
+
+
+# Shared instance for Gemini, Mistral and streaming paths
+response_formatter = ResponseFormatter()
+
+__all__ = ['ResponseFormatter', 'response_formatter', 'DEFAULT_CTA_KEYWORDS']
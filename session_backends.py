@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+🔌 SESSION BACKENDS - Pluggable conversation state storage
+In-memory backend (single process) and an external key-value backend that
+speaks the Redis protocol (RESP2) so several workers or nodes can share
+multi-turn context behind a plain load balancer.
+
+Both backends expose the same interface:
+    load(session_id, factory)           -> context (read for prompt building)
+    update(session_id, mutate, factory) -> context (atomic read-modify-write)
+
+The in-memory backend can snapshot itself to disk (SESSION_SNAPSHOT_PATH) so
+sessions survive restarts. The Redis backend uses WATCH/MULTI/EXEC optimistic
+concurrency per session, compact serialization (short-key JSON, zlib above a
+size threshold) and lets the store expire idle sessions (SET ... PX ttl).
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import zlib
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from session_snapshot import SESSION_SNAPSHOT_INTERVAL, SESSION_SNAPSHOT_PATH, SessionSnapshotter
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory').lower()  # memory, redis
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+REDIS_KEY_PREFIX = os.getenv('REDIS_KEY_PREFIX', 'techrypt:session:')
+REDIS_POOL_SIZE = int(os.getenv('REDIS_POOL_SIZE', '16'))
+REDIS_TIMEOUT = float(os.getenv('REDIS_TIMEOUT', '2.0'))
+SESSION_IDLE_TTL = float(os.getenv('SESSION_IDLE_TTL', '1800'))
+
+# Serialized format: 1 version byte + 1 encoding byte + payload
+CODEC_VERSION = 1
+COMPRESS_THRESHOLD = 512  # bytes of JSON above which zlib is used
+
+
+def encode_context(context, compress: bool = True) -> bytes:
+    """Serialize a context's to_state() into compact bytes
+
+    compress=False skips per-session zlib, for containers (like snapshots)
+    that compress many sessions together.
+    """
+    payload = json.dumps(context.to_state(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if compress and len(payload) > COMPRESS_THRESHOLD:
+        return bytes((CODEC_VERSION, ord('z'))) + zlib.compress(payload, 6)
+    return bytes((CODEC_VERSION, ord('j'))) + payload
+
+
+def decode_context(blob: bytes, context_cls):
+    """Inverse of encode_context; any unreadable blob raises ValueError"""
+    if len(blob) < 2 or blob[0] != CODEC_VERSION:
+        raise ValueError(f"Unsupported session encoding version: {blob[:1]!r}")
+    try:
+        payload = zlib.decompress(blob[2:]) if blob[1] == ord('z') else blob[2:]
+        return context_cls.from_state(json.loads(payload.decode('utf-8')))
+    except (zlib.error, ValueError, TypeError, AttributeError, KeyError) as e:  # UnicodeDecodeError is a ValueError
+        raise ValueError(f"Corrupt session blob: {e!r}") from e
+
+
+class SessionBackend:
+    """Interface for conversation state storage"""
+
+    name = 'base'
+
+    def load(self, session_id: str, factory: Callable[[], Any]) -> Any:
+        raise NotImplementedError
+
+    def update(self, session_id: str, mutate: Callable[[Any], None], factory: Callable[[], Any]) -> Any:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def before_fork(self):
+        """Quiesce background work in a pre-fork master process"""
+
+    def after_fork(self):
+        """Re-create per-process resources (threads, sockets) in a forked worker"""
+
+    def get_stats(self) -> Dict:
+        return {'backend': self.name}
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Process-local backend over the bounded LRU + TTL SessionStore"""
+
+    name = 'memory'
+
+    def __init__(self, store: SessionStore = None, context_cls=None):
+        if store is None:
+            decoder = (lambda blob: decode_context(blob, context_cls)) if context_cls is not None else None
+            store = SessionStore(decoder=decoder)
+        self.store = store
+        self.snapshots: Optional[SessionSnapshotter] = None
+
+    def enable_snapshots(self, path: str = SESSION_SNAPSHOT_PATH, interval: float = SESSION_SNAPSHOT_INTERVAL):
+        """Restore sessions from path in the background and snapshot them every interval"""
+        self.snapshots = SessionSnapshotter(self.store, lambda context: encode_context(context, compress=False),
+                                            path, interval)
+        self.snapshots.start()
+
+    def load(self, session_id: str, factory: Callable[[], Any]) -> Any:
+        context, _ = self.store.get_or_create(session_id, factory)
+        return context
+
+    def update(self, session_id: str, mutate: Callable[[Any], None], factory: Callable[[], Any]) -> Any:
+        with self.store.locked(session_id):
+            context, _ = self.store.get_or_create(session_id, factory)
+            mutate(context)
+        return context
+
+    def delete(self, session_id: str) -> bool:
+        return self.store.delete(session_id)
+
+    def before_fork(self):
+        if self.snapshots is not None:
+            self.snapshots.pause()
+
+    def after_fork(self):
+        if self.snapshots is not None:
+            self.snapshots.resume()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get_stats(self) -> Dict:
+        stats = {'backend': self.name, **self.store.get_stats()}
+        if self.snapshots is not None:
+            stats['snapshot'] = self.snapshots.get_stats()
+        return stats
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RespConnection:
+    """Minimal blocking RESP2 client connection"""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = REDIS_TIMEOUT):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            return RespError(rest.decode('utf-8'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected RESP reply: {line!r}")
+
+    def execute(self, *args):
+        self.sock.sendall(self._encode(args))
+        reply = self._read_reply()
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RespConnectionPool:
+    """Bounded pool; a connection is held for a whole WATCH/MULTI/EXEC cycle"""
+
+    def __init__(self, url: str, size: int = REDIS_POOL_SIZE):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self._idle: "queue.LifoQueue[RespConnection]" = queue.LifoQueue(maxsize=size)
+
+    def acquire(self) -> RespConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return RespConnection(self.host, self.port, self.db, self.password)
+
+    def release(self, conn: RespConnection, broken: bool = False):
+        if broken:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+class RedisSessionBackend(SessionBackend):
+    """Shared backend for any Redis-protocol key-value server"""
+
+    name = 'redis'
+
+    def __init__(self, context_cls, url: str = REDIS_URL, ttl: float = SESSION_IDLE_TTL,
+                 key_prefix: str = REDIS_KEY_PREFIX, max_retries: int = 5):
+        self.context_cls = context_cls
+        self.url = url
+        self.ttl_ms = int(ttl * 1000)
+        self.key_prefix = key_prefix
+        self.max_retries = max_retries
+        self.pool = RespConnectionPool(url)
+        self._stats_lock = threading.Lock()
+        self.stats = {'loads': 0, 'updates': 0, 'conflicts': 0, 'conflict_overwrites': 0, 'errors': 0,
+                      'decode_errors': 0, 'bytes_written': 0}
+
+    def _key(self, session_id: str) -> str:
+        return self.key_prefix + session_id
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def load(self, session_id: str, factory: Callable[[], Any]) -> Any:
+        self._count('loads')
+        conn = self.pool.acquire()
+        broken = False
+        try:
+            blob = conn.execute('GET', self._key(session_id))
+            return decode_context(blob, self.context_cls) if blob else factory()
+        except (OSError, ConnectionError, RespError, ValueError) as e:
+            broken = not isinstance(e, (RespError, ValueError))
+            self._count('errors')
+            logger.warning(f"⚠️ Session backend load failed for {session_id}: {e}")
+            return factory()
+        finally:
+            self.pool.release(conn, broken)
+
+    def update(self, session_id: str, mutate: Callable[[Any], None], factory: Callable[[], Any]) -> Any:
+        """Optimistic read-modify-write: retried when another writer touched the session"""
+        self._count('updates')
+        key = self._key(session_id)
+        conn = self.pool.acquire()
+        broken = False
+        context = None
+        try:
+            for attempt in range(self.max_retries):
+                conn.execute('WATCH', key)
+                blob = conn.execute('GET', key)
+                context = None
+                if blob:
+                    try:
+                        context = decode_context(blob, self.context_cls)
+                    except ValueError as e:
+                        # Overwritten below; otherwise the session would reset on every turn until the TTL
+                        self._count('decode_errors')
+                        logger.warning(f"⚠️ Unreadable session {session_id} replaced: {e}")
+                if context is None:
+                    context = factory()
+                mutate(context)
+                encoded = encode_context(context)
+                conn.execute('MULTI')
+                conn.execute('SET', key, encoded, 'PX', self.ttl_ms)
+                if conn.execute('EXEC') is not None:
+                    self._count('bytes_written', len(encoded))
+                    return context
+                self._count('conflicts')
+
+            # Persistent contention: last write wins rather than dropping the turn
+            conn.execute('SET', key, encoded, 'PX', self.ttl_ms)
+            self._count('conflict_overwrites')
+            return context
+        except (OSError, ConnectionError, RespError, ValueError) as e:
+            broken = True
+            self._count('errors')
+            logger.warning(f"⚠️ Session backend update failed for {session_id}: {e}")
+            if context is None:
+                context = factory()
+                mutate(context)
+            return context
+        except BaseException:
+            broken = True  # A WATCH (or an open MULTI) may still be active on this connection
+            raise
+        finally:
+            self.pool.release(conn, broken)
+
+    def after_fork(self):
+        # Sockets inherited from the master must never be shared between workers
+        self.pool = RespConnectionPool(self.url)
+
+    def delete(self, session_id: str) -> bool:
+        conn = self.pool.acquire()
+        broken = False
+        try:
+            return bool(conn.execute('DEL', self._key(session_id)))
+        except (OSError, ConnectionError, RespError) as e:
+            broken = True
+            self._count('errors')
+            logger.warning(f"⚠️ Session backend delete failed for {session_id}: {e}")
+            return False
+        finally:
+            self.pool.release(conn, broken)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {'backend': self.name, 'url': f"{self.pool.host}:{self.pool.port}/{self.pool.db}",
+                'ttl_seconds': self.ttl_ms / 1000, **stats}
+
+
+def create_session_backend(context_cls, backend: str = SESSION_BACKEND) -> SessionBackend:
+    """Build the configured backend (SESSION_BACKEND=memory|redis)"""
+    if backend == 'redis':
+        logger.info(f"🔌 Session backend: redis ({REDIS_URL})")
+        return RedisSessionBackend(context_cls)
+    memory_backend = InMemorySessionBackend(context_cls=context_cls)
+    if SESSION_SNAPSHOT_PATH:
+        logger.info(f"💾 Session snapshots: {SESSION_SNAPSHOT_PATH} every {SESSION_SNAPSHOT_INTERVAL:.0f}s")
+        memory_backend.enable_snapshots()
+    return memory_backend
+
+
+__all__ = ['SessionBackend', 'InMemorySessionBackend', 'RedisSessionBackend', 'create_session_backend',
+           'encode_context', 'decode_context']
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+💾 SESSION SNAPSHOTS - Keep live conversations across restarts
+Periodically writes every session in the in-memory SessionStore to a
+compact binary file and restores it on startup, so visitors mid-funnel keep
+their context through deploys and crashes.
+
+Each process writes its own file, <SESSION_SNAPSHOT_PATH>.<pid>, so forked
+workers don't overwrite each other's sessions. Startup restores every such
+file (newest session copy wins); files left by the previous run are removed
+once this run has written its own snapshot.
+
+File layout (SNAPSHOT_VERSION 1):
+    header  : magic b'TSNP', version byte, created_at (double)
+    body    : one zlib stream of records, each
+              id_len (u16), last_access (double), blob_len (u32), session_id, blob
+    trailer : id_len 0 followed by the record count (u32), inside the zlib stream
+
+Blobs are encode_context() bytes (their own codec version byte). Restore only
+splits the file into blobs; each session is decoded the first time it is
+used, and restore runs on a background thread so it never delays readiness.
+"""
+
+import atexit
+import glob
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+SESSION_SNAPSHOT_PATH = os.getenv('SESSION_SNAPSHOT_PATH', '')  # empty = snapshots disabled
+SESSION_SNAPSHOT_INTERVAL = float(os.getenv('SESSION_SNAPSHOT_INTERVAL', '60'))  # seconds
+
+SNAPSHOT_MAGIC = b'TSNP'
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct('>4sBd')
+_RECORD = struct.Struct('>HdI')
+_COUNT = struct.Struct('>I')
+
+
+class SnapshotError(Exception):
+    """Snapshot file is missing pieces, corrupt or from an unknown version"""
+
+
+def process_snapshot_path(path: str) -> str:
+    """This process's snapshot file (evaluated per call, so forked workers get their own)"""
+    return f"{path}.{os.getpid()}"
+
+
+def snapshot_files(path: str) -> List[str]:
+    """Every per-process snapshot for path, plus a single-file snapshot from older versions"""
+    pattern = re.compile(re.escape(os.path.basename(path)) + r'(\.\d+)?$')
+    candidates = glob.glob(glob.escape(path) + '.*') + [path]
+    return sorted(p for p in set(candidates) if os.path.isfile(p) and pattern.match(os.path.basename(p)))
+
+
+def write_snapshot(store: SessionStore, path: str, encoder) -> Dict:
+    """Atomically write all live sessions to path; returns size/count/duration"""
+    start = time.perf_counter()
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # Unique per process
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    compressor = zlib.compressobj(6)
+    count = 0
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, time.time()))
+        for session_id, last_access, blob in store.export(encoder):
+            key = session_id.encode('utf-8')
+            f.write(compressor.compress(_RECORD.pack(len(key), last_access, len(blob)) + key + blob))
+            count += 1
+        f.write(compressor.compress(_RECORD.pack(0, 0.0, 0) + _COUNT.pack(count)))
+        f.write(compressor.flush())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return {
+        'sessions': count,
+        'bytes': os.path.getsize(path),
+        'write_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def read_snapshot(path: str) -> Tuple[float, List[Tuple[str, float, bytes]]]:
+    """(created_at, [(session_id, last_access, blob), ...]) from a snapshot file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Snapshot header is truncated")
+    magic, version, created_at = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a session snapshot file")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    try:
+        body = zlib.decompress(data[_HEADER.size:])
+    except zlib.error as e:
+        raise SnapshotError(f"Snapshot body is corrupt: {e}")
+
+    records = []
+    offset = 0
+    view = memoryview(body)
+    while True:
+        if offset + _RECORD.size > len(body):
+            raise SnapshotError("Snapshot ends without a trailer")
+        id_len, last_access, blob_len = _RECORD.unpack_from(body, offset)
+        offset += _RECORD.size
+        if id_len == 0:
+            (expected,) = _COUNT.unpack_from(body, offset)
+            if expected != len(records):
+                raise SnapshotError(f"Snapshot has {len(records)} records, trailer says {expected}")
+            break
+        session_id = bytes(view[offset:offset + id_len]).decode('utf-8')
+        offset += id_len
+        records.append((session_id, last_access, bytes(view[offset:offset + blob_len])))
+        offset += blob_len
+    return created_at, records
+
+
+def restore_records(store: SessionStore, records: List[Tuple[str, float, bytes]]) -> Dict:
+    """Restore newest first: the newest copy of a session wins and LRU order follows last access"""
+    records.sort(key=lambda record: record[1], reverse=True)
+    restored = sum(1 for session_id, last_access, blob in records if store.restore(session_id, blob, last_access))
+    return {
+        'sessions': len(records),
+        'restored': restored,
+        'skipped': len(records) - restored,  # expired, duplicate, already live again, or over capacity
+    }
+
+
+def restore_snapshot(store: SessionStore, path: str) -> Dict:
+    """Load one snapshot file into the store as still-serialized sessions"""
+    start = time.perf_counter()
+    created_at, records = read_snapshot(path)
+    result = restore_records(store, records)
+    result.update(snapshot_age_seconds=round(time.time() - created_at, 1),
+                  restore_ms=round((time.perf_counter() - start) * 1000, 2))
+    return result
+
+
+class SessionSnapshotter:
+    """Background restore at startup plus periodic (and final) snapshots"""
+
+    def __init__(self, store: SessionStore, encoder, path: str = SESSION_SNAPSHOT_PATH,
+                 interval: float = SESSION_SNAPSHOT_INTERVAL):
+        self.store = store
+        self.encoder = encoder
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stale_files: List[Tuple[str, float]] = []  # (path, mtime) restored from the previous run
+        self.stats = {
+            'restore_state': 'pending',  # pending, running, done, missing, failed
+            'restore_ms': None,
+            'restored_files': 0,
+            'failed_files': 0,
+            'restored_sessions': 0,
+            'skipped_sessions': 0,
+            'snapshots_written': 0,
+            'write_errors': 0,
+            'last_snapshot_at': None,
+            'last_snapshot_sessions': None,
+            'last_snapshot_bytes': None,
+            'last_write_ms': None,
+        }
+
+    def start(self):
+        """Restore in the background, then snapshot every interval until stop()"""
+        self._thread = threading.Thread(target=self._run, name='session-snapshots', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self, restore: bool = True):
+        if restore:
+            self.restore()
+        while not self._stop.wait(self.interval):
+            self.snapshot()
+
+    def pause(self):
+        """Stop the periodic thread without writing (e.g. in a pre-fork master)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def resume(self):
+        """Restart periodic snapshots after pause(); used in each forked worker"""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(False,), name='session-snapshots', daemon=True)
+        self._thread.start()
+
+    def restore(self):
+        """Restore every worker's snapshot file; unreadable files are skipped and kept"""
+        paths = snapshot_files(self.path)
+        if not paths:
+            self.stats['restore_state'] = 'missing'
+            return
+        self.stats['restore_state'] = 'running'
+        start = time.perf_counter()
+        records, readable, failed = [], [], 0
+        for path in paths:
+            try:
+                mtime = os.path.getmtime(path)
+                _, file_records = read_snapshot(path)
+            except (OSError, SnapshotError) as e:
+                failed += 1
+                logger.warning(f"⚠️ Session snapshot restore failed ({path}): {e}")
+                continue
+            records.extend(file_records)
+            readable.append((path, mtime))
+        if not readable:
+            self.stats.update(restore_state='failed', failed_files=failed)
+            return
+        result = restore_records(self.store, records)
+        self._stale_files = readable
+        restore_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.stats.update(restore_state='done', restore_ms=restore_ms, restored_files=len(readable),
+                          failed_files=failed, restored_sessions=result['restored'],
+                          skipped_sessions=result['skipped'])
+        logger.info(f"💾 Restored {result['restored']} sessions from {len(readable)} snapshot files "
+                    f"in {restore_ms}ms")
+
+    def snapshot(self) -> Optional[Dict]:
+        # Don't overwrite the previous snapshot with a half-restored store
+        if self.stats['restore_state'] in ('pending', 'running'):
+            return None
+        path = process_snapshot_path(self.path)
+        with self._write_lock:
+            try:
+                result = write_snapshot(self.store, path, self.encoder)
+            except OSError as e:
+                self.stats['write_errors'] += 1
+                logger.warning(f"⚠️ Session snapshot write failed ({path}): {e}")
+                return None
+            # The previous run's sessions are now in our own file. Any sibling worker may get here first;
+            # a file rewritten since the restore (a sibling reusing an old pid) is left alone
+            for stale, mtime in self._stale_files:
+                if stale != path:
+                    try:
+                        if os.path.getmtime(stale) == mtime:
+                            os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"⚠️ Could not remove old session snapshot {stale}: {e}")
+            self._stale_files = []
+        self.stats.update(snapshots_written=self.stats['snapshots_written'] + 1, last_snapshot_at=time.time(),
+                          last_snapshot_sessions=result['sessions'], last_snapshot_bytes=result['bytes'],
+                          last_write_ms=result['write_ms'])
+        return result
+
+    def stop(self):
+        """Stop the periodic thread and write a final snapshot"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.snapshot()
+
+    def get_stats(self) -> Dict:
+        return {'path': process_snapshot_path(self.path), 'interval_seconds': self.interval, **self.stats}
+
+
+__all__ = ['SessionSnapshotter', 'SnapshotError', 'write_snapshot', 'read_snapshot', 'restore_snapshot',
+           'restore_records', 'snapshot_files', 'process_snapshot_path', 'SNAPSHOT_VERSION']
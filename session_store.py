@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+🗂️ SESSION STORE - Bounded conversation context storage
+Keeps ConversationContext objects keyed by user_context.session_id with a
+max-session cap, idle TTL and LRU eviction. Sessions are spread over
+lock-striped shards so concurrent Flask threads (threaded=True) only contend
+when they hash to the same stripe.
+
+Sessions restored from a snapshot (see session_snapshot.py) are kept as
+serialized bytes and only decoded when the session is next used.
+"""
+
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+SESSION_MAX_SESSIONS = int(os.getenv('SESSION_MAX_SESSIONS', '10000'))
+SESSION_IDLE_TTL = float(os.getenv('SESSION_IDLE_TTL', '1800'))  # seconds
+SESSION_LOCK_STRIPES = int(os.getenv('SESSION_LOCK_STRIPES', '16'))
+
+
+class _Stripe:
+    """One shard: an LRU-ordered dict of session_id -> [value, last_access] and its lock"""
+
+    __slots__ = ('lock', 'entries', 'capacity')
+
+    def __init__(self, capacity: int):
+        self.lock = threading.RLock()
+        self.entries: "OrderedDict[str, list]" = OrderedDict()
+        self.capacity = capacity
+
+
+class _Serialized:
+    """A restored session that has not been decoded yet"""
+
+    __slots__ = ('blob',)
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+
+
+class SessionStore:
+    """Thread-safe LRU + TTL store for per-session conversation state"""
+
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, idle_ttl: float = SESSION_IDLE_TTL,
+                 stripes: int = SESSION_LOCK_STRIPES, decoder: Optional[Callable[[bytes], Any]] = None):
+        self.max_sessions = max_sessions
+        self.decoder = decoder  # Turns restored snapshot bytes back into a value
+        self.idle_ttl = idle_ttl
+        stripes = max(1, stripes)
+        # The cap is split evenly across stripes, so LRU order is per stripe
+        capacity = max(1, -(-max_sessions // stripes))
+        self._stripes = [_Stripe(capacity) for _ in range(stripes)]
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'created': 0, 'evicted_lru': 0, 'evicted_idle': 0, 'deleted': 0,
+                      'restored': 0, 'lazy_decoded': 0, 'decode_errors': 0}
+
+    def _stripe(self, session_id: str) -> _Stripe:
+        return self._stripes[zlib.crc32(session_id.encode('utf-8')) % len(self._stripes)]
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _expire(self, stripe: _Stripe, now: float) -> int:
+        """Drop idle sessions from the LRU end of a stripe (caller holds the lock)"""
+        expired = 0
+        entries = stripe.entries
+        while entries:
+            session_id, entry = next(iter(entries.items()))
+            if now - entry[1] <= self.idle_ttl:
+                break
+            del entries[session_id]
+            expired += 1
+        return expired
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return the session value, refreshing its LRU position, or None"""
+        stripe = self._stripe(session_id)
+        now = time.time()
+        with stripe.lock:
+            expired = self._expire(stripe, now)
+            entry = stripe.entries.get(session_id)
+            if entry is not None and type(entry[0]) is _Serialized:
+                entry = self._decode(stripe, session_id, entry)
+            if entry is not None:
+                entry[1] = now
+                stripe.entries.move_to_end(session_id)
+        if expired:
+            self._count('evicted_idle', expired)
+        self._count('hits' if entry is not None else 'misses')
+        return entry[0] if entry is not None else None
+
+    def _decode(self, stripe: _Stripe, session_id: str, entry: list) -> Optional[list]:
+        """Deserialize a restored entry in place (caller holds the lock); drops it if unreadable"""
+        try:
+            entry[0] = self.decoder(entry[0].blob)
+        except Exception:
+            del stripe.entries[session_id]
+            self._count('decode_errors')
+            return None
+        self._count('lazy_decoded')
+        return entry
+
+    def put(self, session_id: str, value: Any):
+        """Insert or replace a session, evicting least recently used ones over the cap"""
+        stripe = self._stripe(session_id)
+        now = time.time()
+        evicted = 0
+        with stripe.lock:
+            expired = self._expire(stripe, now)
+            stripe.entries[session_id] = [value, now]
+            stripe.entries.move_to_end(session_id)
+            while len(stripe.entries) > stripe.capacity:
+                stripe.entries.popitem(last=False)
+                evicted += 1
+        if expired:
+            self._count('evicted_idle', expired)
+        if evicted:
+            self._count('evicted_lru', evicted)
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (value, created) for a session, creating it atomically if missing"""
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            value = self.get(session_id)
+            if value is not None:
+                return value, False
+            value = factory()
+            self.put(session_id, value)
+        self._count('created')
+        return value, True
+
+    def delete(self, session_id: str) -> bool:
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            removed = stripe.entries.pop(session_id, None) is not None
+        if removed:
+            self._count('deleted')
+        return removed
+
+    def restore(self, session_id: str, blob: bytes, last_access: float) -> bool:
+        """Add a serialized session from a snapshot without decoding it
+
+        Never replaces a live session and never evicts one to make room, so a
+        restore running alongside traffic cannot clobber newer state. Entries
+        go in at the LRU end (they are older than any live session), so callers
+        restore newest first to keep each stripe ordered by last access.
+        """
+        if self.decoder is None or time.time() - last_access > self.idle_ttl:
+            return False
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            if session_id in stripe.entries or len(stripe.entries) >= stripe.capacity:
+                return False
+            stripe.entries[session_id] = [_Serialized(blob), last_access]
+            stripe.entries.move_to_end(session_id, last=False)
+        self._count('restored')
+        return True
+
+    def export(self, encoder: Callable[[Any], bytes]) -> Iterator[Tuple[str, float, bytes]]:
+        """Yield (session_id, last_access, blob) for every live session, one stripe at a time
+
+        Values are encoded while their stripe lock is held so a concurrent turn
+        cannot be captured half-written; still-serialized entries are reused as is.
+        """
+        now = time.time()
+        for stripe in self._stripes:
+            with stripe.lock:
+                self._expire(stripe, now)
+                rows = [
+                    (session_id, entry[1], entry[0].blob if type(entry[0]) is _Serialized else encoder(entry[0]))
+                    for session_id, entry in stripe.entries.items()
+                ]
+            yield from rows
+
+    @contextmanager
+    def locked(self, session_id: str):
+        """Hold the session's stripe lock while mutating its state"""
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            yield
+
+    def sweep(self) -> int:
+        """Expire idle sessions in every stripe; returns the number removed"""
+        now = time.time()
+        total = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                total += self._expire(stripe, now)
+        if total:
+            self._count('evicted_idle', total)
+        return total
+
+    def __len__(self) -> int:
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._stripe(session_id).entries
+
+    def get_stats(self) -> Dict:
+        occupancy = len(self)
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            'active_sessions': occupancy,
+            'max_sessions': self.max_sessions,
+            'occupancy_pct': round(occupancy / self.max_sessions * 100, 2) if self.max_sessions else 0,
+            'idle_ttl_seconds': self.idle_ttl,
+            'lock_stripes': len(self._stripes),
+            **stats,
+        }
+
+
+__all__ = ['SessionStore']
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+⏱️ STARTUP REPORT - Where startup time and memory go
+Records wall time and resident-memory delta for each startup phase (imports,
+tenant configs, Gemini configuration, CSV load, keyword tables, MongoDB
+connect, CSV matcher warm-up, ...) and logs them as one structured JSON
+line once the server is ready. smart_llm_chatbot exposes the same report at
+/admin/startup-report.
+
+STARTUP_IMPORT_PROFILE=1 additionally profiles every module imported during
+startup (including lazy imports during warm-up) and adds the slowest ones to
+the report; any other value is treated as a file path for the full profile.
+"""
+
+import builtins
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STARTUP_IMPORT_PROFILE = os.getenv('STARTUP_IMPORT_PROFILE', '')
+IMPORT_PROFILE_TOP = 30  # Modules listed in the report (the file gets all of them)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None when it can't be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def _mb(value: Optional[int]) -> Optional[float]:
+    return round(value / (1024 * 1024), 2) if value is not None else None
+
+
+class ImportProfiler:
+    """Times first-time imports by wrapping builtins.__import__
+
+    Only absolute imports of modules not yet in sys.modules are timed; cached
+    and relative imports pass straight through (their cost shows up in the
+    importing module's cumulative time).
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Dict] = {}
+        self._local = threading.local()
+        self._original = None
+
+    def install(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+        if level or name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [name, 0.0]  # name, time spent in nested first-time imports
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            self.records[name] = {
+                'module': name,
+                'cumulative_ms': round(elapsed * 1000, 3),
+                'self_ms': round((elapsed - frame[1]) * 1000, 3),
+                'imported_by': stack[-1][0] if stack else None,
+            }
+
+    def top(self, limit: int = IMPORT_PROFILE_TOP) -> List[Dict]:
+        return sorted(self.records.values(), key=lambda r: r['cumulative_ms'], reverse=True)[:limit]
+
+
+class StartupReport:
+    """Ordered startup phases with duration and RSS delta; phases may nest"""
+
+    def __init__(self):
+        self.created_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._open: Dict[str, Dict] = {}
+        self._stack: List[str] = []
+        self.phases: List[Dict] = []
+        self.finished_at: Optional[float] = None
+        self.import_profiler: Optional[ImportProfiler] = None
+
+    def enable_import_profile(self):
+        """Start timing imports (call as early as possible)"""
+        if self.import_profiler is None:
+            self.import_profiler = ImportProfiler()
+            self.import_profiler.install()
+
+    def start(self, name: str):
+        """Open a phase; close it with end(name). Use phase() for a block"""
+        with self._lock:
+            self._open[name] = {
+                'name': name,
+                'parent': self._stack[-1] if self._stack else None,
+                'started_ms': round((time.perf_counter() - self._origin) * 1000, 1),
+                '_start': time.perf_counter(),
+                '_rss': current_rss_bytes(),
+            }
+            self._stack.append(name)
+
+    def end(self, name: str):
+        with self._lock:
+            phase = self._open.pop(name, None)
+            if phase is None:
+                return
+            if name in self._stack:
+                self._stack.remove(name)
+            rss = current_rss_bytes()
+            start_rss = phase.pop('_rss')
+            phase['duration_ms'] = round((time.perf_counter() - phase.pop('_start')) * 1000, 1)
+            phase['rss_after_mb'] = _mb(rss)
+            phase['rss_delta_mb'] = _mb(rss - start_rss) if rss is not None and start_rss is not None else None
+            self.phases.append(phase)
+
+    @contextmanager
+    def phase(self, name: str):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p['started_ms'])
+        report = {
+            'pid': os.getpid(),
+            'started_at': self.created_at,
+            'ready': self.finished_at is not None,
+            'total_ms': round((self.finished_at - self.created_at) * 1000, 1) if self.finished_at else None,
+            'rss_mb': _mb(current_rss_bytes()),
+            'phases': phases,
+        }
+        if self.import_profiler is not None:
+            report['modules_imported'] = len(self.import_profiler.records)
+            report['slowest_imports'] = self.import_profiler.top()
+        return report
+
+    def finish(self):
+        """Mark startup complete: log the report once and write the import profile if requested"""
+        if self.finished_at is not None:
+            return
+        self.finished_at = time.time()
+        report = self.to_dict()
+        logger.info(f"⏱️ Startup report: {json.dumps(report, separators=(',', ':'))}")
+
+        if self.import_profiler is not None:
+            self.import_profiler.uninstall()
+            if STARTUP_IMPORT_PROFILE.lower() not in ('1', 'true', 'yes'):
+                try:
+                    with open(STARTUP_IMPORT_PROFILE, 'w', encoding='utf-8') as f:
+                        json.dump(self.import_profiler.top(limit=len(self.import_profiler.records)), f, indent=2)
+                    logger.info(f"⏱️ Import profile written to {STARTUP_IMPORT_PROFILE}")
+                except OSError as e:
+                    logger.warning(f"⚠️ Could not write import profile: {e}")
+
+
+# Shared report for the serving process
+startup_report = StartupReport()
+if STARTUP_IMPORT_PROFILE:
+    startup_report.enable_import_profile()
+
+__all__ = ['StartupReport', 'ImportProfiler', 'startup_report', 'current_rss_bytes']
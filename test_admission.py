@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for /chat admission control: concurrency limit, bounded FIFO queue and shedding
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from admission import AdmissionController
+
+
+def test_limits_concurrency_and_sheds_when_queue_full():
+    controller = AdmissionController(max_concurrent=2, max_queue=1, queue_timeout=5, name='test-full')
+    assert controller.try_acquire() and controller.try_acquire()
+
+    queued = []
+    waiter = threading.Thread(target=lambda: queued.append(controller.try_acquire()))
+    waiter.start()
+    deadline = time.time() + 5
+    while controller.queue_depth.value != 1 and time.time() < deadline:
+        time.sleep(0.005)
+
+    start = time.perf_counter()
+    assert controller.try_acquire() is False  # Queue full: shed without waiting
+    assert time.perf_counter() - start < 0.1
+    assert controller.shed_queue_full.value == 1
+
+    controller.release()  # Slot goes straight to the queued request
+    waiter.join(timeout=5)
+    assert queued == [True]
+    assert controller.in_flight.value == 2 and controller.queue_depth.value == 0
+    controller.release()
+    controller.release()
+    assert controller.in_flight.value == 0
+
+
+def test_queued_requests_time_out_and_are_shed():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05, name='test-timeout')
+    with controller.admit() as first:
+        assert first
+        with controller.admit() as second:
+            assert second is False
+    assert controller.shed_timeout.value == 1
+    assert controller.queue_depth.value == 0 and controller.in_flight.value == 0
+    stats = controller.get_stats()
+    assert stats['admitted'] == 1 and stats['wait']['count'] == 1
+
+
+def test_queue_is_first_come_first_served():
+    controller = AdmissionController(max_concurrent=1, max_queue=3, queue_timeout=5, name='test-fifo')
+    assert controller.try_acquire()
+    order = []
+
+    def request(i):
+        if controller.try_acquire():
+            order.append(i)
+            controller.release()
+
+    threads = []
+    for i in range(3):
+        thread = threading.Thread(target=request, args=(i,))
+        thread.start()
+        threads.append(thread)
+        while controller.queue_depth.value != i + 1:
+            time.sleep(0.005)
+    controller.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == [0, 1, 2]
+
+
+def test_chat_sheds_to_degraded_answer(monkeypatch):
+    import smart_llm_chatbot
+    controller = AdmissionController(max_concurrent=1, max_queue=0, name='test-chat')
+    monkeypatch.setattr(smart_llm_chatbot, 'chat_admission', controller)
+    assert controller.try_acquire()  # Pipeline busy
+    try:
+        response = smart_llm_chatbot.app.test_client().post('/chat', json={'message': 'website development pricing'})
+    finally:
+        controller.release()
+    assert response.status_code == 200
+    assert response.json['degraded'] == 'overloaded'
+    assert response.json['llm_used'] in ('shed:csv', 'shed:template')
+    assert response.json['response']
+    assert controller.shed_queue_full.value == 1
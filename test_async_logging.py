@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for queued structured logging: lazy formatting, sampling/rate limits and runtime toggles
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_logging import CSV_LOGGER_NAME, LogControls, SamplingFilter
+
+
+@pytest.fixture
+def controls():
+    """LogControls installed on the root logger, writing JSON to a buffer; root is restored afterwards"""
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    controls = LogControls()
+    controls.filter = SamplingFilter()
+    stream = io.StringIO()
+    controls.configure(level='INFO', fmt='json', stream=stream, force=True)
+    controls.stream = stream
+    try:
+        yield controls
+    finally:
+        controls.stop()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+        controls.set_csv_debug(False)
+
+
+def _records(controls):
+    controls.stop()
+    return [json.loads(line) for line in controls.stream.getvalue().splitlines()]
+
+
+class _FormatProbe:
+    """Records which thread turned it into a string"""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return 'probe'
+
+
+def test_records_are_formatted_on_listener_thread_as_json(controls):
+    # pytest's own capture handler would format on this thread; leave only the queue
+    logging.getLogger().handlers[:] = [controls.handler]
+    probe = _FormatProbe()
+    logging.getLogger('test.app').info("value=%s", probe, extra={'log_key': 'chat.request', 'tenant': 'acme'})
+    logging.getLogger('test.app').debug("skipped %s", probe)  # below level: never formatted
+
+    records = _records(controls)
+    assert probe.threads and threading.current_thread().name not in probe.threads
+    assert len(probe.threads) == 1
+    assert records == [{'ts': records[0]['ts'], 'level': 'INFO', 'logger': 'test.app', 'msg': 'value=probe',
+                        'key': 'chat.request', 'tenant': 'acme'}]
+
+
+def test_sampling_and_rate_limits_apply_per_key(controls):
+    controls.set_sample_rate('noisy', 0.0)
+    controls.set_rate_limit('burst', 5)
+    log = logging.getLogger('test.app')
+    for i in range(100):
+        log.info("noisy %d", i, extra={'log_key': 'noisy'})
+        log.info("burst %d", i, extra={'log_key': 'burst'})
+    log.info("unkeyed lines are never dropped")
+
+    keys = [record.get('key') for record in _records(controls)]
+    assert 'noisy' not in keys
+    assert 5 <= keys.count('burst') <= 6
+    assert keys.count(None) == 1
+    stats = controls.get_stats()
+    assert stats['sampled_out'] == {'noisy': 100}
+    assert stats['rate_limited']['burst'] >= 94
+
+
+def test_full_queue_drops_instead_of_blocking(controls):
+    controls.stop()  # Nothing drains the queue any more
+    log = logging.getLogger('test.app')
+    for i in range(controls.queue.maxsize + 25):
+        log.info("line %d", i)
+    assert controls.get_stats()['dropped_queue_full'] == 25
+    while not controls.queue.empty():
+        controls.queue.get_nowait()
+
+
+def test_csv_debug_switchable_at_runtime(controls):
+    csv_logger = logging.getLogger(CSV_LOGGER_NAME)
+    csv_logger.debug("hidden")
+    controls.set_csv_debug(True)
+    csv_logger.debug("📊 CSV Match: '%s' | Confidence: %.3f", 'pricing', 0.91)
+    controls.set_csv_debug(False)
+    csv_logger.debug("hidden again")
+
+    assert [record['msg'] for record in _records(controls)] == ["📊 CSV Match: 'pricing' | Confidence: 0.910"]
+
+
+def test_admin_logging_endpoint_toggles_csv_debug():
+    import smart_llm_chatbot
+    client = smart_llm_chatbot.app.test_client()
+    try:
+        response = client.post('/admin/logging', json={'csv_debug': True, 'rate_limits': {'chat.request': 10}})
+        assert response.status_code == 200
+        assert response.json['csv_debug'] is True
+        assert response.json['rate_limits']['chat.request'] == 10
+        assert logging.getLogger(CSV_LOGGER_NAME).isEnabledFor(logging.DEBUG)
+
+        for bad in ({'levels': {'x': 'LOUD'}}, {'levels': {'x': 10}}, {'levels': ['x']}, ['csv_debug'], 'on'):
+            assert client.post('/admin/logging', json=bad).status_code == 400, bad
+        assert client.post('/admin/logging', json={'levels': {'x': 'debug'}}).status_code == 200
+        assert logging.getLogger('x').level == logging.DEBUG
+        assert client.post('/admin/logging', json={'levels': {'x': None}}).status_code == 200
+        assert logging.getLogger('x').level == logging.NOTSET
+        assert client.get('/admin/logging', environ_base={'REMOTE_ADDR': '10.0.0.9'}).status_code == 403
+    finally:
+        client.post('/admin/logging', json={'csv_debug': False, 'rate_limits': {'chat.request': 50}})
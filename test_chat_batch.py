@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for /chat/batch: vectorized CSV matching, NDJSON streaming and per-session ordering
+"""
+
+import json
+import os
+import sys
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import smart_llm_chatbot
+
+MESSAGES = [
+    "what does website development cost",
+    "do you offer social media marketing",
+    "i run a restaurant, how can you help",
+    "tell me about your branding services",
+    "xyzzy plugh",
+]
+
+
+def _post(payload):
+    response = smart_llm_chatbot.app.test_client().post('/chat/batch', json=payload)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return response, lines
+
+
+def test_batch_csv_matches_agree_with_single_lookups():
+    handler = smart_llm_chatbot.get_intelligent_chatbot().csv_handler
+    batch = handler.find_similar_responses(MESSAGES)
+    assert len(batch) == len(MESSAGES)
+    for message, (response, score) in zip(MESSAGES, batch):
+        assert 0.0 <= score <= 1.0 + 1e-9
+        if score >= 0.75:  # Clear matches don't depend on the batch's IDF contribution
+            assert response == handler.find_similar_response(message)
+    assert batch[-1] == (None, batch[-1][1])
+
+
+def test_batch_streams_one_line_per_item_and_summary():
+    items = [{'id': f'q{i}', 'message': message} for i, message in enumerate(MESSAGES)] + ['hello']
+    response, lines = _post({'items': items, 'use_llm': False})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    results, summary = lines[:-1], lines[-1]['summary']
+    assert sorted(result['index'] for result in results) == list(range(len(items)))
+    assert {result['id'] for result in results} == {f'q{i}' for i in range(len(MESSAGES))} | {5}
+    for result in results:
+        assert result['llm_used'] in ('csv', 'template')
+        assert result['response'] and result['latency_ms'] >= 0
+    restaurant = next(result for result in results if result['id'] == 'q2')
+    assert restaurant['detected_business_type'] == 'restaurant'
+    assert summary['items'] == len(items)
+    assert sum(summary['by_provider'].values()) == len(items)
+
+
+def test_batch_items_of_one_session_are_recorded_in_order():
+    items = [{'message': f'question {i} about website development', 'user_context': {'session_id': 'batch-s1'}}
+             for i in range(6)]
+    response, _ = _post({'items': items, 'use_llm': False, 'concurrency': 4})
+    assert response.status_code == 200
+    context = smart_llm_chatbot.get_intelligent_chatbot().get_session_context('batch-s1')
+    asked = [turn['user_message'] for turn in context.conversation_history]
+    expected = [item['message'] for item in items][-len(asked):]
+    assert asked == expected
+
+
+def test_batch_items_take_admission_slots(monkeypatch):
+    from admission import AdmissionController
+    from degradation import DegradationController
+    full = AdmissionController(max_concurrent=1, max_queue=0, name='batch-test')
+    assert full.try_acquire()  # The only slot is busy with another request
+    monkeypatch.setattr(smart_llm_chatbot, 'chat_admission', full)
+    monkeypatch.setattr(smart_llm_chatbot, 'slo_controller', DegradationController(enabled=False))
+    chatbot = smart_llm_chatbot.get_intelligent_chatbot()
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError('shed items must not reach the LLM tiers')
+
+    monkeypatch.setattr(chatbot, 'generate_routed_response', no_llm)
+    response, lines = _post({'items': MESSAGES[:3], 'use_llm': True})
+    assert response.status_code == 200
+    for result in lines[:-1]:
+        assert result['degraded'] == 'overloaded' and result['llm_used'].startswith('shed:')
+        assert result['status'] == 'success' and result['response']
+    assert full.get_stats()['in_flight'] == 1
+    full.release()
+
+
+def test_batch_stream_finishes_when_an_item_fails_outside_its_handler(monkeypatch):
+    answer = smart_llm_chatbot._batch_item_answer
+
+    def flaky(chatbot, item, csv_match, use_llm):
+        if item['index'] == 1:
+            raise KeyError('boom')
+        return answer(chatbot, item, csv_match, use_llm)
+
+    monkeypatch.setattr(smart_llm_chatbot, '_batch_item_answer', flaky)
+    response, lines = _post({'items': MESSAGES[:3], 'use_llm': False})
+    results = {result['index']: result for result in lines[:-1]}
+    assert sorted(results) == [0, 1, 2] and lines[-1]['summary']['items'] == 3
+    assert results[1]['status'] == 'error' and results[1]['response']
+    assert results[0]['status'] == 'success'
+
+
+def test_business_classification_and_tenant_lookup_are_separate_stages():
+    from metrics import stage_histogram
+    before = {stage: stage_histogram(stage).count for stage in ('classification', 'tenant')}
+    response, lines = _post({'items': MESSAGES, 'use_llm': False})
+    assert response.status_code == 200
+    # One classification per distinct message, one tenant lookup per item
+    assert stage_histogram('classification').count - before['classification'] == len(set(MESSAGES))
+    assert stage_histogram('tenant').count - before['tenant'] == len(MESSAGES)
+
+
+def test_batch_rejects_bad_input():
+    client = smart_llm_chatbot.app.test_client()
+    assert client.post('/chat/batch', json={'items': []}).status_code == 400
+    assert client.post('/chat/batch', json={'items': [42]}).status_code == 400
+    assert client.post('/chat/batch', json={'items': ['hi'], 'concurrency': 'lots'}).status_code == 400
+    too_many = ['hi'] * (smart_llm_chatbot.BATCH_MAX_ITEMS + 1)
+    assert client.post('/chat/batch', json={'items': too_many}).status_code == 413
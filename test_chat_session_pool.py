@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tests for the Gemini chat session pool and the handler's incremental (per-session) mode
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import smart_llm_chatbot
+from chat_session_pool import ChatSessionPool
+from smart_llm_chatbot import ConversationContext, GeminiChatbotHandler
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    """Mimics a google.generativeai ChatSession: send_message rebuilds history from a read of it"""
+
+    def __init__(self, history, delay=0.0):
+        self.history = list(history)
+        self.delay = delay
+        self.sent = []
+
+    def send_message(self, message, generation_config=None):
+        history = self.history
+        time.sleep(self.delay)  # Unsynchronized callers would overwrite each other's turns here
+        self.sent.append(message)
+        reply = f"reply {len(self.sent)}"
+        self.history = history + [{'role': 'user', 'parts': [message]}, {'role': 'model', 'parts': [reply]}]
+        return FakeResponse(reply)
+
+
+class FakeModel:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+        self.chats = []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        return FakeResponse("Stateless answer about your website.")
+
+    def start_chat(self, history):
+        chat = FakeChat(history, self.delay)
+        self.chats.append(chat)
+        return chat
+
+
+def _handler(pool, delay=0.0):
+    handler = GeminiChatbotHandler.__new__(GeminiChatbotHandler)
+    handler.model = FakeModel(delay)
+    handler.chat_sessions = pool
+    handler.session_stats = {'stateless_turns': 0, 'incremental_turns': 0, 'stateless_prompt_bytes': 0,
+                             'incremental_prompt_bytes': 0}
+    handler._stats_lock = threading.Lock()
+    handler.conversation_history = []
+    handler.generation_config = {}
+    handler.initialized = True
+    return handler
+
+
+def _turn(handler, session_id, context, message):
+    reply = handler.generate_business_response(message, 'restaurant', {'session_id': session_id}, context)
+    context.add_conversation_turn(message, reply, 'gemini')
+    return reply
+
+
+def test_lru_and_idle_eviction():
+    pool = ChatSessionPool(max_sessions=2, idle_ttl=60)
+    pool.put('a', 'A')
+    pool.put('b', 'B')
+    assert pool.get('a') == 'A'  # 'b' is now least recently used
+    pool.put('c', 'C')
+    assert pool.get('b') is None and pool.get('a') == 'A' and pool.get('c') == 'C'
+    assert pool.get_stats()['evicted_lru'] == 1
+
+    idle = ChatSessionPool(max_sessions=10, idle_ttl=0.05)
+    idle.put('a', 'A')
+    time.sleep(0.1)
+    assert idle.get('a') is None
+    assert idle.get_stats()['evicted_idle'] == 1
+
+
+def test_use_serializes_turns_per_session_only():
+    pool = ChatSessionPool(max_sessions=10, idle_ttl=60)
+    pool.put('a', 'A')
+    pool.put('b', 'B')
+    active, overlaps, other_session_waited = [], [], []
+
+    def turn(session_id):
+        with pool.use(session_id) as chat:
+            assert chat == session_id.upper()
+            if session_id == 'a':
+                active.append(1)
+                if len(active) > 1:
+                    overlaps.append(1)
+                time.sleep(0.05)
+                active.pop()
+
+    threads = [threading.Thread(target=turn, args=('a',)) for _ in range(4)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    turn('b')  # Not blocked by the turns of session 'a'
+    if time.perf_counter() - start > 0.1:
+        other_session_waited.append(1)
+    for thread in threads:
+        thread.join()
+    assert not overlaps and not other_session_waited
+
+    with pool.use('missing') as chat:
+        assert chat is None
+    with pool.use('a') as chat:
+        pool.drop('a')
+    with pool.use('a') as chat:
+        assert chat is None
+
+
+def test_incremental_turns_trim_history_and_fall_back_after_eviction(monkeypatch):
+    monkeypatch.setattr(smart_llm_chatbot, 'CHAT_SESSION_MAX_TURNS', 2)
+    pool = ChatSessionPool(max_sessions=1, idle_ttl=60)
+    handler = _handler(pool)
+    context = ConversationContext(business_type='restaurant')
+
+    _turn(handler, 's1', context, "I run a restaurant")  # Stateless, then seeds the session
+    assert len(handler.model.prompts) == 1 and len(pool) == 1
+    [chat] = handler.model.chats
+    seed = list(chat.history)
+
+    for i in range(4):
+        _turn(handler, 's1', context, f"follow-up {i}")
+    assert len(handler.model.prompts) == 1 and len(chat.sent) == 4
+    assert handler.session_stats['incremental_turns'] == 4
+    assert 'User: follow-up 3' in chat.sent[-1] and '[Business: restaurant' in chat.sent[-1]
+    # Seed prompt + the last CHAT_SESSION_MAX_TURNS turns
+    assert len(chat.history) == 2 + 2 * 2 and chat.history[:2] == seed
+    assert chat.history[-2]['parts'] == [chat.sent[-1]]
+
+    # Another conversation evicts s1; its next turn is answered statelessly and reseeds
+    _turn(handler, 's2', ConversationContext(business_type='bakery'), "hello")
+    _turn(handler, 's1', context, "what about delivery?")
+    assert len(handler.model.prompts) == 3 and handler.session_stats['stateless_turns'] == 3
+    assert 'what about delivery?' in handler.model.prompts[-1]
+    assert len(chat.sent) == 4 and handler.model.chats[-1] is pool.get('s1')
+
+
+def test_zero_max_turns_keeps_only_the_seed(monkeypatch):
+    monkeypatch.setattr(smart_llm_chatbot, 'CHAT_SESSION_MAX_TURNS', 0)
+    handler = _handler(ChatSessionPool(max_sessions=10, idle_ttl=60))
+    context = ConversationContext(business_type='restaurant')
+    _turn(handler, 's1', context, "I run a restaurant")
+    [chat] = handler.model.chats
+    seed = list(chat.history)
+    for i in range(3):
+        _turn(handler, 's1', context, f"follow-up {i}")
+    assert len(chat.sent) == 3 and chat.history == seed
+
+
+def test_concurrent_turns_of_one_conversation_are_not_lost(monkeypatch):
+    monkeypatch.setattr(smart_llm_chatbot, 'CHAT_SESSION_MAX_TURNS', 50)
+    pool = ChatSessionPool(max_sessions=10, idle_ttl=60)
+    handler = _handler(pool, delay=0.02)
+    context = ConversationContext(business_type='restaurant')
+    _turn(handler, 's1', context, "I run a restaurant")
+    [chat] = handler.model.chats
+
+    threads = [threading.Thread(target=handler.generate_business_response,
+                                args=(f"question {i}", 'restaurant', {'session_id': 's1'}, context))
+               for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(chat.sent) == 6
+    assert len(chat.history) == 2 + 6 * 2  # Every turn survived
+    assert handler.session_stats['incremental_turns'] == 6
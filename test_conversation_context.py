@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for the slotted ConversationContext and its turn ring buffer
+"""
+
+import os
+import sys
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from smart_llm_chatbot import ConversationContext, TurnRing
+
+
+def test_turn_ring_overwrites_oldest():
+    ring = TurnRing(3, 2)
+    for i in range(5):
+        ring.append(i, str(i))
+    assert list(ring) == [(2, '2'), (3, '3'), (4, '4')]
+    assert ring.last(2) == [(3, '3'), (4, '4')]
+    assert len(ring) == 3
+
+
+def test_history_views_keep_original_limits():
+    context = ConversationContext(business_type='bakery')
+    assert context.conversation_history == [] and context.previous_responses == []
+    for i in range(7):
+        context.add_conversation_turn(f"question {i}", f"answer {i}", 'gemini')
+    assert [turn['user_message'] for turn in context.conversation_history] == [f"question {i}" for i in range(2, 7)]
+    assert context.previous_responses == ["answer 4", "answer 5", "answer 6"]
+    assert context.user_questions_asked == [f"question {i}" for i in range(2, 7)]
+    assert context.conversation_depth == 7
+    assert context.get_business_context_for_prompt()['previous_questions'] == ["question 5", "question 6"]
+
+
+def test_lazy_fields_and_slots():
+    context = ConversationContext()
+    assert context.to_state() == {}
+    assert context._services_discussed is None
+    context.services_discussed.append('seo')
+    assert context.to_state() == {'sd': ['seo']}
+    assert not hasattr(context, '__dict__')
+
+
+def test_state_from_previous_layout_is_accepted():
+    # Older snapshots also carried 'pr' and 'uq' lists; both are derived from 'ch' now
+    state = {'bt': 'gym', 'cd': 1, 'pr': ['hi'], 'uq': ['hello'], 'ch': [['hello', 'hi', 'gemini', 1.0]]}
+    context = ConversationContext.from_state(state)
+    assert context.previous_responses == ['hi']
+    assert context.user_questions_asked == ['hello']
+    assert context.conversation_history[0]['business_context'] == 'gym'
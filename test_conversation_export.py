@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming conversation exporter: incremental readers, filters and XLSX/CSV/Parquet writers
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import conversation_export
+from conversation_export import (COLUMNS, FIELDS, XlsxExportWriter, _iter_json_array, export_conversations,
+                                 iter_file_records, iter_mongo_records, iter_source_records)
+
+SOURCE = os.path.join('Techrypt_sourcecode', 'Techrypt', 'src', 'database', 'conversations.json')
+
+
+def _record(n, **overrides):
+    record = {'id': f'turn-{n}', 'user_name': 'Alice', 'user_message': f'message {n}', 'bot_response': 'Sure!',
+              'business_type': 'restaurant' if n % 2 else 'fitness', 'model': 'gemini', 'response_time': '0.25s',
+              'timestamp': f'2025-01-{n % 28 + 1:02d}T12:00:00', 'user_context': {'session_id': f's{n}'}}
+    record.update(overrides)
+    return record
+
+
+def _csv_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_json_array_is_parsed_incrementally():
+    with open(SOURCE, 'r', encoding='utf-8') as f:
+        original = json.load(f)
+    assert list(iter_file_records(SOURCE)) == original
+    # Elements larger than the read size are completed across chunks
+    with open(SOURCE, 'r', encoding='utf-8') as f:
+        assert list(_iter_json_array(f, chunk_size=7)) == original
+
+    assert list(_iter_json_array(io.StringIO(' [ ] '))) == []
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO('[{"a": 1}, {"b"')))
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO('[{"a": 1}')))
+
+
+def test_jsonl_and_gzip_sources(tmp_path):
+    with open(tmp_path / 'conversations-20250101-000000.jsonl', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(_record(0)) + '\nnot json\n\n')
+    with gzip.open(tmp_path / 'conversations-20250101-000000.jsonl.gz', 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(_record(1)) + '\n')
+    os.utime(tmp_path / 'conversations-20250101-000000.jsonl.gz', (1, 1))  # Rotated first
+    with open(tmp_path / 'conversations.jsonl', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(_record(2)) + '\n')
+
+    records = list(iter_source_records(str(tmp_path / 'conversations*.jsonl*')))
+    assert [record['id'] for record in records][0] == 'turn-1'
+    assert sorted(record['id'] for record in records) == ['turn-0', 'turn-1', 'turn-2']
+    with pytest.raises(FileNotFoundError):
+        list(iter_source_records(str(tmp_path / 'missing*.jsonl')))
+
+
+def test_csv_export_filters_and_reports_progress(tmp_path):
+    output = str(tmp_path / 'out' / 'conversations.csv')
+    seen = []
+    stats = export_conversations((_record(n) for n in range(20)), output, business_types=['restaurant'],
+                                 since='2025-01-03', until='2025-01-15', batch_size=2,
+                                 progress=lambda s: seen.append(s['exported']))
+    rows = _csv_rows(output)
+    assert [row['user_message'] for row in rows] == ['message 3', 'message 5', 'message 7', 'message 9',
+                                                     'message 11', 'message 13']
+    assert list(rows[0]) == list(FIELDS)
+    assert rows[0]['timestamp'] == '2025-01-04 12:00:00' and rows[0]['session_id'] == 's3'
+    assert (stats['scanned'], stats['exported'], stats['batches']) == (20, 6, 3)
+    assert seen == [2, 4, 6]
+    assert not os.path.exists(output + '.tmp')
+
+
+def test_failed_export_leaves_no_partial_file(tmp_path):
+    output = str(tmp_path / 'conversations.csv')
+
+    def broken():
+        yield _record(1)
+        raise OSError('source went away')
+
+    with pytest.raises(OSError):
+        export_conversations(broken(), output, batch_size=1)
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(ValueError):
+        export_conversations([], str(tmp_path / 'conversations.txt'))
+
+
+def test_xlsx_export_matches_the_old_layout_and_rolls_over_sheets(tmp_path, monkeypatch):
+    openpyxl = pytest.importorskip('openpyxl')
+    monkeypatch.setattr(XlsxExportWriter, 'max_rows', 4)  # Header + 3 rows per sheet
+    output = str(tmp_path / 'conversations.xlsx')
+    records = [_record(n) for n in range(7)]
+    records[0]['bot_response'] = 'bad \x01 control character'
+    export_conversations(records, output, batch_size=5)
+
+    workbook = openpyxl.load_workbook(output)
+    assert workbook.sheetnames == ['Conversations', 'Conversations 2', 'Conversations 3']
+    sheet = workbook['Conversations']
+    assert [cell.value for cell in sheet[1]] == [header for _, header, _ in COLUMNS]
+    assert sheet['A1'].font.b and sheet.freeze_panes == 'A2'
+    assert sheet['D2'].value == 'bad  control character'
+    assert sum(ws.max_row - 1 for ws in workbook.worksheets) == 7
+
+    empty = str(tmp_path / 'empty.xlsx')
+    export_conversations([], empty)
+    assert openpyxl.load_workbook(empty)['Conversations'].max_row == 1
+
+
+def test_parquet_export_writes_a_row_group_per_batch(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    output = str(tmp_path / 'conversations.parquet')
+    export_conversations((_record(n) for n in range(10)), output, batch_size=4)
+    parquet = pq.ParquetFile(output)
+    assert parquet.metadata.num_rows == 10 and parquet.metadata.num_row_groups == 3
+    assert parquet.read().column('user_message').to_pylist()[-1] == 'message 9'
+
+
+def test_export_memory_stays_flat(tmp_path):
+    records = (_record(n, bot_response='x' * 500) for n in range(50000))  # ~30MB of records in total
+    tracemalloc.start()
+    try:
+        export_conversations(records, str(tmp_path / 'big.csv'), batch_size=1000)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 5 * 1024 * 1024
+    assert len(_csv_rows(tmp_path / 'big.csv')) == 50000
+
+
+def test_mongo_cursor_pushes_business_filter_down():
+    class Cursor(list):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    calls = []
+    cursor = Cursor([_record(1)])
+
+    class Collection:
+        def find(self, query, batch_size):
+            calls.append((query, batch_size))
+            return cursor
+
+    client = {'techrypt_chatbot': {'conversations': Collection()}}
+    records = list(iter_mongo_records(database='techrypt_chatbot', business_types=['restaurant'], batch_size=100,
+                                      client=client))
+    assert records == [_record(1)] and cursor.closed
+    assert calls == [({'business_type': {'$in': ['restaurant']}}, 100)]
+    assert conversation_export._cell('timestamp', {'$date': '2025-01-01T00:00:00Z'}) == '2025-01-01 00:00:00'
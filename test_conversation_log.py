@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only JSONL conversation log: buffering, fsync policies, rotation and migration
+"""
+
+import glob
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conversation_log import ConversationLogWriter, migrate_array_file
+
+
+def _lines(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def _writer(path, **overrides):
+    settings = dict(flush_bytes=1 << 20, flush_interval=60, fsync='never', max_bytes=0, rotate_seconds=0,
+                    compress=False)
+    settings.update(overrides)
+    return ConversationLogWriter(str(path), **settings)
+
+
+def test_records_are_buffered_until_flush(tmp_path):
+    path = tmp_path / 'log' / 'conversations.jsonl'
+    writer = _writer(path)
+    try:
+        for i in range(3):
+            assert writer.append({'user_message': f'hi {i}', 'bot_response': 'héllo'})
+        assert not path.exists()  # Nothing written before a size/time flush
+        writer.flush()
+        assert [record['user_message'] for record in _lines(path)] == ['hi 0', 'hi 1', 'hi 2']
+        assert _lines(path)[0]['bot_response'] == 'héllo'
+    finally:
+        writer.close()
+    assert writer.get_stats()['records'] == 3 and writer.get_stats()['flushes'] == 1
+
+
+def test_background_thread_flushes_by_size_and_time(tmp_path):
+    by_size = _writer(tmp_path / 'size.jsonl', flush_bytes=200)
+    by_time = _writer(tmp_path / 'time.jsonl', flush_interval=0.05)
+    try:
+        for i in range(10):
+            by_size.append({'user_message': 'x' * 50, 'n': i})
+        by_time.append({'user_message': 'one'})
+        deadline = time.time() + 5
+        while time.time() < deadline and not ((tmp_path / 'size.jsonl').exists() and (tmp_path / 'time.jsonl').exists()):
+            time.sleep(0.02)
+        assert _lines(tmp_path / 'time.jsonl') == [{'user_message': 'one'}]
+        assert len(_lines(tmp_path / 'size.jsonl')) >= 1
+    finally:
+        by_size.close()
+        by_time.close()
+    assert len(_lines(tmp_path / 'size.jsonl')) == 10  # close() writes the rest
+
+
+def test_concurrent_appends_produce_whole_lines(tmp_path):
+    path = tmp_path / 'conversations.jsonl'
+    writer = _writer(path, flush_bytes=4096, flush_interval=0.01)
+
+    def worker(n):
+        for i in range(200):
+            writer.append({'worker': n, 'i': i, 'text': 'lorem ipsum ' * 5})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+    records = _lines(path)
+    assert len(records) == 1600
+    for n in range(8):
+        assert [r['i'] for r in records if r['worker'] == n] == list(range(200))
+
+
+def test_fsync_policies(tmp_path):
+    with pytest.raises(ValueError):
+        _writer(tmp_path / 'bad.jsonl', fsync='sometimes')
+
+    always = _writer(tmp_path / 'always.jsonl', fsync='always')
+    interval = _writer(tmp_path / 'interval.jsonl', fsync='interval', fsync_interval=3600)
+    for _ in range(3):
+        for writer in (always, interval):
+            writer.append({'user_message': 'hi'})
+            writer.flush()
+    assert always.get_stats()['fsyncs'] == 3
+    assert interval.get_stats()['fsyncs'] == 1  # First flush, then at most once per interval
+    always.close()
+    interval.close()
+
+
+def test_rotation_by_size_compresses_and_prunes(tmp_path):
+    path = tmp_path / 'conversations.jsonl'
+    writer = _writer(path, max_bytes=300, compress=True, backup_count=2)
+    try:
+        for i in range(12):
+            writer.append({'user_message': f'message {i}', 'pad': 'y' * 80})
+            writer.flush()
+    finally:
+        writer.close()
+    rotated = sorted(glob.glob(str(tmp_path / 'conversations-*.jsonl.gz')))
+    assert len(rotated) == 2 and writer.get_stats()['rotations'] > 2
+    with gzip.open(rotated[-1], 'rt', encoding='utf-8') as f:
+        assert all(json.loads(line)['pad'] for line in f)
+
+
+def test_rotation_by_age(tmp_path):
+    path = tmp_path / 'conversations.jsonl'
+    writer = _writer(path, rotate_seconds=3600)
+    writer.append({'user_message': 'old'})
+    writer.flush()
+    writer._opened_at -= 7200
+    writer.flush()
+    writer.append({'user_message': 'new'})
+    writer.close()
+    assert _lines(path) == [{'user_message': 'new'}]
+    [rotated] = glob.glob(str(tmp_path / 'conversations-*.jsonl'))
+    assert _lines(rotated) == [{'user_message': 'old'}]
+
+
+def test_disabled_and_full_buffer(tmp_path):
+    assert ConversationLogWriter('').append({'user_message': 'hi'}) is False
+    writer = _writer(tmp_path / 'c.jsonl', max_buffer_bytes=100)
+    assert writer.append({'user_message': 'a' * 20}) is True
+    assert writer.append({'user_message': 'b' * 200}) is False
+    assert writer.get_stats()['dropped'] == 1
+    writer.close()
+
+
+def test_migrate_array_file(tmp_path):
+    source = os.path.join('Techrypt_sourcecode', 'Techrypt', 'src', 'database', 'conversations.json')
+    destination = tmp_path / 'conversations.jsonl'
+    with open(source, 'r', encoding='utf-8') as f:
+        original = json.load(f)
+    assert migrate_array_file(source, str(destination)) == len(original)
+    assert _lines(destination) == original
+    with pytest.raises(FileExistsError):
+        migrate_array_file(source, str(destination))
+
+    # Appending after migration keeps one valid JSON object per line
+    writer = _writer(destination)
+    writer.append({'user_message': 'after migration'})
+    writer.close()
+    assert _lines(destination)[-1] == {'user_message': 'after migration'}
+
+
+def test_chat_appends_a_turn(tmp_path, monkeypatch):
+    import smart_llm_chatbot
+    from degradation import DegradationController
+    writer = _writer(tmp_path / 'chat.jsonl')
+    monkeypatch.setattr(smart_llm_chatbot, 'conversation_log', writer)
+    # Degraded mode answers from CSV/template, so no LLM call is made
+    degraded = DegradationController(enabled=True, min_samples=1)
+    degraded.record('gemini', 10 ** 6, False)
+    monkeypatch.setattr(smart_llm_chatbot, 'slo_controller', degraded)
+
+    response = smart_llm_chatbot.app.test_client().post(
+        '/chat', json={'message': 'how much does a website cost', 'user_name': 'Alice',
+                       'user_context': {'session_id': 'log-s1'}})
+    assert response.status_code == 200
+    writer.close()
+    [record] = _lines(tmp_path / 'chat.jsonl')
+    assert record['user_message'] == 'how much does a website cost' and record['user_name'] == 'Alice'
+    assert record['session_id'] == 'log-s1' and record['bot_response'] == response.json['response']
+    assert record['model'] == response.json['llm_used'] and record['response_time'].endswith('s')
+
+
+def test_fsync_and_rotation_failures_are_counted_and_the_thread_survives(tmp_path, monkeypatch):
+    import errno
+    import conversation_log
+
+    def no_space(*args, **kwargs):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    path = tmp_path / 'conversations.jsonl'
+    writer = _writer(path, max_bytes=50, compress=True, fsync='always', flush_interval=0.02)
+    monkeypatch.setattr(conversation_log.shutil, 'copyfileobj', no_space)
+    monkeypatch.setattr(conversation_log.os, 'fsync', no_space)
+    try:
+        writer.append({'user_message': 'x' * 60})
+        deadline = time.time() + 5
+        while time.time() < deadline and not writer.get_stats()['rotations']:
+            time.sleep(0.02)
+        stats = writer.get_stats()
+        assert stats['fsync_errors'] >= 1 and stats['rotation_errors'] >= 1
+        # The rotated file is kept uncompressed and no truncated .gz is left behind
+        [rotated] = glob.glob(str(tmp_path / 'conversations-*.jsonl'))
+        assert _lines(rotated) == [{'user_message': 'x' * 60}]
+        assert not glob.glob(str(tmp_path / '*.gz'))
+
+        # Any other failure in a flush is logged, and the thread keeps writing afterwards
+        original_flush = writer.flush
+        failures = []
+
+        def failing_flush():
+            if not failures:
+                failures.append(1)
+                raise RuntimeError('boom')
+            original_flush()
+
+        monkeypatch.setattr(writer, 'flush', failing_flush)
+        writer.append({'user_message': 'after'})
+        deadline = time.time() + 5
+        while time.time() < deadline and not (path.exists() and _lines(path)):
+            time.sleep(0.02)
+        assert failures and writer._thread.is_alive()
+        assert _lines(path) == [{'user_message': 'after'}]
+    finally:
+        monkeypatch.undo()
+        writer.close()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite conversation store: incremental ingest, rotation, filters and full-text search
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conversation_store import ConversationStore, parse_time
+
+SOURCE = os.path.join('Techrypt_sourcecode', 'Techrypt', 'src', 'database', 'conversations.json')
+
+
+def _record(n, **overrides):
+    record = {'id': f'turn-{n}', 'session_id': f's{n // 2}', 'user_name': 'Alice',
+              'user_message': f'message {n}', 'bot_response': 'Happy to help', 'business_type': 'general',
+              'model': 'gemini', 'response_time': '0.25s', 'timestamp': f'2025-01-{n + 1:02d}T12:00:00'}
+    record.update(overrides)
+    return record
+
+
+def _append(path, records, tail=''):
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+        f.write(tail)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConversationStore(str(tmp_path / 'conversations.db'))
+    yield store
+    store.close()
+
+
+def test_ingest_reads_only_appended_complete_lines(store, tmp_path):
+    log = str(tmp_path / 'conversations.jsonl')
+    _append(log, [_record(0), _record(1)], tail='{"id": "turn-2", "user_mess')  # Writer mid-flush
+    assert store.ingest_file(log)['added'] == 2
+    assert store.ingest_file(log)['read'] == 0
+
+    with open(log, 'a', encoding='utf-8') as f:
+        f.write('age": "message 2", "user_name": "Alice"}\nnot json\n')
+    result = store.ingest_file(log)
+    assert (result['read'], result['added'], result['bad_lines']) == (1, 1, 1)
+    assert store.get_stats()['rows'] == 3
+
+    [row] = store.query(session_id='s0', order='oldest', limit=1)
+    assert row['id'] == 'turn-0' and row['response_time_ms'] == 250.0
+
+
+def test_rotation_and_gzip_files_do_not_duplicate_rows(store, tmp_path):
+    log = str(tmp_path / 'conversations.jsonl')
+    _append(log, [_record(n) for n in range(3)])
+    store.ingest(str(tmp_path / 'conversations*.jsonl*'))
+
+    # Rotate like conversation_log.py: rename + gzip, then a fresh live file
+    rotated = str(tmp_path / 'conversations-20250101-000000.jsonl')
+    _append(log, [_record(3)])
+    os.replace(log, rotated)
+    with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(rotated)
+    _append(log, [_record(4)])
+
+    results = store.ingest(str(tmp_path / 'conversations*.jsonl*'))
+    assert sum(result['added'] for result in results) == 2
+    assert store.get_stats()['rows'] == 5
+    assert sum(result['read'] for result in store.ingest(str(tmp_path / 'conversations*.jsonl*'))) == 0
+
+
+def test_ingested_gzip_file_is_not_decompressed_again(store, tmp_path, monkeypatch):
+    rotated = str(tmp_path / 'conversations-20250101-000000.jsonl.gz')
+    with gzip.open(rotated, 'wt', encoding='utf-8') as f:
+        for n in range(3):
+            f.write(json.dumps(_record(n)) + '\n')
+    assert store.ingest_file(rotated)['added'] == 3
+
+    def no_open(*args, **kwargs):
+        raise AssertionError('an ingested rotated file must be skipped')
+
+    monkeypatch.setattr(gzip, 'open', no_open)
+    assert store.ingest_file(rotated)['read'] == 0
+
+    # A new file under the same name (different inode) is still read
+    monkeypatch.undo()
+    os.remove(rotated)
+    with gzip.open(rotated, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(_record(5)) + '\n')
+    store._conn.execute('UPDATE ingest_offsets SET inode = -1')  # inodes may be reused on some filesystems
+    assert store.ingest_file(rotated)['added'] == 1
+
+
+def test_array_file_ingest_is_idempotent(store, tmp_path):
+    with open(SOURCE, 'r', encoding='utf-8') as f:
+        original = json.load(f)
+    copy = str(tmp_path / 'conversations.json')
+    shutil.copy(SOURCE, copy)
+    assert store.ingest_file(copy)['added'] == len(original)
+    assert store.ingest_file(copy)['read'] == 0
+
+    # The array file is rewritten in place; only the new record is added
+    with open(copy, 'w', encoding='utf-8') as f:
+        json.dump(original + [_record(9)], f, indent=2)
+    assert store.ingest_file(copy)['added'] == 1
+    assert store.get_stats()['rows'] == len(original) + 1
+
+
+def test_query_filters_time_ranges_and_full_text(store):
+    store.insert_records([
+        _record(0, user_name='Alice', business_type='restaurant', user_message='I need online ordering for my menu'),
+        _record(1, user_name='Bob', business_type='restaurant', user_message='Do you build websites?'),
+        _record(2, user_name='Alice', business_type='fitness', user_message='Booking system for my gym',
+                model='csv'),
+        _record(3, user_name='Alice', business_type='restaurant', bot_response='We can add menu ordering online'),
+    ])
+    assert store.insert_records([_record(0)]) == 0  # Same id
+
+    assert [r['id'] for r in store.query(user_name='Alice')] == ['turn-3', 'turn-2', 'turn-0']
+    assert [r['id'] for r in store.query(business_type='restaurant', since='2025-01-02', until='2025-01-04')] \
+        == ['turn-1']
+    assert [r['id'] for r in store.query(model='csv')] == ['turn-2']
+    # Porter stemming: "orders" matches "ordering", in either message column
+    assert {r['id'] for r in store.query(text='orders')} == {'turn-0', 'turn-3'}
+    assert [r['id'] for r in store.query(text='menu', user_name='Alice', order='oldest')] == ['turn-0', 'turn-3']
+    assert len(store.query(text='"online ordering" OR gym', order='relevance')) == 2
+    assert len(store.query(limit=2, offset=3)) == 1
+
+    with pytest.raises(ValueError):
+        store.query(order='random')
+    with pytest.raises(ValueError):
+        store.query(order='relevance')
+    with pytest.raises(ValueError):
+        store.query(text='"unbalanced')
+
+
+def test_parse_time():
+    assert parse_time(None) is None
+    assert parse_time(1700000000) == 1700000000.0
+    assert parse_time('2025-01-01T00:00:00Z') == 1735689600.0
+    assert abs(parse_time('2d') - (parse_time('0s') - 2 * 86400)) < 1
+    with pytest.raises(ValueError):
+        parse_time('last tuesday')
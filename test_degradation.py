@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the SLO controller: tripping to degraded mode and gradual restore with hysteresis
+"""
+
+import os
+import sys
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from degradation import DegradationController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(clock):
+    return DegradationController(enabled=True, p95_ms=1000, error_rate=0.2, window_seconds=60, min_samples=10,
+                                 cooldown_seconds=30, step_seconds=10, restore_ratio=0.5,
+                                 restore_steps=(0.1, 0.5), clock=clock)
+
+
+def _feed(controller, count, latency_ms, success=True, provider='gemini'):
+    for _ in range(count):
+        controller.record(provider, latency_ms, success)
+
+
+def test_trips_on_p95_or_error_rate_only_with_enough_samples():
+    clock = FakeClock()
+    controller = _controller(clock)
+    _feed(controller, 9, 5000)
+    controller.evaluate()
+    assert controller.mode == 'normal'  # Below min_samples
+
+    _feed(controller, 50, 5000, provider='csv')  # Non-LLM tiers never count
+    controller.evaluate()
+    assert controller.mode == 'normal'
+
+    _feed(controller, 1, 5000)
+    controller.evaluate()
+    assert controller.mode == 'degraded' and controller.llm_fraction == 0.0
+    assert controller.allow_llm() is False
+
+    errors = _controller(FakeClock())
+    _feed(errors, 7, 100)
+    _feed(errors, 3, 100, success=False)
+    errors.evaluate()
+    assert errors.mode == 'degraded'
+
+
+def test_old_samples_leave_the_window():
+    clock = FakeClock()
+    controller = _controller(clock)
+    _feed(controller, 20, 5000)
+    clock.now += 61
+    controller.evaluate()
+    assert controller.mode == 'normal'
+    assert controller.window_stats()['samples'] == 0
+
+
+def test_restores_gradually_with_hysteresis():
+    clock = FakeClock()
+    controller = _controller(clock)
+    _feed(controller, 10, 5000)
+    controller.evaluate()
+    assert controller.mode == 'degraded'
+
+    clock.now += 29
+    controller.evaluate()
+    assert controller.mode == 'degraded'  # Still cooling down
+    clock.now += 1
+    controller.evaluate()
+    assert (controller.mode, controller.llm_fraction) == ('recovering', 0.1)
+
+    # Under the SLO but above restore_ratio x SLO: hold the current step
+    _feed(controller, 5, 800)
+    clock.now += 10
+    controller.evaluate()
+    assert (controller.mode, controller.llm_fraction) == ('recovering', 0.1)
+
+    controller._samples.clear()
+    _feed(controller, 5, 300)
+    controller.evaluate()
+    assert (controller.mode, controller.llm_fraction) == ('recovering', 0.5)
+
+    _feed(controller, 5, 300)
+    clock.now += 10
+    controller.evaluate()
+    assert (controller.mode, controller.llm_fraction) == ('normal', 1.0)
+    assert controller.allow_llm() is True
+
+
+def test_breach_while_recovering_goes_back_to_degraded():
+    clock = FakeClock()
+    controller = _controller(clock)
+    _feed(controller, 10, 5000)
+    controller.evaluate()
+    clock.now += 30
+    controller.evaluate()
+    assert controller.mode == 'recovering'
+
+    _feed(controller, 4, 100, success=False)
+    controller.evaluate()
+    assert controller.mode == 'recovering'  # Too few probes to judge
+    _feed(controller, 1, 100, success=False)
+    controller.evaluate()
+    assert controller.mode == 'degraded'
+    assert 'while recovering' in controller.last_reason
+
+
+def test_chat_and_health_report_degraded_mode(monkeypatch):
+    import smart_llm_chatbot
+    clock = FakeClock()
+    controller = _controller(clock)
+    _feed(controller, 10, 5000)
+    monkeypatch.setattr(smart_llm_chatbot, 'slo_controller', controller)
+    client = smart_llm_chatbot.app.test_client()
+
+    response = client.post('/chat', json={'message': 'how much does a website cost'})
+    assert response.status_code == 200
+    assert response.json['llm_used'] in ('degraded:csv', 'degraded:template')
+    assert response.json['degraded'] == 'slo'
+
+    health = client.get('/health').json
+    assert health['status'] == 'degraded'
+    assert health['degradation']['mode'] == 'degraded'
+    assert health['degradation']['skipped_llm_requests'] >= 1
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the traffic replay load test: corpus loading, session grouping and the open-loop runner
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import load_replay
+
+
+def test_loads_conversations_json_and_mongoexport_lines(tmp_path):
+    records = load_replay.load_conversations(load_replay.DEFAULT_CONVERSATIONS_PATH)
+    assert records and all(record['user_message'] for record in records)
+
+    export = tmp_path / 'conversations.jsonl'
+    export.write_text('\n'.join(json.dumps(doc) for doc in [
+        {'_id': {'$oid': 'a1'}, 'user_id': 'u1', 'user_message': 'second', 'timestamp': {'$date': '2025-06-03T02:00:00Z'}},
+        {'_id': {'$oid': 'a2'}, 'user_id': 'u1', 'user_message': 'first',
+         'timestamp': {'$date': {'$numberLong': '1748912000000'}}},
+        {'_id': {'$oid': 'a3'}, 'user_id': 'u2', 'user_message': 'other'},
+        {'_id': {'$oid': 'a4'}, 'user_id': 'u2', 'bot_response': 'no user message'},
+    ]) + '\n')
+    sessions = load_replay.build_sessions(load_replay.load_conversations(str(export)))
+    assert sessions == [['first', 'second'], ['other']]
+    assert load_replay._timestamp({'$date': {'$numberLong': '1748912000000'}}) == 1748912000.0
+
+
+def test_sessions_group_by_user_and_truncate():
+    records = [
+        {'user_name': 'Bob', 'user_message': 'b2', 'timestamp': '2025-06-03T02:00:02'},
+        {'user_name': 'Alice', 'user_message': 'a1', 'timestamp': '2025-06-03T02:00:00'},
+        {'user_name': 'Bob', 'user_message': 'b1', 'timestamp': '2025-06-03T02:00:01'},
+        {'user_name': 'Bob', 'user_message': 'b3', 'timestamp': '2025-06-03T02:00:03'},
+        {'user_context': {'session_id': 's9'}, 'user_name': 'Bob', 'user_message': 'x'},
+    ]
+    assert load_replay.build_sessions(records, max_turns=2) == [['a1'], ['b1', 'b2'], ['x']]
+
+
+def test_arrivals_are_open_loop_at_the_requested_rate():
+    constant = load_replay.arrival_offsets(4.0, 10.0, random.Random(1), poisson=False)
+    assert len(constant) == 39 and constant[0] == 0.25
+    poisson = load_replay.arrival_offsets(50.0, 20.0, random.Random(1))
+    assert 900 < len(poisson) < 1100
+    assert poisson == sorted(poisson)
+
+
+def test_replay_reports_tiers_errors_and_session_order():
+    sessions = [['hello', 'website cost'], ['i run a bakery']]
+    seen = []
+    lock = threading.Lock()
+
+    def factory():
+        def send(payload):
+            with lock:
+                seen.append((payload['user_context']['session_id'], payload['message']))
+            if payload['message'] == 'i run a bakery':
+                return 503, {}
+            return 200, {'response': 'ok', 'llm_used': 'csv' if payload['message'] == 'hello' else 'gemini'}
+        return send
+
+    report = load_replay.run_replay(sessions, factory, rate=30.0, duration=1.0, think_time=0.0, poisson=False)
+    assert report['sessions_started'] == report['sessions_completed'] > 0
+    assert report['requests'] == len(seen)
+    assert set(report['tiers']) == {'csv', 'gemini', 'http_503'}
+    assert report['errors'] == {'http_503': report['tiers']['http_503']['requests']}
+    assert 0 < report['error_rate'] < 1
+    assert report['latency']['p99_ms'] >= report['latency']['p50_ms'] >= 0
+
+    by_session = {}
+    for session_id, message in seen:
+        by_session.setdefault(session_id, []).append(message)
+    assert all(turns in (['hello', 'website cost'], ['i run a bakery']) for turns in by_session.values())
+
+
+def test_drain_timeout_still_reports_finished_sessions():
+    def factory():
+        def send(payload):
+            if payload['message'] == 'slow':
+                time.sleep(2.0)
+            return 200, {'response': 'ok', 'llm_used': 'csv'}
+        return send
+
+    start = time.perf_counter()
+    report = load_replay.run_replay([['fast'], ['slow', 'never sent']], factory, rate=4.0, duration=1.0,
+                                    think_time=0.0, poisson=False, drain_timeout=0.5)
+    assert time.perf_counter() - start < 1.9  # Not held until the slow sessions finish
+    assert report['drain_timed_out'] is True and report['sessions_abandoned'] >= 1
+    assert report['requests'] >= 1 and report['tiers']['csv']['requests'] == report['requests']
+    assert report['sessions_completed'] < report['sessions_started']
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for per-component memory accounting and on-demand tracemalloc snapshots
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from memory_report import MemoryReporter, deep_sizeof
+
+
+class Slotted:
+    __slots__ = ('payload', 'unset')
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+def test_deep_sizeof_follows_containers_slots_and_cycles():
+    payload = 'x' * 10000
+    small = deep_sizeof({'a': [1, 2]})
+    assert deep_sizeof({'a': [1, 2], 'b': payload})['bytes'] >= small['bytes'] + 10000
+
+    slotted = deep_sizeof(Slotted(payload))
+    assert slotted['bytes'] > 10000 and not slotted['truncated']
+
+    cycle = []
+    cycle.append(cycle)
+    assert deep_sizeof(cycle)['objects'] == 1
+
+    shared = [payload, payload]  # Counted once per walk
+    assert deep_sizeof(shared)['bytes'] < 2 * 10000
+    assert deep_sizeof(list(range(100)), limit=10)['truncated'] is True
+
+
+def test_component_sizes_report_unbuilt_and_unknown_components():
+    reporter = MemoryReporter()
+    rows = [{'question': f'q{i}', 'answer': 'a' * 200} for i in range(50)]
+    reporter.register('rows', lambda: rows)
+    reporter.register('later', lambda: None)
+
+    sizes = reporter.component_sizes()
+    assert sizes['rows']['items'] == 50 and sizes['rows']['bytes'] > 50 * 200
+    assert sizes['later']['available'] is False
+    with pytest.raises(ValueError):
+        reporter.component_sizes(['missing'])
+
+    report = reporter.report(['rows'])
+    assert list(report['components']) == ['rows']
+    assert report['components_bytes'] == sizes['rows']['bytes']
+
+
+def test_snapshot_diff_points_at_the_growing_allocation_site():
+    reporter = MemoryReporter(max_snapshots=2)
+    with pytest.raises(ValueError):
+        reporter.take_snapshot('too-early')
+    reporter.start_tracing()
+    try:
+        reporter.take_snapshot('before')
+        leak = [bytearray(1024) for _ in range(500)]  # noqa: F841  (kept alive until the diff)
+        reporter.take_snapshot('after')
+        diff = reporter.diff('before', 'after', top=5)
+        assert diff['size_diff_bytes'] > 400 * 1024
+        assert any('test_memory_report.py' in stat['where'][0] for stat in diff['top'])
+
+        reporter.take_snapshot('third')  # Only the newest two are kept
+        labels = [snapshot['label'] for snapshot in reporter.tracing_status()['snapshots']]
+        assert labels == ['after', 'third']
+        with pytest.raises(ValueError):
+            reporter.diff('before')
+    finally:
+        reporter.stop_tracing()
+    assert reporter.tracing_status()['tracing'] is False
+
+
+def test_admin_memory_endpoint():
+    import smart_llm_chatbot
+    client = smart_llm_chatbot.app.test_client()
+
+    report = client.get('/admin/memory?component=metrics&component=csv.training_data').json
+    assert set(report['components']) == {'metrics', 'csv.training_data'}
+    assert report['components']['metrics']['bytes'] > 0
+    assert client.get('/admin/memory?component=nope').status_code == 400
+
+    assert client.post('/admin/memory', json={'action': 'snapshot'}).status_code == 400  # Not tracing yet
+    try:
+        assert client.post('/admin/memory', json={'action': 'start'}).json['tracing'] is True
+        assert client.post('/admin/memory', json={'action': 'snapshot', 'label': 'base'}).json['label'] == 'base'
+        diff = client.post('/admin/memory', json={'action': 'diff', 'base': 'base', 'top': 3}).json
+        assert diff['current'] == 'now' and len(diff['top']) <= 3
+        assert client.post('/admin/memory', json={'action': 'explode'}).status_code == 400
+    finally:
+        assert client.post('/admin/memory', json={'action': 'stop'}).json['tracing'] is False
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for thread-safe counters, log-bucketed histograms and Prometheus export
+"""
+
+import os
+import random
+import sys
+import threading
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import LatencyHistogram, MetricsRegistry
+
+
+def test_counter_is_thread_safe():
+    registry = MetricsRegistry()
+    counter = registry.counter('requests_total', 'Requests')
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 80000
+    assert registry.counter('requests_total') is counter
+
+
+def test_histogram_quantiles_within_bucket_error():
+    rnd = random.Random(7)
+    samples = sorted(rnd.lognormvariate(-1.5, 1.0) for _ in range(50000))
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.observe(sample)
+    for q in (0.5, 0.95, 0.99):
+        exact = samples[int(q * len(samples))]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.1
+    assert histogram.count == 50000
+    assert histogram.quantile(1.0) == samples[-1]
+
+
+def test_histogram_memory_is_fixed():
+    histogram = LatencyHistogram()
+    buckets = len(histogram.snapshot()[0])
+    for value in (0.0, 1e-9, 0.5, 10.0, 1e6):
+        histogram.observe(value)
+    assert len(histogram.snapshot()[0]) == buckets
+    assert histogram.quantile(0.99) == 1e6  # Overflow bucket reports the observed max
+
+
+def test_prometheus_text_has_cumulative_buckets_and_quantiles():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('stage_latency_seconds', 'Stage latency', stage='csv')
+    for value in (0.001, 0.002, 0.004, 0.5):
+        histogram.observe(value)
+    registry.counter('answers_total', 'Answers', provider='gemini').inc(3)
+    text = registry.render_prometheus()
+
+    assert 'answers_total{provider="gemini"} 3' in text
+    assert '# TYPE stage_latency_seconds histogram' in text
+    bucket_counts = [int(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+                     if line.startswith('stage_latency_seconds_bucket')]
+    assert bucket_counts == sorted(bucket_counts) and bucket_counts[-1] == 4
+    assert 'stage_latency_seconds_count{stage="csv"} 4' in text
+    assert 'stage_latency_seconds_quantile{stage="csv",quantile="0.95"}' in text
+
+
+def test_gauges_render_current_value():
+    registry = MetricsRegistry()
+    depth = registry.gauge('queue_depth', 'Waiting requests', pipeline='chat')
+    depth.inc(5)
+    depth.dec(2)
+    assert registry.gauge('queue_depth', pipeline='chat') is depth
+    text = registry.render_prometheus()
+    assert '# TYPE queue_depth gauge' in text
+    assert 'queue_depth{pipeline="chat"} 3' in text
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the local mock LLM server (no real Gemini/OpenRouter calls)
+"""
+
+import json
+import os
+import sys
+
+import requests
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mock_llm_server
+
+
+def test_gemini_generate_content():
+    """generateContent returns a Gemini-shaped candidate"""
+    server, base_url = mock_llm_server.start_in_thread(seed=1)
+    try:
+        res = requests.post(
+            f"{base_url}/v1beta/models/gemini-1.5-flash:generateContent",
+            json={'contents': [{'role': 'user', 'parts': [{'text': 'I run a restaurant'}]}]}
+        )
+        assert res.status_code == 200
+        candidate = res.json()['candidates'][0]
+        assert candidate['finishReason'] == 'STOP'
+        assert candidate['content']['parts'][0]['text']
+    finally:
+        server.shutdown()
+
+
+def test_openrouter_streaming_reassembles_full_text():
+    """Streamed OpenRouter chunks join back into the non-streamed answer"""
+    profiles = {'openrouter': {'response_text': 'Website Development will bring you more customers online.',
+                               'stream_chunk_words': 2, 'stream_chunk_delay_ms': 0}}
+    server, base_url = mock_llm_server.start_in_thread(profiles, seed=1)
+    try:
+        url = f"{base_url}/api/v1/chat/completions"
+        body = {'messages': [{'role': 'user', 'content': 'hi'}], 'stream': True}
+        res = requests.post(url, json=body, stream=True)
+        parts = []
+        for line in res.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data: '):
+                continue
+            payload = line[len('data: '):]
+            if payload == '[DONE]':
+                break
+            parts.append(json.loads(payload)['choices'][0]['delta']['content'])
+        assert len(parts) > 1
+        assert ''.join(parts) == profiles['openrouter']['response_text']
+    finally:
+        server.shutdown()
+
+
+def test_rate_limit_bursts_and_errors():
+    """Deterministic 429 bursts and a 100% error rate are honoured"""
+    profiles = {
+        'gemini': {'burst_every': 3, 'burst_length': 2},
+        'openrouter': {'error_rate': 1.0},
+    }
+    server, base_url = mock_llm_server.start_in_thread(profiles, seed=1)
+    try:
+        url = f"{base_url}/v1beta/models/gemini-1.5-flash:generateContent"
+        statuses = [requests.post(url, json={'contents': []}).status_code for _ in range(6)]
+        assert statuses == [200, 200, 429, 429, 200, 429]
+
+        res = requests.post(f"{base_url}/api/v1/chat/completions", json={'messages': []})
+        assert res.status_code == 500
+    finally:
+        server.shutdown()
+
+
+def test_mistral_handler_uses_configured_endpoint():
+    """MistralOpenRouterHandler can be pointed at the mock server"""
+    from smart_llm_chatbot import MistralOpenRouterHandler
+
+    profiles = {'openrouter': {'response_text': 'Mocked Mistral answer for your business.'}}
+    server, base_url = mock_llm_server.start_in_thread(profiles, seed=1)
+    try:
+        handler = MistralOpenRouterHandler()
+        handler.api_url = f"{base_url}/api/v1/chat/completions"
+        assert handler.generate_response("You are a consultant.", "Hello") == 'Mocked Mistral answer for your business.'
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_gemini_generate_content()
+    test_openrouter_streaming_reassembles_full_text()
+    test_rate_limit_bursts_and_errors()
+    test_mistral_handler_uses_configured_endpoint()
+    print("✅ Mock LLM server tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-tenant rewrite rules compiled from config/*.json
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from multi_tenant_chatbot import MultiTenantChatbotManager
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+
+SAMPLES = [
+    "Hi Alice, Techrypt can help your business reach more customers online.",
+    "Hello there! Techrypt builds websites for customers of your business and customers of Techrypt.",
+    "hey bob. your business needs customers",
+    "Our customers love Techrypt. Grow your business with Techrypt's chatbot.",
+    "Nothing to rewrite here.",
+    "Hey, your businesses and customersupport",
+    "",
+]
+CONTEXTS = [
+    None,
+    {'is_initial_greeting': True},
+    {'conversation_context': 'continuing'},
+    {'is_initial_greeting': True, 'conversation_context': 'continuing'},
+]
+
+
+def _previous_customize(manager, response, business_id, context=None):
+    """customize_response_for_business before rewrite rules were compiled from config"""
+    config = manager.get_business_config(business_id)
+    if not config:
+        return response
+    business_name = config.business_name
+    avoid_greetings = config.response_customization.get('avoid_repetitive_greetings', False)
+    is_continuing_conversation = context and context.get('conversation_context') == 'continuing'
+    if context and context.get('is_initial_greeting', False) and not is_continuing_conversation:
+        response = f"Hello! I'm here to help {business_name} grow your business. {response}"
+    if avoid_greetings and is_continuing_conversation:
+        response = re.sub(r'^(Hi|Hello|Hey)\s+[^,!.]*[,!.]\s*', '', response, flags=re.IGNORECASE)
+        response = response.strip()
+    response = response.replace('Techrypt', business_name)
+    if business_id == 'pets':
+        response = response.replace('customers', 'pet parents and customers')
+        response = response.replace('your business', 'your pet business')
+    elif business_id == 'fitness':
+        response = response.replace('customers', 'members and clients')
+        response = response.replace('your business', 'your fitness business')
+    return response
+
+
+def test_compiled_rules_match_the_previous_tone_functions():
+    manager = MultiTenantChatbotManager(CONFIG_DIR)
+    assert set(manager.business_configs) == {'techrypt', 'pets', 'fitness'}
+    for business_id in manager.business_configs:
+        for sample in SAMPLES:
+            for context in CONTEXTS:
+                expected = _previous_customize(manager, sample, business_id, context)
+                assert manager.customize_response_for_business(sample, business_id, context) == expected, \
+                    (business_id, sample, context)
+    assert manager.customize_response_for_business('Techrypt', 'unknown') == 'Techrypt'
+
+
+def test_tenant_with_invalid_rewrite_rules_is_not_registered(tmp_path, capsys):
+    for name in ('techrypt_config.json', 'fitness_config.json'):
+        shutil.copy(os.path.join(CONFIG_DIR, name), tmp_path / name)
+    with open(os.path.join(CONFIG_DIR, 'pets_config.json'), 'r') as f:
+        pets = json.load(f)
+    pets['rewrite_rules']['greeting_pattern'] = '^(Hi|Hello'  # Unbalanced group
+    with open(tmp_path / 'pets_config.json', 'w') as f:
+        json.dump(pets, f)
+
+    manager = MultiTenantChatbotManager(str(tmp_path))
+    assert 'pets' not in manager.business_configs and 'pets' not in manager.rewrite_rules
+    assert 'Error loading pets_config.json' in capsys.readouterr().out
+    # Unregistered tenants pass responses through instead of raising KeyError
+    assert manager.customize_response_for_business('Hi Techrypt customers', 'pets') == 'Hi Techrypt customers'
+    assert manager.customize_response_for_business('Techrypt', 'fitness') == 'FitTech Solutions'
+
+
+@pytest.mark.parametrize('rules', [
+    {'initial_greeting': 'Hello {missing}! '},
+    {'substitutions': {'Techrypt': '{business_name'}},
+])
+def test_bad_rule_templates_are_rejected(tmp_path, rules):
+    with open(os.path.join(CONFIG_DIR, 'techrypt_config.json'), 'r') as f:
+        config = json.load(f)
+    config['rewrite_rules'] = rules
+    with open(tmp_path / 'techrypt_config.json', 'w') as f:
+        json.dump(config, f)
+    assert MultiTenantChatbotManager(str(tmp_path)).business_configs == {}
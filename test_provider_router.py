@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the latency-aware provider router
+"""
+
+import os
+import sys
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from provider_router import ProviderRouter
+
+
+def _feed(router, provider, latency_ms, success, times=10):
+    for _ in range(times):
+        router.record(provider, latency_ms, success)
+
+
+def test_default_order_until_stats_exist():
+    router = ProviderRouter(exploration_rate=0.0, seed=1)
+    decision = router.route()
+    assert decision.order == ['gemini', 'mistral', 'csv']
+    assert decision.reason == 'default'
+
+
+def test_slow_or_failing_provider_is_demoted_but_csv_stays_last():
+    router = ProviderRouter(p95_target_ms=1000, exploration_rate=0.0, seed=1)
+    _feed(router, 'gemini', 6000, True)
+    _feed(router, 'mistral', 400, True)
+    assert router.route().order == ['mistral', 'gemini', 'csv']
+
+    router = ProviderRouter(p95_target_ms=1000, exploration_rate=0.0, seed=1)
+    _feed(router, 'gemini', 300, False)
+    _feed(router, 'mistral', 400, True)
+    assert router.route().order == ['mistral', 'gemini', 'csv']
+
+
+def test_exploration_probes_demoted_provider():
+    router = ProviderRouter(p95_target_ms=1000, exploration_rate=1.0, seed=1)
+    _feed(router, 'gemini', 6000, True)
+    _feed(router, 'mistral', 400, True)
+    decision = router.route()
+    assert decision.explored == 'gemini'
+    assert decision.order[0] == 'gemini'
+
+
+def test_tenant_policy_overrides():
+    router = ProviderRouter(p95_target_ms=1000, exploration_rate=0.0, seed=1)
+    _feed(router, 'gemini', 6000, True)
+
+    fixed = router.route({'mode': 'fixed', 'providers': ['gemini', 'csv']}, tenant='pets')
+    assert fixed.order == ['gemini', 'csv']
+    assert fixed.tenant == 'pets'
+
+    relaxed = router.route({'p95_target_ms': 10000})
+    assert relaxed.order == ['gemini', 'mistral', 'csv']
+
+
+if __name__ == "__main__":
+    test_default_order_until_stats_exist()
+    test_slow_or_failing_provider_is_demoted_but_csv_stays_last()
+    test_exploration_probes_demoted_provider()
+    test_tenant_policy_overrides()
+    print("✅ Provider router tests passed")
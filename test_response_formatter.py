@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Golden-output tests for the compiled response post-processor
+"""
+
+import json
+import os
+import sys
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from response_formatter import ResponseFormatter, response_formatter
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'corpora', 'post_process_golden.json')
+
+
+def _load_cases():
+    with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)['cases']
+
+
+def test_matches_original_post_processor_outputs():
+    """Every corpus entry formats exactly as the original implementation did"""
+    mismatches = []
+    for case in _load_cases():
+        actual = response_formatter.format(case['response'], case['context'], case['conversation_count'])
+        if actual != case['expected']:
+            mismatches.append((case, actual))
+    assert not mismatches, f"{len(mismatches)} mismatches, first: {mismatches[0]}"
+
+
+def test_streamed_chunks_format_like_full_text():
+    text = "**Website Development** helps you sell online. • SEO • Social media"
+    chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+    assert response_formatter.format_stream(chunks, {'name': 'Alex'}, 2) == response_formatter.format(text, {'name': 'Alex'}, 2)
+
+
+def test_custom_cta_keywords():
+    formatter = ResponseFormatter(cta_keywords=('demo',))
+    assert formatter.format("Want a quick demo of the chatbot?", None, 2) == "Want a quick demo of the chatbot?"
+    assert formatter.format("Want a quick call?", None, 2).endswith("Would you like to schedule a free consultation?")
+
+
+if __name__ == "__main__":
+    test_matches_original_post_processor_outputs()
+    test_streamed_chunks_format_like_full_text()
+    test_custom_cta_keywords()
+    print("✅ Response formatter tests passed")
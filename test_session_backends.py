@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable session backends (Redis backend runs against the local stand-in)
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import redis_standin_server
+from session_backends import InMemorySessionBackend, RedisSessionBackend, decode_context, encode_context
+from smart_llm_chatbot import ConversationContext
+
+
+def _restaurant_context():
+    return ConversationContext(business_type='restaurant')
+
+
+def test_codec_round_trip():
+    context = ConversationContext(business_type='restaurant', services_discussed=['website_development'])
+    context.add_conversation_turn("I run a restaurant", "Great! A website helps. " * 40, "gemini")
+    restored = decode_context(encode_context(context), ConversationContext)
+    assert restored.to_state() == context.to_state()
+    assert restored.conversation_history[0]['business_context'] == 'restaurant'
+
+
+def test_redis_backend_shares_state_and_expires():
+    server, url = redis_standin_server.start_in_thread()
+    try:
+        worker_a = RedisSessionBackend(ConversationContext, url=url, ttl=0.3)
+        worker_b = RedisSessionBackend(ConversationContext, url=url, ttl=0.3)
+        worker_a.update('s1', lambda c: c.add_conversation_turn("hi", "Hello there!", "csv"), _restaurant_context)
+        seen_by_b = worker_b.load('s1', _restaurant_context)
+        assert seen_by_b.conversation_depth == 1
+        assert seen_by_b.conversation_history[0]['bot_response'] == "Hello there!"
+
+        time.sleep(0.4)
+        assert worker_b.load('s1', _restaurant_context).conversation_depth == 0
+    finally:
+        server.shutdown()
+
+
+def test_concurrent_updates_do_not_lose_turns():
+    server, url = redis_standin_server.start_in_thread()
+    try:
+        backends = [RedisSessionBackend(ConversationContext, url=url, max_retries=50) for _ in range(4)]
+
+        def worker(backend, n):
+            for i in range(10):
+                backend.update('shared', lambda c: c.add_conversation_turn(f"m{n}-{i}", "ok", "csv"), _restaurant_context)
+
+        threads = [threading.Thread(target=worker, args=(b, n)) for n, b in enumerate(backends)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert backends[0].load('shared', _restaurant_context).conversation_depth == 40
+    finally:
+        server.shutdown()
+
+
+def test_unreadable_session_is_overwritten_and_failed_mutations_drop_the_connection():
+    server, url = redis_standin_server.start_in_thread()
+    try:
+        backend = RedisSessionBackend(ConversationContext, url=url)
+        conn = backend.pool.acquire()
+        conn.execute('SET', backend._key('s1'), b'garbage')
+        backend.pool.release(conn)
+
+        for i in range(2):
+            backend.update('s1', lambda c: c.add_conversation_turn(f"m{i}", "ok", "csv"), _restaurant_context)
+        # The corrupt blob was replaced on the first turn, so the second turn builds on it
+        assert backend.load('s1', _restaurant_context).conversation_depth == 2
+        assert backend.get_stats()['decode_errors'] == 1
+
+        def failing(context):
+            raise RuntimeError('mutation failed')
+
+        idle = backend.pool._idle.qsize()
+        try:
+            backend.update('s1', failing, _restaurant_context)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('mutation error was swallowed')
+        assert backend.pool._idle.qsize() == idle - 1  # The WATCHed connection was closed, not pooled
+        backend.update('s1', lambda c: c.add_conversation_turn("m2", "ok", "csv"), _restaurant_context)
+        assert backend.load('s1', _restaurant_context).conversation_depth == 3
+    finally:
+        server.shutdown()
+
+
+def test_corrupt_payloads_behind_a_valid_header_are_replaced():
+    for blob in (b'\x01zgarbage', b'\x01j[1]', b'\x01j"text"', b'\x01j\xff'):
+        try:
+            decode_context(blob, ConversationContext)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{blob!r} decoded')
+
+    server, url = redis_standin_server.start_in_thread()
+    try:
+        backend = RedisSessionBackend(ConversationContext, url=url)
+        for n, blob in enumerate((b'\x01zgarbage', b'\x01j[1]')):
+            session_id = f'corrupt-{n}'
+            conn = backend.pool.acquire()
+            conn.execute('SET', backend._key(session_id), blob)
+            backend.pool.release(conn)
+            assert backend.load(session_id, _restaurant_context).conversation_depth == 0
+            backend.update(session_id, lambda c: c.add_conversation_turn("hi", "ok", "csv"), _restaurant_context)
+            assert backend.load(session_id, _restaurant_context).conversation_depth == 1
+        assert backend.get_stats()['decode_errors'] == 2
+    finally:
+        server.shutdown()
+
+
+def test_in_memory_backend_update_is_visible_to_load():
+    backend = InMemorySessionBackend()
+    backend.update('s1', lambda c: c.add_conversation_turn("hi", "Hello!", "csv"), _restaurant_context)
+    assert backend.load('s1', _restaurant_context).conversation_depth == 1
+    assert backend.get_stats()['active_sessions'] == 1
+
+
+if __name__ == "__main__":
+    test_codec_round_trip()
+    test_redis_backend_shares_state_and_expires()
+    test_concurrent_updates_do_not_lose_turns()
+    test_unreadable_session_is_overwritten_and_failed_mutations_drop_the_connection()
+    test_corrupt_payloads_behind_a_valid_header_are_replaced()
+    test_in_memory_backend_update_is_visible_to_load()
+    print("✅ Session backend tests passed")
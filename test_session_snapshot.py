@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for session snapshot write/restore with lazy per-session decoding
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from session_backends import InMemorySessionBackend, decode_context, encode_context
+from session_snapshot import (SessionSnapshotter, SnapshotError, process_snapshot_path, restore_snapshot,
+                              snapshot_files, write_snapshot)
+from session_store import SessionStore
+from smart_llm_chatbot import ConversationContext
+
+
+def _encoder(context):
+    return encode_context(context, compress=False)
+
+
+def _store():
+    return SessionStore(max_sessions=100, stripes=4, decoder=lambda blob: decode_context(blob, ConversationContext))
+
+
+def _populated_store(sessions: int = 20) -> SessionStore:
+    store = _store()
+    for i in range(sessions):
+        context = ConversationContext(business_type='bakery')
+        context.add_conversation_turn(f"hello {i}", f"welcome {i}", 'gemini')
+        store.put(f"s{i}", context)
+    return store
+
+
+def test_round_trip_decodes_lazily(tmp_path):
+    path = str(tmp_path / 'sessions.snapshot')
+    written = write_snapshot(_populated_store(), path, _encoder)
+    assert written['sessions'] == 20 and written['bytes'] > 0
+
+    restored = _store()
+    result = restore_snapshot(restored, path)
+    assert result['restored'] == 20
+    assert restored.get_stats()['lazy_decoded'] == 0
+
+    context = restored.get('s7')
+    assert context.previous_responses == ["welcome 7"]
+    assert restored.get_stats()['lazy_decoded'] == 1
+
+    # Untouched sessions are re-snapshotted from their bytes without decoding
+    write_snapshot(restored, path, _encoder)
+    assert restored.get_stats()['lazy_decoded'] == 1
+
+
+def test_restore_keeps_live_sessions(tmp_path):
+    path = str(tmp_path / 'sessions.snapshot')
+    write_snapshot(_populated_store(), path, _encoder)
+    store = _store()
+    live = ConversationContext(business_type='gym')
+    store.put('s3', live)
+    result = restore_snapshot(store, path)
+    assert result['skipped'] == 1
+    assert store.get('s3') is live
+
+
+def test_rejects_corrupt_or_foreign_files(tmp_path):
+    path = str(tmp_path / 'sessions.snapshot')
+    write_snapshot(_populated_store(), path, _encoder)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-10])
+    with pytest.raises(SnapshotError):
+        restore_snapshot(_store(), path)
+    with open(path, 'wb') as f:
+        f.write(b'not a snapshot at all')
+    with pytest.raises(SnapshotError):
+        restore_snapshot(_store(), path)
+
+
+def test_backend_snapshotter_reports_metrics(tmp_path):
+    path = str(tmp_path / 'nested' / 'sessions.snapshot')
+    first = InMemorySessionBackend(context_cls=ConversationContext)
+    first.update('visitor', lambda c: c.add_conversation_turn("hi", "hello!", 'csv'),
+                 lambda: ConversationContext(business_type='bakery'))
+    first.snapshots = SessionSnapshotter(first.store, _encoder, path, interval=3600)
+    first.snapshots.stats['restore_state'] = 'missing'
+    first.snapshots.stop()
+    stats = first.get_stats()['snapshot']
+    assert stats['snapshots_written'] == 1 and stats['last_snapshot_sessions'] == 1
+
+    second = InMemorySessionBackend(context_cls=ConversationContext)
+    second.enable_snapshots(path, interval=3600)
+    deadline = time.time() + 5
+    while second.snapshots.stats['restore_state'] != 'done' and time.time() < deadline:
+        time.sleep(0.01)
+    stats = second.get_stats()['snapshot']
+    assert stats['restored_sessions'] == 1 and stats['restore_ms'] is not None
+    assert second.load('visitor', ConversationContext).conversation_history[0]['bot_response'] == "hello!"
+    second.snapshots.stop()
+
+
+def test_each_worker_writes_its_own_file_and_restore_merges_them(tmp_path, monkeypatch):
+    path = str(tmp_path / 'sessions.snapshot')
+    write_snapshot(_populated_store(2), path, _encoder)  # Single file from an older version
+    workers = {}
+    for pid, sessions in ((101, ('a', 'shared')), (102, ('b', 'shared'))):
+        store = _store()
+        for session_id in sessions:
+            context = ConversationContext(business_type='bakery')
+            context.add_conversation_turn("hi", f"from {pid}", 'csv')
+            store.put(session_id, context)
+            time.sleep(0.01)  # Worker 102's copy of 'shared' is the newest
+        monkeypatch.setattr(os, 'getpid', lambda pid=pid: pid)
+        workers[pid] = SessionSnapshotter(store, _encoder, path, interval=3600)
+        workers[pid].stats['restore_state'] = 'missing'
+        workers[pid].snapshot()
+    assert snapshot_files(path) == [path, path + '.101', path + '.102']
+
+    monkeypatch.setattr(os, 'getpid', lambda: 200)
+    restarted = _store()
+    snapshotter = SessionSnapshotter(restarted, _encoder, path, interval=3600)
+    snapshotter.restore()
+    assert snapshotter.stats['restored_files'] == 3 and snapshotter.stats['restored_sessions'] == 5
+    assert restarted.get('a').previous_responses == ["from 101"]
+    assert restarted.get('shared').previous_responses == ["from 102"]
+
+    # Once this run has written its own file, the previous run's files are removed
+    snapshotter.snapshot()
+    assert process_snapshot_path(path) == path + '.200'
+    assert snapshot_files(path) == [path + '.200']
+    merged = _store()
+    assert restore_snapshot(merged, path + '.200')['restored'] == 5
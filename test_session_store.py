@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded LRU + TTL session store
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from session_store import SessionStore
+
+
+def test_lru_eviction_respects_cap():
+    store = SessionStore(max_sessions=3, idle_ttl=60, stripes=1)
+    for session_id in ('a', 'b', 'c'):
+        store.put(session_id, session_id.upper())
+    store.get('a')  # 'a' becomes most recently used
+    store.put('d', 'D')
+    assert len(store) == 3
+    assert 'b' not in store
+    assert store.get('a') == 'A'
+    assert store.get_stats()['evicted_lru'] == 1
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(max_sessions=10, idle_ttl=0.05, stripes=2)
+    store.put('a', 1)
+    time.sleep(0.1)
+    assert store.get('a') is None
+    assert store.get_stats()['evicted_idle'] == 1
+
+
+def test_get_or_create_is_atomic_across_threads():
+    store = SessionStore(max_sessions=100, idle_ttl=60, stripes=4)
+    created = []
+
+    def worker():
+        for i in range(50):
+            _, was_created = store.get_or_create(f"s{i % 10}", dict)
+            if was_created:
+                created.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 10
+    assert len(store) == 10
+
+
+def test_restored_sessions_join_at_the_lru_end():
+    store = SessionStore(max_sessions=10, idle_ttl=60, stripes=1, decoder=lambda blob: blob.decode())
+    store.put('live', 'L')
+    now = time.time()
+    # Restored newest first, as session_snapshot.restore_records does
+    for session_id, age in (('recent', 10), ('older', 30), ('oldest', 59.9)):
+        assert store.restore(session_id, session_id.encode(), now - age)
+    assert list(store._stripes[0].entries) == ['oldest', 'older', 'recent', 'live']
+
+    # The front entry really is the oldest, so expiry can stop at the first fresh one
+    time.sleep(0.15)
+    assert store.sweep() == 1
+    assert 'oldest' not in store and store.get('older') == 'older' and store.get('live') == 'L'
+
+
+if __name__ == "__main__":
+    test_lru_eviction_respects_cap()
+    test_idle_sessions_expire()
+    test_get_or_create_is_atomic_across_threads()
+    test_restored_sessions_join_at_the_lru_end()
+    print("✅ Session store tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy import of smart_llm_chatbot and the /livez and /readyz probes
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_import_defers_heavy_dependencies():
+    # Fresh interpreter, so modules imported by other tests don't hide an eager import
+    code = (
+        "import sys, smart_llm_chatbot\n"
+        "heavy = ['google.generativeai', 'pandas', 'numpy', 'sklearn', 'sentence_transformers']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+        "print(smart_llm_chatbot._intelligent_chatbot is None)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    loaded, not_built = result.stdout.strip().splitlines()[-2:]
+    assert loaded == ''
+    assert not_built == 'True'
+
+
+def test_readiness_follows_warm_up():
+    import smart_llm_chatbot
+    client = smart_llm_chatbot.app.test_client()
+    assert client.get('/livez').status_code == 200
+
+    response = client.get('/readyz')
+    deadline = time.time() + 60
+    while response.status_code != 200 and time.time() < deadline:
+        assert response.json['status'] == 'starting'
+        time.sleep(0.05)
+        response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.json['warm_up']['state'] == 'ready'
+    assert smart_llm_chatbot.intelligent_chatbot is smart_llm_chatbot.get_intelligent_chatbot()
+
+
+def test_startup_report_phases_nest_and_profile_imports():
+    from startup_report import StartupReport
+    sys.modules.pop('colorsys', None)
+    report = StartupReport()
+    report.enable_import_profile()
+    with report.phase('outer'):
+        with report.phase('inner'):
+            import colorsys  # noqa: F401  (stdlib module unlikely to be loaded yet)
+    report.import_profiler.uninstall()
+    phases = {p['name']: p for p in report.to_dict()['phases']}
+    assert phases['inner']['parent'] == 'outer'
+    assert phases['outer']['duration_ms'] >= phases['inner']['duration_ms']
+    assert report.import_profiler.records['colorsys']['cumulative_ms'] >= 0
+
+
+def test_admin_startup_report_requires_local_or_token(monkeypatch):
+    import smart_llm_chatbot
+    client = smart_llm_chatbot.app.test_client()
+    assert client.get('/admin/startup-report').status_code == 200  # Test client is 127.0.0.1
+    assert client.get('/admin/startup-report', environ_base={'REMOTE_ADDR': '10.1.2.3'}).status_code == 403
+
+    monkeypatch.setattr(smart_llm_chatbot, 'ADMIN_API_TOKEN', 'secret')
+    assert client.get('/admin/startup-report').status_code == 403
+    response = client.get('/admin/startup-report', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    assert any(phase['name'] == 'imports' for phase in response.json['phases'])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for span tracing: nesting, head/slow sampling, rotation and the disabled fast path
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Add the current directory to the Python path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ROOT)
+
+from tracing import NOOP_SPAN, Tracer
+
+
+def _collecting_tracer(tmp_path, **kwargs):
+    tracer = Tracer(export_path=str(tmp_path / 'traces.jsonl'), collector_url='', **kwargs)
+    collected = []
+    tracer.add_exporter(collected.append)
+    return tracer, collected
+
+
+def test_disabled_tracer_returns_shared_noop():
+    tracer = Tracer(sample_rate=0, slow_ms=0, export_path='')
+    assert tracer.span('chat') is NOOP_SPAN
+    with tracer.span('chat') as span:
+        span.set('tenant', 'x')
+        assert tracer.current_span() is NOOP_SPAN
+    assert tracer.stats['traces_recorded'] == 0
+
+
+def test_head_sampled_trace_records_parent_child_spans(tmp_path):
+    tracer, collected = _collecting_tracer(tmp_path, sample_rate=1.0, slow_ms=0)
+    with tracer.span('chat', tenant='acme') as root:
+        with tracer.span('routing'):
+            with tracer.span('provider', provider='csv'):
+                tracer.current_span().set('csv_score', 0.81)
+        root.set('provider', 'csv')
+    assert tracer.flush()
+
+    trace = collected[0]
+    assert trace['sampled_by'] == 'head'
+    spans = {span['name']: span for span in trace['spans']}
+    assert spans['chat']['parent_id'] is None
+    assert spans['routing']['parent_id'] == spans['chat']['span_id']
+    assert spans['provider']['parent_id'] == spans['routing']['span_id']
+    assert spans['provider']['attributes'] == {'provider': 'csv', 'csv_score': 0.81}
+    assert spans['chat']['attributes'] == {'tenant': 'acme', 'provider': 'csv'}
+
+    with open(tmp_path / 'traces.jsonl') as f:
+        assert json.loads(f.readline())['trace_id'] == trace['trace_id']
+
+
+def test_slow_requests_kept_when_not_head_sampled(tmp_path):
+    tracer, collected = _collecting_tracer(tmp_path, sample_rate=0, slow_ms=20)
+    with tracer.span('fast'):
+        pass
+    with tracer.span('slow'):
+        with tracer.span('gemini'):
+            time.sleep(0.03)
+    assert tracer.flush()
+
+    assert [trace['root'] for trace in collected] == ['slow']
+    assert collected[0]['sampled_by'] == 'slow'
+    assert tracer.stats['traces_recorded'] == 2
+
+
+def test_unsampled_request_keeps_children_silent(tmp_path):
+    tracer, collected = _collecting_tracer(tmp_path, sample_rate=1e-12, slow_ms=0)
+    with tracer.span('chat'):
+        # Children of an unsampled root must not start traces of their own
+        assert tracer.span('routing') is NOOP_SPAN
+    assert tracer.current_span() is NOOP_SPAN
+    assert tracer.flush() and collected == []
+
+
+def test_errors_recorded_and_file_rotates(tmp_path):
+    tracer, _ = _collecting_tracer(tmp_path, sample_rate=1.0, max_bytes=2000, backup_count=2)
+    for _ in range(30):
+        try:
+            with tracer.span('chat', padding='x' * 200):
+                raise ValueError('boom')
+        except ValueError:
+            pass
+    assert tracer.flush()
+    assert os.path.exists(tmp_path / 'traces.jsonl.1')
+    assert not os.path.exists(tmp_path / 'traces.jsonl.3')
+    with open(tmp_path / 'traces.jsonl') as f:
+        assert json.loads(f.readline())['spans'][0]['error'] == 'ValueError: boom'
+
+
+def test_chat_endpoint_emits_stage_spans(tmp_path):
+    # Fresh interpreter so the provider endpoints point at the mock before the chatbot is imported
+    code = (
+        "import json, os, sys, mock_llm_server\n"
+        "server, url = mock_llm_server.start_in_thread(profiles=mock_llm_server.PRESET_PROFILES['fast'], seed=1)\n"
+        "os.environ['GEMINI_API_ENDPOINT'] = url\n"
+        "os.environ['OPENROUTER_API_URL'] = url + '/api/v1/chat/completions'\n"
+        "import smart_llm_chatbot\n"
+        "from tracing import tracer\n"
+        "collected = []\n"
+        "tracer.add_exporter(collected.append)\n"
+        "client = smart_llm_chatbot.app.test_client()\n"
+        "response = client.post('/chat', json={'message': 'what services do you offer',\n"
+        "                                      'user_context': {'session_id': 'trace-test'}})\n"
+        "assert response.status_code == 200 and tracer.flush()\n"
+        "print(json.dumps(collected[0]))\n"
+    )
+    env = dict(os.environ, TRACE_SAMPLE_RATE='1', TRACE_EXPORT_PATH=str(tmp_path / 'traces.jsonl'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    trace = json.loads(result.stdout.strip().splitlines()[-1])
+
+    names = [span['name'] for span in trace['spans']]
+    assert names[0] == 'chat'
+    assert {'session.load', 'routing', 'provider'} <= set(names)
+    load = next(span for span in trace['spans'] if span['name'] == 'session.load')
+    assert load['attributes']['cache_hit'] is False
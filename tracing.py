@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+🔭 TRACING - Lightweight per-request span tracing
+Nested spans (parent/child timing plus attributes such as provider, cache
+hit, CSV score and tenant) around each stage of the /chat pipeline.
+
+Sampling:
+    TRACE_SAMPLE_RATE  head-based: fraction of requests traced from the start
+    TRACE_SLOW_MS      tail rule: any request slower than this is kept too
+With both at 0 (the default) tracing is off and span() returns a shared
+no-op object, so instrumented code pays a single attribute check.
+
+Kept traces are exported off the request thread, one JSON line per trace,
+to a size-rotated file (TRACE_EXPORT_PATH) and optionally POSTed to a
+collector (TRACE_COLLECTOR_URL) or handed to callables from add_exporter().
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0'))
+TRACE_SLOW_MS = float(os.getenv('TRACE_SLOW_MS', '0'))
+TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH', 'logs/traces.jsonl')
+TRACE_MAX_BYTES = int(os.getenv('TRACE_MAX_BYTES', str(10 * 1024 * 1024)))
+TRACE_BACKUP_COUNT = int(os.getenv('TRACE_BACKUP_COUNT', '5'))
+TRACE_COLLECTOR_URL = os.getenv('TRACE_COLLECTOR_URL', '')
+TRACE_QUEUE_SIZE = 1000
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+
+class _NoopSpan:
+    """Stand-in when tracing is off or the request isn't being recorded"""
+
+    __slots__ = ()
+
+    def set(self, key: str, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledRoot(_NoopSpan):
+    """Root of a request that won't be recorded; marks the context so children stay no-ops"""
+
+    __slots__ = ('_token',)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class _Trace:
+    __slots__ = ('trace_id', 'head_sampled', 'spans', 'start')
+
+    def __init__(self, head_sampled: bool):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.head_sampled = head_sampled
+        self.spans: List['Span'] = []
+        self.start = time.perf_counter()
+
+
+class Span:
+    """One timed stage; use as a context manager"""
+
+    __slots__ = ('tracer', 'trace', 'name', 'span_id', 'parent_id', 'start', 'end', 'attributes', 'error', '_token')
+
+    def __init__(self, tracer: 'Tracer', trace: _Trace, name: str, parent: Optional['Span'], attributes: Dict):
+        self.tracer = tracer
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.error = None
+        self.start = self.end = None
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.trace.spans.append(self)
+        if self.parent_id is None:
+            self.tracer._finish(self.trace, self)
+        return False
+
+    def to_dict(self) -> Dict:
+        data = {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ms': round((self.start - self.trace.start) * 1000, 3),
+            'duration_ms': round((self.end - self.start) * 1000, 3),
+        }
+        if self.attributes:
+            data['attributes'] = self.attributes
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class Tracer:
+    """Creates spans, applies head/slow sampling and exports kept traces in the background"""
+
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, slow_ms: float = TRACE_SLOW_MS,
+                 export_path: str = TRACE_EXPORT_PATH, max_bytes: int = TRACE_MAX_BYTES,
+                 backup_count: int = TRACE_BACKUP_COUNT, collector_url: str = TRACE_COLLECTOR_URL):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.export_path = export_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.collector_url = collector_url
+        self._exporters: List[Callable[[Dict], None]] = []
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._file_handler: Optional[RotatingFileHandler] = None
+        self.stats = {'traces_recorded': 0, 'kept_head': 0, 'kept_slow': 0, 'exported': 0, 'dropped': 0,
+                      'export_errors': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    def configure(self, sample_rate: Optional[float] = None, slow_ms: Optional[float] = None):
+        """Change sampling at runtime (e.g. from an admin endpoint or a test)"""
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+
+    def add_exporter(self, exporter: Callable[[Dict], None]):
+        """Also hand every kept trace (as a dict) to exporter, on the export thread"""
+        self._exporters.append(exporter)
+
+    def span(self, name: str, **attributes):
+        """Open a span under the current one, or start a trace when there is none"""
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            head_sampled = random.random() < self.sample_rate
+            if not head_sampled and self.slow_ms <= 0:
+                return _UnsampledRoot()
+            return Span(self, _Trace(head_sampled), name, None, attributes)
+        if isinstance(parent, _NoopSpan):
+            return NOOP_SPAN
+        return Span(self, parent.trace, name, parent, attributes)
+
+    @staticmethod
+    def current_span():
+        """The innermost open span (no-op object when none), for attaching attributes"""
+        span = _current_span.get()
+        return span if span is not None else NOOP_SPAN
+
+    def _finish(self, trace: _Trace, root: Span):
+        self.stats['traces_recorded'] += 1
+        duration_ms = (root.end - root.start) * 1000
+        if trace.head_sampled:
+            reason = 'head'
+        elif self.slow_ms > 0 and duration_ms >= self.slow_ms:
+            reason = 'slow'
+        else:
+            return
+        self.stats['kept_' + reason] += 1
+        record = {
+            'trace_id': trace.trace_id,
+            'root': root.name,
+            'timestamp': time.time(),
+            'duration_ms': round(duration_ms, 3),
+            'sampled_by': reason,
+            'spans': [span.to_dict() for span in sorted(trace.spans, key=lambda s: s.start)],
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._export_loop, name='trace-exporter', daemon=True)
+                self._worker.start()
+
+    def _write_file(self, line: str):
+        if self._file_handler is None:
+            os.makedirs(os.path.dirname(self.export_path) or '.', exist_ok=True)
+            self._file_handler = RotatingFileHandler(self.export_path, maxBytes=self.max_bytes,
+                                                     backupCount=self.backup_count, encoding='utf-8')
+        self._file_handler.emit(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO}))
+
+    def _export_loop(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if self.export_path:
+                    self._write_file(json.dumps(record, separators=(',', ':'), default=str))
+                if self.collector_url:
+                    import requests
+                    requests.post(self.collector_url, json=record, timeout=2)
+                for exporter in self._exporters:
+                    exporter(record)
+                self.stats['exported'] += 1
+            except Exception as e:
+                self.stats['export_errors'] += 1
+                logger.warning(f"⚠️ Trace export failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued traces are exported (tests, shutdown)"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def get_stats(self) -> Dict:
+        return {'enabled': self.enabled, 'sample_rate': self.sample_rate, 'slow_ms': self.slow_ms,
+                'export_path': self.export_path, 'queued': self._queue.qsize(), **self.stats}
+
+
+# Shared tracer for the serving process
+tracer = Tracer()
+
+__all__ = ['Tracer', 'Span', 'tracer', 'NOOP_SPAN']
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+🏭 WSGI ENTRY POINT - Production serving for the intelligent chatbot
+Importing this module only creates the Flask app; the chatbot (CSV data,
+keyword tables, tenant configs, compiled rules) is built lazily. Under
+gunicorn (see gunicorn.conf.py) the sequence is:
+    1. the master imports wsgi.py once (preload_app)
+    2. when_ready calls preload_for_workers() in the master, which builds the
+       chatbot and freezes it for copy-on-write sharing
+    3. post_fork calls reinit_after_fork() in each worker to re-create its
+       own connections
+Served any other way, the chatbot is built by the background warm-up or on
+the first request.
+
+Run:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from smart_llm_chatbot import app, preload_for_workers, reinit_after_fork
+
+__all__ = ['app', 'preload_for_workers', 'reinit_after_fork']